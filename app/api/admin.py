@@ -0,0 +1,63 @@
+import asyncio
+import hmac
+import time
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+
+from app.config import settings
+from app.profiling import SamplingProfiler
+
+
+async def require_admin(x_admin_token: str = Header("")):
+    """Admin endpoints need ``X-Admin-Token``; without ADMIN_TOKEN they don't exist."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# One on-demand profile per worker at a time
+_profiling = asyncio.Lock()
+
+
+@router.post("/profile")
+async def profile(
+    seconds: float = Query(10, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    interval: float = Query(settings.PROFILE_INTERVAL, ge=0.001, le=1),
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+):
+    """Sample this worker for ``seconds`` and download the profile.
+
+    ``speedscope`` files open at https://www.speedscope.app; ``collapsed``
+    stacks are the input of flamegraph.pl. Requests keep being served while
+    the profile is taken.
+    """
+    if _profiling.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with _profiling:
+        profiler = SamplingProfiler(interval).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            result = profiler.stop()
+    name = f"profile-{time.strftime('%Y%m%d-%H%M%S')}"
+    if format == "collapsed":
+        content, media_type, filename = (
+            result.collapsed(),
+            "text/plain",
+            f"{name}.collapsed.txt",
+        )
+    else:
+        content, media_type, filename = (
+            orjson.dumps(result.speedscope(name)),
+            "application/json",
+            f"{name}.speedscope.json",
+        )
+    return Response(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,8 +1,6 @@
 import datetime
-import json
 import logging
 
-import httpx
 import jwt
 from cobo_waas2.exceptions import ForbiddenException, UnauthorizedException
 from fastapi import APIRouter
@@ -10,6 +8,7 @@ from pydantic import BaseModel
 
 from app.cache import portal_user_payload_cache
 from app.config import settings
+from app.jwks import jwks_cache
 from app.services.cobo_service import CoboService
 
 router = APIRouter()
@@ -46,7 +45,7 @@ async def get_token(req: GetTokenRequest) -> GetTokenResponse:
     org_id = payload["org_id"]
     iss = payload["iss"]
 
-    portal_user_payload_cache[f"{sub}-{org_id}"] = payload
+    await portal_user_payload_cache.aset(f"{sub}-{org_id}", payload)
     exp = datetime.datetime.now() + datetime.timedelta(minutes=30)
     access_token = jwt.encode(
         {
@@ -88,7 +87,7 @@ async def refresh_token(req: RefreshTokenRequest):
 
     sub = payload_refresh_token["sub"]
     org_id = payload_refresh_token["org_id"]
-    user_payload = portal_user_payload_cache[f"{sub}-{org_id}"]
+    user_payload = await portal_user_payload_cache.aget(f"{sub}-{org_id}")
     if not user_payload:
         raise UnauthorizedException("User not found")
 
@@ -130,17 +129,7 @@ async def organization_authorization_callback(
 
 
 async def get_public_key(token_header):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(settings.jks_url)
-        response.raise_for_status()
-    jwks = json.loads(response.text)
-
-    for key in jwks["keys"]:
-        if key["kid"] == token_header["kid"]:
-            return jwt.get_algorithm_by_name(token_header["alg"]).from_jwk(
-                json.dumps(key)
-            )
-    return None
+    return await jwks_cache.get_key(token_header["kid"], token_header["alg"])
 
 
 async def verify_jwt_token(token):
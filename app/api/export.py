@@ -0,0 +1,78 @@
+import csv
+import io
+import logging
+from enum import Enum
+from typing import Any, AsyncIterator, List, Optional
+
+import orjson
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.api.responses import encode_model, model_content, model_keys
+from app.models.wallet import ExportFormat
+
+logger = logging.getLogger(__name__)
+
+
+def _ndjson(items: List[Any]) -> bytes:
+    return b"".join(orjson.dumps(item, default=encode_model) + b"\n" for item in items)
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, (dict, list, BaseModel)):
+        return orjson.dumps(value, default=encode_model).decode()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def _encode(
+    pages: AsyncIterator[List[Any]], export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    columns: Optional[List[str]] = None
+    try:
+        async for items in pages:
+            if export_format == ExportFormat.NDJSON:
+                yield _ndjson(items)
+                continue
+            buffer = io.StringIO()
+            rows = [model_content(item) for item in items]
+            if columns is None and rows:
+                keys = model_keys(type(items[0]))
+                columns = [key for _, key in keys] if keys else list(rows[0])
+                csv.writer(buffer).writerow(columns)
+            writer = csv.DictWriter(buffer, columns or [], extrasaction="ignore")
+            for row in rows:
+                writer.writerow({key: _csv_cell(value) for key, value in row.items()})
+            yield buffer.getvalue().encode()
+    except Exception as e:
+        # The status line has already been sent; report the failure in-band
+        # where the format allows it, then re-raise so the server aborts the
+        # chunked body instead of ending it cleanly. A reader then sees a
+        # truncated transfer rather than what looks like a complete export.
+        logger.error("Export stream failed: %s", e)
+        if export_format == ExportFormat.NDJSON:
+            yield orjson.dumps({"status": "error", "message": str(e)}) + b"\n"
+        raise
+
+
+def export_response(
+    pages: AsyncIterator[List[Any]], export_format: ExportFormat, filename: str
+) -> StreamingResponse:
+    """Stream every page as NDJSON or CSV, one page in memory at a time.
+
+    If a page fails the response is cut off without its final chunk; NDJSON
+    exports end with a ``{"status": "error"}`` line before that.
+    """
+    media_type = (
+        "application/x-ndjson" if export_format == ExportFormat.NDJSON else "text/csv"
+    )
+    return StreamingResponse(
+        _encode(pages, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{export_format.value}"'
+            )
+        },
+    )
@@ -0,0 +1,162 @@
+import asyncio
+from typing import Any, Dict, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api.routes import read_call_flight, reference_data_cache, webhook_queue
+
+# %if app_type == portal
+from app.cache import cache_stats, portal_caches
+
+# %endif
+from app import logging_config
+from app.config import settings
+from app.metrics import Samples, registry
+from app.services.cobo_service import CoboService
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _field(stats: Dict[str, Dict[str, Any]], label: str, field: str) -> Samples:
+    return [({label: key}, values[field]) for key, values in stats.items()]
+
+
+def _limiter(field: str) -> Samples:
+    """Per API family, or per org and family with METRICS_ORG_LABELS."""
+    totals: Dict[Tuple[Tuple[str, str], ...], float] = {}
+    for key, values in CoboService.limiter.stats().items():
+        org_id, family = key.rsplit("/", 1)
+        labels = (("family", family),)
+        if settings.METRICS_ORG_LABELS:
+            labels = (("org", org_id),) + labels
+        totals[labels] = totals.get(labels, 0) + values[field]
+    return [(dict(labels), value) for labels, value in totals.items()]
+
+
+def _executor_queued() -> Samples:
+    executor = CoboService._executor
+    return [({}, executor._work_queue.qsize() if executor else 0)]
+
+
+def _caches(field: str) -> Samples:
+    stats = {"reference_data": reference_data_cache.store.stats()}
+    # %if app_type == portal
+    stats.update(cache_stats())
+    # %endif
+    return _field(stats, "cache", field)
+
+
+def _log_stat(field: str) -> Samples:
+    pipeline = logging_config.pipeline
+    return [({}, pipeline.stats()[field])] if pipeline is not None else []
+
+
+registry.add_collector(
+    "cobo_sdk_queued_calls",
+    "SDK calls waiting for a free SDK worker thread",
+    _executor_queued,
+)
+for field, help in (
+    ("in_flight", "Cobo calls in flight"),
+    ("concurrency_limit", "Adaptive concurrency limit"),
+    ("queued", "Cobo calls waiting for a concurrency slot"),
+):
+    registry.add_collector(
+        f"cobo_limiter_{field}",
+        f"{help} per API family",
+        lambda field=field: _limiter(field),
+    )
+for field, help in (
+    ("throttled", "Cobo calls answered with 429"),
+    ("rejected", "Cobo calls refused because the rate limit wait was too long"),
+):
+    registry.add_collector(
+        f"cobo_limiter_{field}_total",
+        f"{help} per API family",
+        lambda field=field: _limiter(field),
+        kind="counter",
+    )
+registry.add_collector(
+    "cobo_retries_total",
+    "Retried Cobo SDK attempts",
+    lambda: [({}, CoboService.resilience.retries)],
+    kind="counter",
+)
+registry.add_collector(
+    "cobo_circuit_open",
+    "1 while calls to the host fail fast, 0.5 while it is probed",
+    lambda: [
+        ({"host": host}, {"closed": 0, "half_open": 0.5, "open": 1}[values["state"]])
+        for host, values in CoboService.resilience.stats()["breakers"].items()
+    ],
+)
+registry.add_collector(
+    "read_calls_shared_total",
+    "Read calls answered by an identical call already in flight",
+    lambda: [({}, read_call_flight.shared)],
+    kind="counter",
+)
+for field in ("hits", "misses", "evictions"):
+    registry.add_collector(
+        f"cache_{field}_total",
+        f"Cache {field}",
+        lambda field=field: _caches(field),
+        kind="counter",
+    )
+registry.add_collector("cache_entries", "Entries in the cache", lambda: _caches("size"))
+for field in ("received", "duplicates", "processed", "failed"):
+    registry.add_collector(
+        f"webhook_{field}_total",
+        f"Webhook deliveries {field}",
+        lambda field=field: [({}, webhook_queue.stats()[field])],
+        kind="counter",
+    )
+registry.add_collector(
+    "webhook_pending",
+    "Webhook deliveries waiting for a worker",
+    lambda: [({}, webhook_queue.stats()["pending"])],
+)
+registry.add_collector(
+    "log_records_queued",
+    "Log records waiting for the writer thread",
+    lambda: _log_stat("queued"),
+)
+registry.add_collector(
+    "log_records_sampled_out_total",
+    "Log records skipped by LOG_SAMPLING",
+    lambda: _log_stat("sampled_out"),
+    kind="counter",
+)
+registry.add_collector(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+    lambda: _log_stat("dropped"),
+    kind="counter",
+)
+# %if app_type == portal
+registry.add_collector(
+    "org_token_refreshes_total",
+    "Org access tokens obtained or refreshed",
+    lambda: [({}, CoboService.org_tokens.refreshes)],
+    kind="counter",
+)
+registry.add_collector(
+    "org_clients",
+    "Org SDK clients in the pool",
+    lambda: [({}, len(CoboService.client_pool))],
+)
+# %endif
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Shared cache backends count their entries on their own thread
+    stores = [reference_data_cache.store]
+    # %if app_type == portal
+    stores += portal_caches.values()
+    # %endif
+    await asyncio.gather(*(store.refresh_size() for store in stores))
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
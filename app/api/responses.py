@@ -0,0 +1,51 @@
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Per model class: (attribute, JSON key) pairs, or None for oneOf wrappers
+_model_keys: Dict[type, Optional[Tuple[Tuple[str, str], ...]]] = {}
+
+
+def model_keys(cls: type) -> Optional[Tuple[Tuple[str, str], ...]]:
+    try:
+        return _model_keys[cls]
+    except KeyError:
+        fields = cls.model_fields
+        if "actual_instance" in fields:
+            keys = None
+        else:
+            keys = tuple((name, field.alias or name) for name, field in fields.items())
+        _model_keys[cls] = keys
+        return keys
+
+
+def model_content(obj: Any) -> Any:
+    """One level of an SDK model's ``to_dict()``.
+
+    Fields are keyed by alias and ``None`` values are dropped; oneOf wrappers
+    are replaced by their actual instance. Nested models are left as they are
+    for ``encode_model`` to expand while orjson writes the output, so the tree
+    is walked once instead of being dumped again at every level.
+    """
+    while isinstance(obj, BaseModel):
+        keys = model_keys(type(obj))
+        if keys is not None:
+            values = obj.__dict__
+            return {key: values[name] for name, key in keys if values[name] is not None}
+        obj = obj.actual_instance
+    return obj
+
+
+def encode_model(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return model_content(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ModelJSONResponse(JSONResponse):
+    """JSON response that serializes SDK models directly with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=encode_model)
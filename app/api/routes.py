@@ -1,56 +1,252 @@
+import json
+import math
 import traceback
-from typing import Callable, Awaitable, Any, Optional, List, Dict, Annotated
-
+from typing import (
+    Callable,
+    Awaitable,
+    Any,
+    AsyncIterator,
+    Optional,
+    List,
+    Dict,
+    Annotated,
+)
+
+import orjson
+from cobo_waas2.crypto.signing_helper import SignHelper
 from cobo_waas2.exceptions import UnauthorizedException
-from fastapi import APIRouter, Request, Query, Body, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request, Response, Query, Body, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
 
 # %if app_type == portal
 from app.auth import get_org_id
 
 # %endif
-from app.models.wallet import WalletType, WalletSubtype
+from app.api.export import export_response
+from app.api.responses import ModelJSONResponse, encode_model, model_content
+from app.cache_backend import create_cache
+from app.config import settings
+from app.models.wallet import ExportFormat, WalletType, WalletSubtype
+from app.rate_limit import retry_after
+from app.response_cache import ResponseCache
+from app.services.balances import BalanceTotals, iter_wallet_balances
+from app.services.batch_transfers import iter_transfer_submissions
 from app.services.cobo_service import CoboService
+from app.services.pagination import iter_pages
+from app.singleflight import SingleFlight
+from app.tracing import tracer
+from app.webhook_queue import WebhookQueue
 
 router = APIRouter()
 
+# Near-static catalogue data (supported chains and tokens)
+reference_data_cache = ResponseCache(
+    create_cache(
+        "reference_data",
+        backend=settings.CACHE_BACKEND,
+        url=settings.CACHE_URL,
+        max_entries=settings.CACHE_MAX_ENTRIES,
+    )
+)
+# Identical read calls in flight at the same time share one upstream request;
+# read_call_flight.shared counts the callers that were coalesced.
+read_call_flight = SingleFlight()
+
+
+async def process_webhook(payload: Dict[str, Any], org_id: Optional[str]):
+    # %if app_type == portal
+    with CoboService.use_org(org_id):
+        return await CoboService.handle_webhook(payload)
+    # %else
+    return await CoboService.handle_webhook(payload)
+    # %endif
+
+
+# Webhook deliveries are persisted and ACKed, then handled by background workers
+webhook_queue = WebhookQueue(
+    settings.WEBHOOK_QUEUE_PATH,
+    process_webhook,
+    workers=settings.WEBHOOK_WORKERS,
+    dedup_ttl=settings.WEBHOOK_DEDUP_TTL,
+)
+
 
 async def execute_service_call(
     service_method: Callable[..., Awaitable[Any]], *args, **kwargs
 ) -> JSONResponse:
+    flight_key = None
+    if service_method.__name__ in CoboService.READ_METHODS:
+        flight_key = (service_method.__name__, args, tuple(sorted(kwargs.items())))
+
     async def _execute():
-        result = await service_method(*args, **kwargs)
-        result_dict = result.to_dict() if hasattr(result, "to_dict") else result
-        if isinstance(result_dict, dict) and "data" in result_dict:
-            return JSONResponse(content={"status": "success", **result_dict})
+        with tracer.start_as_current_span(f"CoboService.{service_method.__name__}"):
+            if flight_key is None:
+                result = await service_method(*args, **kwargs)
+            else:
+                result = await read_call_flight.do(
+                    flight_key, lambda: service_method(*args, **kwargs)
+                )
+            content = model_content(result)
+        if isinstance(content, dict) and "data" in content:
+            return ModelJSONResponse(content={"status": "success", **content})
         else:
-            return JSONResponse(content={"status": "success", "data": result_dict})
+            return ModelJSONResponse(content={"status": "success", "data": content})
 
     # %if app_type == portal
     org_id = kwargs.pop("request_org_id")
     retry_times = 1
-    while retry_times > 0:
-        try:
-            if not CoboService.cobo_api_client.configuration.access_token:
-                await CoboService.set_token_by_org_id(org_id)
-            return await _execute()
-        except UnauthorizedException as e:
-            retry_times -= 1
-            if retry_times == 0:
+    with CoboService.use_org(org_id):
+        while retry_times > 0:
+            try:
+                with tracer.start_as_current_span("org_token", {"org_id": org_id}):
+                    await CoboService.ensure_org_client(org_id)
+                return await _execute()
+            except UnauthorizedException as e:
+                retry_times -= 1
+                if retry_times == 0:
+                    return JSONResponse(
+                        content={"status": "error", "message": str(e)},
+                        status_code=500,
+                    )
+                with tracer.start_as_current_span(
+                    "org_token.refresh", {"org_id": org_id}
+                ):
+                    await CoboService.refresh_org_token(org_id)
+            except Exception as e:
+                if getattr(e, "status", None) in (429, 503):
+                    return refused_response(e)
+                print(traceback.format_exc())
                 return JSONResponse(
                     content={"status": "error", "message": str(e)}, status_code=500
                 )
-            await CoboService.set_token_by_org_id(org_id)
-        except Exception as e:
-            print(traceback.format_exc())
-            return JSONResponse(
-                content={"status": "error", "message": str(e)}, status_code=500
-            )
     # %else
-    return await _execute()
+    try:
+        return await _execute()
+    except Exception as e:
+        if getattr(e, "status", None) not in (429, 503):
+            raise
+        return refused_response(e)
+    # %endif
+
+
+def refused_response(e: Exception) -> JSONResponse:
+    """429 or 503 for a call that was refused, passing on its Retry-After."""
+    delay = retry_after(e)
+    return JSONResponse(
+        content={"status": "error", "message": str(e)},
+        status_code=e.status,
+        headers={"Retry-After": str(math.ceil(delay))} if delay else None,
+    )
+
+
+async def cached_service_call(
+    request: Request,
+    ttl: float,
+    service_method: Callable[..., Awaitable[Any]],
+    *args,
+    **kwargs,
+) -> Response:
+    """Like execute_service_call, but served from reference_data_cache."""
+    key = json.dumps(
+        [service_method.__name__, kwargs.get("request_org_id"), *args], default=str
+    )
+    return await reference_data_cache.respond(
+        request,
+        key,
+        ttl,
+        settings.RESPONSE_CACHE_STALE_TTL,
+        lambda: execute_service_call(service_method, *args, **kwargs),
+    )
+
+
+async def export_pages(
+    service_method: Callable[..., Awaitable[Any]],
+    *args,
+    request_org_id: Optional[str] = None,
+) -> AsyncIterator[List[Any]]:
+    """Every page of a list call, for streaming exports.
+
+    ``args`` are the filters that precede ``limit``/``before``/``after`` in
+    the service method's signature; the cursor is followed server-side.
+    """
+    pages = iter_pages(
+        lambda after: service_method(
+            *args, limit=settings.EXPORT_PAGE_SIZE, before=None, after=after
+        )
+    )
+    # %if app_type == portal
+    with CoboService.use_org(request_org_id):
+        await CoboService.ensure_org_client(request_org_id)
+        async for items in pages:
+            yield items
+    # %else
+    async for items in pages:
+        yield items
+    # %endif
+
+
+async def wallet_balance_results(
+    wallet_ids: List[str],
+    token_ids: Optional[str],
+    request_org_id: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    results = iter_wallet_balances(
+        wallet_ids, token_ids, settings.BULK_BALANCE_CONCURRENCY
+    )
+    # %if app_type == portal
+    with CoboService.use_org(request_org_id):
+        await CoboService.ensure_org_client(request_org_id)
+        async for result in results:
+            yield result
+    # %else
+    async for result in results:
+        yield result
     # %endif
 
 
+async def stream_wallet_balances(
+    results: AsyncIterator[Dict[str, Any]],
+) -> AsyncIterator[bytes]:
+    totals = BalanceTotals()
+    async for result in results:
+        totals.add(result)
+        yield orjson.dumps(result, default=encode_model) + b"\n"
+    yield orjson.dumps({"totals": totals.to_dict()}) + b"\n"
+
+
+async def transfer_batch_results(
+    transfers: List[Dict[str, Any]],
+    batch_id: Optional[str],
+    request_org_id: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    results = iter_transfer_submissions(
+        transfers,
+        batch_id,
+        settings.BATCH_TRANSFER_CONCURRENCY,
+        settings.BATCH_TRANSFER_MAX_ATTEMPTS,
+    )
+    # %if app_type == portal
+    with CoboService.use_org(request_org_id):
+        await CoboService.ensure_org_client(request_org_id)
+        async for result in results:
+            yield result
+    # %else
+    async for result in results:
+        yield result
+    # %endif
+
+
+async def stream_transfer_results(
+    results: AsyncIterator[Dict[str, Any]],
+) -> AsyncIterator[bytes]:
+    summary = {"total": 0, "succeeded": 0, "failed": 0}
+    async for result in results:
+        summary["total"] += 1
+        summary["succeeded" if result["status"] == "success" else "failed"] += 1
+        yield orjson.dumps(result, default=encode_model) + b"\n"
+    yield orjson.dumps({"summary": summary}) + b"\n"
+
+
 @router.get("/wallets")
 async def list_wallets(
     wallet_type: Optional[WalletType] = None,
@@ -79,6 +275,123 @@ async def list_wallets(
     )
 
 
+@router.get("/wallets/chains")
+async def list_supported_chains(
+    request: Request,
+    wallet_type: Optional[WalletType] = None,
+    wallet_subtype: Optional[WalletSubtype] = None,
+    chain_ids: Optional[str] = None,
+    token_list_id: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=50),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    # %if app_type == portal
+    org_id: str = Depends(get_org_id),
+    # %endif
+):
+    return await cached_service_call(
+        request,
+        settings.RESPONSE_CACHE_CHAINS_TTL,
+        CoboService.list_supported_chains,
+        wallet_type,
+        wallet_subtype,
+        chain_ids,
+        token_list_id,
+        limit,
+        before,
+        after,
+        # %if app_type == portal
+        request_org_id=org_id,
+        # %endif
+    )
+
+
+@router.get("/wallets/tokens")
+async def list_supported_tokens(
+    request: Request,
+    wallet_type: Optional[WalletType] = None,
+    wallet_subtype: Optional[WalletSubtype] = None,
+    chain_ids: Optional[str] = None,
+    token_ids: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=50),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    # %if app_type == portal
+    org_id: str = Depends(get_org_id),
+    # %endif
+):
+    return await cached_service_call(
+        request,
+        settings.RESPONSE_CACHE_TOKENS_TTL,
+        CoboService.list_supported_tokens,
+        wallet_type,
+        wallet_subtype,
+        chain_ids,
+        token_ids,
+        limit,
+        before,
+        after,
+        # %if app_type == portal
+        request_org_id=org_id,
+        # %endif
+    )
+
+
+@router.get("/wallets/check_address_validity")
+async def check_address_validity(
+    chain_id: str = Query(...),
+    address: str = Query(...),
+    # %if app_type == portal
+    org_id: str = Depends(get_org_id),
+    # %endif
+):
+    return await execute_service_call(
+        CoboService.check_address_validity,
+        chain_id,
+        address,
+        # %if app_type == portal
+        request_org_id=org_id,
+        # %endif
+    )
+
+
+@router.post("/wallets/balances")
+async def get_wallet_balances(
+    wallet_ids: Annotated[
+        List[str], Body(min_length=1, max_length=settings.BULK_BALANCE_MAX_WALLETS)
+    ],
+    token_ids: Annotated[Optional[str], Body()] = None,
+    stream: Annotated[bool, Body()] = False,
+    # %if app_type == portal
+    org_id: str = Depends(get_org_id),
+    # %endif
+):
+    """Balances of many wallets at once, with totals per token_id.
+
+    With ``stream`` the response is NDJSON: one line per wallet as it
+    completes, then a final ``{"totals": ...}`` line.
+    """
+    results = wallet_balance_results(
+        wallet_ids,
+        token_ids,
+        # %if app_type == portal
+        request_org_id=org_id,
+        # %endif
+    )
+    if stream:
+        return StreamingResponse(
+            stream_wallet_balances(results), media_type="application/x-ndjson"
+        )
+    totals = BalanceTotals()
+    data = []
+    async for result in results:
+        totals.add(result)
+        data.append(result)
+    return ModelJSONResponse(
+        content={"status": "success", "data": data, "totals": totals.to_dict()}
+    )
+
+
 @router.get("/wallets/{wallet_id}")
 async def get_wallet_by_id(
     wallet_id: str,
@@ -201,6 +514,28 @@ async def list_wallet_addresses(
     )
 
 
+@router.get("/wallets/{wallet_id}/addresses/export")
+async def export_wallet_addresses(
+    wallet_id: str,
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+    chain_ids: Optional[str] = None,
+    addresses: Optional[str] = None,
+    # %if app_type == portal
+    org_id: str = Depends(get_org_id),
+    # %endif
+):
+    pages = export_pages(
+        CoboService.list_wallet_addresses,
+        wallet_id,
+        chain_ids,
+        addresses,
+        # %if app_type == portal
+        request_org_id=org_id,
+        # %endif
+    )
+    return export_response(pages, export_format, f"{wallet_id}-addresses")
+
+
 @router.post("/wallets/{wallet_id}/withdraw")
 async def withdraw_from_wallet(
     wallet_id: str,
@@ -235,40 +570,22 @@ async def withdraw_from_wallet(
     )
 
 
-@router.get("/wallets/chains")
-async def list_supported_chains(
-    wallet_type: Optional[WalletType] = None,
-    wallet_subtype: Optional[WalletSubtype] = None,
-    chain_ids: Optional[str] = None,
-    token_list_id: Optional[str] = None,
-    limit: int = Query(default=10, ge=1, le=50),
-    before: Optional[str] = None,
-    after: Optional[str] = None,
-    # %if app_type == portal
-    org_id: str = Depends(get_org_id),
-    # %endif
-):
-    return await execute_service_call(
-        CoboService.list_supported_chains,
-        wallet_type,
-        wallet_subtype,
-        chain_ids,
-        token_list_id,
-        limit,
-        before,
-        after,
-        # %if app_type == portal
-        request_org_id=org_id,
-        # %endif
-    )
-
-
-@router.get("/wallets/tokens")
-async def list_supported_tokens(
-    wallet_type: Optional[WalletType] = None,
-    wallet_subtype: Optional[WalletSubtype] = None,
+@router.get("/transactions")
+async def list_transactions(
+    request_id: Optional[str] = None,
+    cobo_ids: Optional[str] = None,
+    transaction_ids: Optional[str] = None,
+    transaction_hashes: Optional[str] = None,
+    types: Optional[str] = None,
+    statuses: Optional[str] = None,
+    wallet_ids: Optional[str] = None,
     chain_ids: Optional[str] = None,
     token_ids: Optional[str] = None,
+    asset_ids: Optional[str] = None,
+    vault_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    min_created_timestamp: Optional[int] = None,
+    max_created_timestamp: Optional[int] = None,
     limit: int = Query(default=10, ge=1, le=50),
     before: Optional[str] = None,
     after: Optional[str] = None,
@@ -277,11 +594,21 @@ async def list_supported_tokens(
     # %endif
 ):
     return await execute_service_call(
-        CoboService.list_supported_tokens,
-        wallet_type,
-        wallet_subtype,
+        CoboService.list_transactions,
+        request_id,
+        cobo_ids,
+        transaction_ids,
+        transaction_hashes,
+        types,
+        statuses,
+        wallet_ids,
         chain_ids,
         token_ids,
+        asset_ids,
+        vault_id,
+        project_id,
+        min_created_timestamp,
+        max_created_timestamp,
         limit,
         before,
         after,
@@ -291,26 +618,9 @@ async def list_supported_tokens(
     )
 
 
-@router.get("/wallets/check_address_validity")
-async def check_address_validity(
-    chain_id: str = Query(...),
-    address: str = Query(...),
-    # %if app_type == portal
-    org_id: str = Depends(get_org_id),
-    # %endif
-):
-    return await execute_service_call(
-        CoboService.check_address_validity,
-        chain_id,
-        address,
-        # %if app_type == portal
-        request_org_id=org_id,
-        # %endif
-    )
-
-
-@router.get("/transactions")
-async def list_transactions(
+@router.get("/transactions/export")
+async def export_transactions(
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
     request_id: Optional[str] = None,
     cobo_ids: Optional[str] = None,
     transaction_ids: Optional[str] = None,
@@ -325,14 +635,11 @@ async def list_transactions(
     project_id: Optional[str] = None,
     min_created_timestamp: Optional[int] = None,
     max_created_timestamp: Optional[int] = None,
-    limit: int = Query(default=10, ge=1, le=50),
-    before: Optional[str] = None,
-    after: Optional[str] = None,
     # %if app_type == portal
     org_id: str = Depends(get_org_id),
     # %endif
 ):
-    return await execute_service_call(
+    pages = export_pages(
         CoboService.list_transactions,
         request_id,
         cobo_ids,
@@ -348,13 +655,11 @@ async def list_transactions(
         project_id,
         min_created_timestamp,
         max_created_timestamp,
-        limit,
-        before,
-        after,
         # %if app_type == portal
         request_org_id=org_id,
         # %endif
     )
+    return export_response(pages, export_format, "transactions")
 
 
 @router.get("/transactions/{transaction_id}")
@@ -411,6 +716,38 @@ async def create_transfer_transaction(
     )
 
 
+@router.post("/transactions/transfer/batch")
+async def create_transfer_transactions(
+    transfers: Annotated[
+        List[Dict[str, Any]],
+        Body(min_length=1, max_length=settings.BATCH_TRANSFER_MAX_ITEMS),
+    ],
+    batch_id: Annotated[Optional[str], Body()] = None,
+    # %if app_type == portal
+    org_id: str = Depends(get_org_id),
+    # %endif
+):
+    """Submit many transfers; NDJSON, one line per transfer as it completes.
+
+    Each transfer is a Cobo ``TransferParams`` body. Transfers without a
+    ``request_id`` get one derived from ``batch_id`` and their index, so
+    retrying the same batch does not duplicate transfers; without a
+    ``batch_id`` they get random ones, returned on each line, and a retry
+    must reuse those.
+    The last line is ``{"summary": {"total", "succeeded", "failed"}}``.
+    """
+    results = transfer_batch_results(
+        transfers,
+        batch_id,
+        # %if app_type == portal
+        request_org_id=org_id,
+        # %endif
+    )
+    return StreamingResponse(
+        stream_transfer_results(results), media_type="application/x-ndjson"
+    )
+
+
 @router.post("/transactions/contract_call")
 async def create_contract_call_transaction(
     request_id: Annotated[str, Body()],
@@ -482,11 +819,52 @@ async def handle_webhook(
     org_id: str = Depends(get_org_id),
     # %endif
 ):
-    payload = await request.json()
-    return await execute_service_call(
-        CoboService.handle_webhook,
-        payload,
-        # %if app_type == portal
-        request_org_id=org_id,
-        # %endif
+    """Verify and persist a delivery, then ACK; it is handled in the background.
+
+    Redeliveries of an event_id that was already received are ACKed with
+    ``duplicate: true`` and not handled again.
+    """
+    body = await request.body()
+    # orjson rejects bodies that are not UTF-8, so the signature check below
+    # can decode it
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        payload = None
+    if not isinstance(payload, dict):
+        return JSONResponse(
+            content={"status": "error", "message": "Invalid webhook payload"},
+            status_code=400,
+        )
+    if settings.WEBHOOK_VERIFY_SIGNATURE and not verify_webhook_signature(
+        request, body
+    ):
+        return JSONResponse(
+            content={"status": "error", "message": "Invalid webhook signature"},
+            status_code=401,
+        )
+    try:
+        accepted = await webhook_queue.enqueue(
+            payload.get("event_id"),
+            body,
+            # %if app_type == portal
+            org_id=org_id,
+            # %endif
+        )
+    except Exception as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)}, status_code=500
+        )
+    return JSONResponse(content={"status": "success", "duplicate": not accepted})
+
+
+def verify_webhook_signature(request: Request, body: bytes) -> bool:
+    signature = request.headers.get("biz-resp-signature")
+    timestamp = request.headers.get("biz-timestamp")
+    if not signature or not timestamp:
+        return False
+    return SignHelper.verify(
+        pub_key=settings.webhook_pubkey,
+        signature=signature,
+        content=f"{body.decode()}|{timestamp}",
     )
@@ -7,6 +7,7 @@ from jwt import InvalidTokenError
 
 from app.cache import portal_user_payload_cache
 from app.config import settings
+from app.tracing import tracer
 
 
 credentials_exception = HTTPException(
@@ -25,15 +26,17 @@ async def token_header(Authorization: str = Header(...)):
 
 async def get_current_user(token: Annotated[str, Depends(token_header)]):
 
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        sub = payload.get("sub")
-        org_id = payload.get("org_id")
-        if sub is None or org_id is None:
+    with tracer.start_as_current_span("auth.jwt_decode"):
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+            sub = payload.get("sub")
+            org_id = payload.get("org_id")
+            if sub is None or org_id is None:
+                raise credentials_exception
+        except InvalidTokenError:
             raise credentials_exception
-    except InvalidTokenError:
-        raise credentials_exception
-    user_payload = portal_user_payload_cache.get(f"{sub}-{org_id}")
+    with tracer.start_as_current_span("auth.user_payload"):
+        user_payload = await portal_user_payload_cache.aget(f"{sub}-{org_id}")
     if user_payload is None:
         raise credentials_exception
     return user_payload
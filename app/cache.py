@@ -1,2 +1,27 @@
-portal_user_payload_cache = {}
-portal_org_token_cache = {}
+from app.cache_backend import create_cache
+from app.config import settings
+
+portal_user_payload_cache = create_cache(
+    "portal_user_payload",
+    backend=settings.CACHE_BACKEND,
+    url=settings.CACHE_URL,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.PORTAL_USER_PAYLOAD_TTL,
+)
+portal_org_token_cache = create_cache(
+    "portal_org_token",
+    backend=settings.CACHE_BACKEND,
+    url=settings.CACHE_URL,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.PORTAL_ORG_TOKEN_TTL,
+)
+
+
+portal_caches = {
+    "portal_user_payload": portal_user_payload_cache,
+    "portal_org_token": portal_org_token_cache,
+}
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in portal_caches.items()}
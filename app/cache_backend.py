@@ -0,0 +1,371 @@
+import asyncio
+import json
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+_MISSING = object()
+
+
+class CacheBackend(ABC):
+    """A bounded key/value cache with per-entry expiry.
+
+    Backends support the subset of the ``dict`` interface the app uses
+    (``cache[key]``, ``cache[key] = value``, ``cache.get(key)``, ``del``)
+    and count hits, misses and evictions for ``stats()``. Values must be JSON
+    serializable so that shared backends can store them. Code running on the
+    event loop uses the async ``aget``, ``aset`` and ``adelete``, which keep
+    the I/O of shared backends off the loop.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    def _get(self, key: str) -> Any:
+        """Return the live value for ``key`` or ``_MISSING``."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._get(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        return self.get(key, default)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.set(key, value, ttl)
+
+    async def adelete(self, key: str):
+        self.delete(key)
+
+    @property
+    def size(self) -> int:
+        return len(self)
+
+    async def refresh_size(self):
+        """Update ``size`` where counting the entries is I/O."""
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": self.size,
+        }
+
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.ttl if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self.set(key, value)
+
+    def __delitem__(self, key: str):
+        self.delete(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self._get(key) is not _MISSING
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache; entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries: int = 10000, ttl: Optional[float] = None):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[Optional[float], Any]]" = OrderedDict()
+
+    def _get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            self.evictions += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (self._expires_at(ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SharedCache(CacheBackend):
+    """Base of the backends that do blocking I/O.
+
+    Their async methods run on a thread of their own, like the SDK calls, so
+    a slow disk or cache server delays only the requests waiting for the
+    cache. The calls are serialized by the backends anyway, so one thread
+    is enough. ``size`` is the count from the last ``len()`` or
+    ``refresh_size()``.
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None):
+        super().__init__(ttl)
+        self._size = 0
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix=f"cache-{name}")
+
+    async def _run(self, func, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        return await self._run(self.get, key, default)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self._run(self.set, key, value, ttl)
+
+    async def adelete(self, key: str):
+        await self._run(self.delete, key)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    async def refresh_size(self):
+        await self._run(len, self)
+
+
+class FileCache(SharedCache):
+    """SQLite-backed cache shared by every worker process on the host.
+
+    Each named cache is a table in the same database file. LRU order is kept
+    in ``accessed_at``; when ``max_entries`` is exceeded the least recently
+    read rows are deleted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+    ):
+        super().__init__(name, ttl)
+        self.max_entries = max_entries
+        self._table = f"cache_{name}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self._table}_lru "
+            f"ON {self._table} (accessed_at)"
+        )
+
+    def _get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                self.evictions += 1
+                return _MISSING
+            self._conn.execute(
+                f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), self._expires_at(ttl), time.time()),
+            )
+            overflow = self._count() - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    f"DELETE FROM {self._table} WHERE key IN (SELECT key FROM "
+                    f"{self._table} ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+
+    def _count(self) -> int:
+        """Row count; the caller holds ``_lock``."""
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self._table}")
+        self._size = count.fetchone()[0]
+        return self._size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+
+class RedisCache(SharedCache):
+    """Cache on any server speaking the Redis protocol (RESP2).
+
+    Only ``GET``, ``SET ... PX``, ``DEL`` and ``SCAN`` are used, over one
+    socket per process. Size bounds and LRU eviction are left to the server
+    (``maxmemory`` with an ``allkeys-lru`` policy), so ``evictions`` stays 0.
+    """
+
+    def __init__(self, url: str, name: str, ttl: Optional[float] = None):
+        super().__init__(name, ttl)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.prefix = f"cobo:{name}:"
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=5)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", str(self.db))
+
+    def _send(self, *args: str) -> Any:
+        payload = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode()
+            payload.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(payload))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            return [self._read_reply() for _ in range(int(rest))]
+        raise RuntimeError(f"Unexpected reply from cache server: {line!r}")
+
+    def _command(self, *args: str) -> Any:
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*args)
+                except (OSError, ConnectionError):
+                    self.close()
+                    if attempt:
+                        raise
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = None
+        self._file = None
+
+    def _get(self, key: str) -> Any:
+        value = self._command("GET", self.prefix + key)
+        return _MISSING if value is None else json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        args = ["SET", self.prefix + key, json.dumps(value)]
+        ttl = self.ttl if ttl is None else ttl
+        if ttl:
+            args += ["PX", str(int(ttl * 1000))]
+        self._command(*args)
+
+    def delete(self, key: str):
+        self._command("DEL", self.prefix + key)
+
+    def __len__(self) -> int:
+        # Only this cache's keys; SCAN walks them without blocking the server
+        pattern = "".join(f"\\{c}" if c in "*?[]\\" else c for c in self.prefix)
+        cursor, count = "0", 0
+        while True:
+            cursor, keys = self._command(
+                "SCAN", cursor, "MATCH", pattern + "*", "COUNT", "1000"
+            )
+            count += len(keys)
+            if cursor == "0":
+                break
+        self._size = count
+        return count
+
+
+def create_cache(
+    name: str,
+    backend: str = "memory",
+    url: str = "",
+    max_entries: int = 10000,
+    ttl: Optional[float] = None,
+) -> CacheBackend:
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries, ttl=ttl)
+    if backend == "file":
+        return FileCache(url or "cache.sqlite3", name, max_entries=max_entries, ttl=ttl)
+    if backend == "redis":
+        return RedisCache(url or "redis://127.0.0.1:6379/0", name, ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -12,19 +12,149 @@ class Settings:
     SECRET_KEY = os.getenv("SECRET_KEY", "")
     COBO_APP_SECRET: str = os.getenv("COBO_APP_SECRET", "")
     COBO_APP_CLIENT_ID: str = os.getenv("COBO_APP_CLIENT_ID", "")
+    # Per-organization SDK clients: LRU size, idle eviction (s), total sockets
+    COBO_ORG_CLIENTS_MAX: int = int(os.getenv("COBO_ORG_CLIENTS_MAX", "64"))
+    COBO_ORG_CLIENT_IDLE_TTL: float = float(
+        os.getenv("COBO_ORG_CLIENT_IDLE_TTL", "900")
+    )
+    COBO_MAX_CONNECTIONS: int = int(os.getenv("COBO_MAX_CONNECTIONS", "256"))
+    # Lifetime (s) of cached login payloads and org OAuth tokens
+    PORTAL_USER_PAYLOAD_TTL: float = float(
+        os.getenv("PORTAL_USER_PAYLOAD_TTL", "86400")
+    )
+    PORTAL_ORG_TOKEN_TTL: float = float(os.getenv("PORTAL_ORG_TOKEN_TTL", "604800"))
+    # Org access tokens are refreshed this long (s) before they expire
+    PORTAL_ORG_TOKEN_REFRESH_MARGIN: float = float(
+        os.getenv("PORTAL_ORG_TOKEN_REFRESH_MARGIN", "300")
+    )
+    # JWKS refresh when the response has no max-age, and unknown-kid refetch floor
+    JWKS_DEFAULT_MAX_AGE: float = float(os.getenv("JWKS_DEFAULT_MAX_AGE", "300"))
+    JWKS_MIN_REFETCH_INTERVAL: float = float(
+        os.getenv("JWKS_MIN_REFETCH_INTERVAL", "30")
+    )
     # %else
     COBO_API_SECRET: str = os.getenv("COBO_API_SECRET", "")
     # %endif
     COBO_ENV: str = os.getenv("COBO_ENV", "dev")
+    # Override of the WaaS endpoint, for the benchmark stub only: the SDK
+    # verifies response signatures with Cobo's key for the official hosts and
+    # fails on any other, so StubCoboServer.attach() swaps in its own key.
+    COBO_API_HOST: str = os.getenv("COBO_API_HOST", "")
+    # Upper bound on concurrent blocking SDK calls per worker process
+    COBO_SDK_MAX_WORKERS: int = int(os.getenv("COBO_SDK_MAX_WORKERS", "32"))
+    # Client-side limits on upstream calls, per org and API family: calls/s
+    # (0 = no rate limit, the default; set them to the org's Cobo quota),
+    # burst size, longest a call queues for capacity (s), and the range the
+    # adaptive in-flight limit moves in. The in-flight limit starts at its
+    # maximum and shrinks when Cobo answers 429/5xx or slows down.
+    COBO_RATE_LIMIT_WALLETS: float = float(os.getenv("COBO_RATE_LIMIT_WALLETS", "0"))
+    COBO_RATE_LIMIT_TRANSACTIONS: float = float(
+        os.getenv("COBO_RATE_LIMIT_TRANSACTIONS", "0")
+    )
+    COBO_RATE_LIMIT_BURST: float = float(os.getenv("COBO_RATE_LIMIT_BURST", "20"))
+    COBO_RATE_LIMIT_MAX_WAIT: float = float(os.getenv("COBO_RATE_LIMIT_MAX_WAIT", "2"))
+    COBO_CONCURRENCY_INITIAL: int = int(os.getenv("COBO_CONCURRENCY_INITIAL", "32"))
+    COBO_CONCURRENCY_MAX: int = int(os.getenv("COBO_CONCURRENCY_MAX", "32"))
+    # Upstream call resilience: timeout per attempt and for the whole call (s),
+    # retries of idempotent calls with jittered backoff (s), and the circuit
+    # breaker per host: consecutive failures to open it, time until a probe (s)
+    COBO_REQUEST_TIMEOUT: float = float(os.getenv("COBO_REQUEST_TIMEOUT", "10"))
+    COBO_CALL_DEADLINE: float = float(os.getenv("COBO_CALL_DEADLINE", "30"))
+    COBO_RETRY_MAX_ATTEMPTS: int = int(os.getenv("COBO_RETRY_MAX_ATTEMPTS", "3"))
+    COBO_RETRY_BASE_DELAY: float = float(os.getenv("COBO_RETRY_BASE_DELAY", "0.2"))
+    COBO_RETRY_MAX_DELAY: float = float(os.getenv("COBO_RETRY_MAX_DELAY", "5"))
+    COBO_BREAKER_FAILURES: int = int(os.getenv("COBO_BREAKER_FAILURES", "5"))
+    COBO_BREAKER_RESET_TIMEOUT: float = float(
+        os.getenv("COBO_BREAKER_RESET_TIMEOUT", "30")
+    )
+    # Cache backend: "memory" (per process), "file" (SQLite path in CACHE_URL,
+    # shared by workers on one host) or "redis" (redis://host:port/db)
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_URL: str = os.getenv("CACHE_URL", "")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    # Reference data responses: fresh lifetime per endpoint, then stale window (s)
+    RESPONSE_CACHE_CHAINS_TTL: float = float(
+        os.getenv("RESPONSE_CACHE_CHAINS_TTL", "300")
+    )
+    RESPONSE_CACHE_TOKENS_TTL: float = float(
+        os.getenv("RESPONSE_CACHE_TOKENS_TTL", "300")
+    )
+    RESPONSE_CACHE_STALE_TTL: float = float(
+        os.getenv("RESPONSE_CACHE_STALE_TTL", "3600")
+    )
+    # Page size used when streaming exports walk the upstream cursor (max 50)
+    EXPORT_PAGE_SIZE: int = int(os.getenv("EXPORT_PAGE_SIZE", "50"))
+    # POST /api/wallets/balances: wallets per request, wallets fetched at once
+    BULK_BALANCE_MAX_WALLETS: int = int(os.getenv("BULK_BALANCE_MAX_WALLETS", "500"))
+    BULK_BALANCE_CONCURRENCY: int = int(os.getenv("BULK_BALANCE_CONCURRENCY", "16"))
+    # POST /api/transactions/transfer/batch: transfers per request, submitted
+    # at once, attempts per transfer when rate limited (429)
+    BATCH_TRANSFER_MAX_ITEMS: int = int(os.getenv("BATCH_TRANSFER_MAX_ITEMS", "1000"))
+    BATCH_TRANSFER_CONCURRENCY: int = int(os.getenv("BATCH_TRANSFER_CONCURRENCY", "8"))
+    BATCH_TRANSFER_MAX_ATTEMPTS: int = int(
+        os.getenv("BATCH_TRANSFER_MAX_ATTEMPTS", "5")
+    )
+    # Webhook inbox: SQLite file, handler workers, redelivery dedup window (s)
+    WEBHOOK_QUEUE_PATH: str = os.getenv("WEBHOOK_QUEUE_PATH", "webhooks.db")
+    WEBHOOK_WORKERS: int = int(os.getenv("WEBHOOK_WORKERS", "4"))
+    WEBHOOK_DEDUP_TTL: float = float(os.getenv("WEBHOOK_DEDUP_TTL", "86400"))
+    # Reject deliveries without a valid Cobo signature; WEBHOOK_PUBKEY (hex)
+    # replaces Cobo's key for COBO_ENV, e.g. for a local stub
+    WEBHOOK_VERIFY_SIGNATURE: bool = (
+        os.getenv("WEBHOOK_VERIFY_SIGNATURE", "true").lower() == "true"
+    )
+    WEBHOOK_PUBKEY: str = os.getenv("WEBHOOK_PUBKEY", "")
+    # Request and Cobo call metrics, served in Prometheus format at /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Label the per-org limiter metrics with the org id. /metrics needs no
+    # token, so this publishes every org id to whoever can reach it.
+    METRICS_ORG_LABELS: bool = (
+        os.getenv("METRICS_ORG_LABELS", "false").lower() == "true"
+    )
+    # Tracing: exporter "none", "memory" (last TRACE_MAX_SPANS spans) or "file"
+    # (JSON lines in TRACE_FILE); share of new traces that are recorded
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "none")
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "traces.jsonl")
+    TRACE_MAX_SPANS: int = int(os.getenv("TRACE_MAX_SPANS", "10000"))
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+    # Admin endpoints (/admin/*) need this in X-Admin-Token; empty disables them
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    # On-demand profiles: longest run (s) and default sampling interval (s)
+    PROFILE_MAX_SECONDS: float = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+    PROFILE_INTERVAL: float = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+    # Requests slower than this (s) are profiled into SLOW_REQUEST_PROFILE_DIR;
+    # 0 disables the capture
+    SLOW_REQUEST_THRESHOLD: float = float(os.getenv("SLOW_REQUEST_THRESHOLD", "0"))
+    SLOW_REQUEST_PROFILE_DIR: str = os.getenv("SLOW_REQUEST_PROFILE_DIR", "profiles")
+    # Logging: level, "text" or "json" lines, share of records below WARNING
+    # kept per logger ("app.services=0.1,..."), keys whose values are masked
+    # (also matches "*_<key>"), records buffered for the writer thread
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
+    LOG_REDACT_FIELDS: str = os.getenv("LOG_REDACT_FIELDS", "address,amount")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
     @property
     def api_host(self) -> str:
+        if self.COBO_API_HOST:
+            return self.COBO_API_HOST
         if self.COBO_ENV == "sandbox":
             return "https://api.sandbox.cobo.com/v2"
         if self.COBO_ENV == "prod":
             return "https://api.cobo.com/v2"
         return "https://api.dev.cobo.com/v2"
 
+    @property
+    def webhook_pubkey(self) -> str:
+        if self.WEBHOOK_PUBKEY:
+            return self.WEBHOOK_PUBKEY
+        if self.COBO_ENV == "sandbox":
+            return "893d8a6112ae22429a7453599256391d7928e16870ecab888ee3ce65febada08"
+        if self.COBO_ENV == "prod":
+            return "8d4a482641adb2a34b726f05827dba9a9653e5857469b8749052bf4458a86729"
+        return "a04ea1d5fa8da71f1dcfccf972b9c4eba0a2d8aba1f6da26f49977b08a0d2718"
+
     # %if app_type == portal
     @property
     def jks_url(self) -> str:
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import jwt
+
+from app.config import settings
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class JWKSCache:
+    """Signing keys from the Cobo JWKS endpoint, indexed by ``kid``.
+
+    Keys are fetched once and refreshed in the background whenever the
+    ``Cache-Control: max-age`` of the last response runs out. A token signed
+    with an unknown ``kid`` triggers at most one refetch per
+    ``min_refetch_interval`` seconds, and concurrent refetches share a single
+    request, so a burst of logins after a key rotation costs one download.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        default_max_age: float = 300,
+        min_refetch_interval: float = 30,
+    ):
+        self.url = url
+        self.default_max_age = default_max_age
+        self.min_refetch_interval = min_refetch_interval
+        self._jwks: Dict[str, Dict[str, Any]] = {}
+        self._keys: Dict[Tuple[str, str], Any] = {}
+        self._max_age = default_max_age
+        self._fetched_at: Optional[float] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._flight = SingleFlight()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10)
+        return self._client
+
+    async def get_key(self, kid: str, alg: str):
+        if self._fetched_at is None:
+            await self.refresh()
+        key = self._keys.get((kid, alg))
+        if key is not None:
+            return key
+        jwk = self._jwks.get(kid)
+        if jwk is None and self._can_refetch():
+            await self.refresh()
+            jwk = self._jwks.get(kid)
+        if jwk is None:
+            return None
+        key = jwt.get_algorithm_by_name(alg).from_jwk(jwk)
+        self._keys[(kid, alg)] = key
+        return key
+
+    async def refresh(self):
+        await self._flight.do(self.url, self._fetch)
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def aclose(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _can_refetch(self) -> bool:
+        return (
+            self._fetched_at is None
+            or time.monotonic() - self._fetched_at >= self.min_refetch_interval
+        )
+
+    async def _fetch(self):
+        response = await self.client.get(self.url)
+        response.raise_for_status()
+        jwks = response.json()
+        self._jwks = {key["kid"]: key for key in jwks["keys"]}
+        self._keys = {}
+        match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+        self._max_age = int(match.group(1)) if match else self.default_max_age
+        self._fetched_at = time.monotonic()
+
+    async def _refresh_periodically(self):
+        while True:
+            await asyncio.sleep(max(self._max_age, self.min_refetch_interval))
+            try:
+                await self._flight.do(self.url, self._fetch)
+            except Exception as e:
+                logger.warning(f"Failed to refresh JWKS from {self.url}: {e}")
+
+
+jwks_cache = JWKSCache(
+    settings.jks_url,
+    default_max_age=settings.JWKS_DEFAULT_MAX_AGE,
+    min_refetch_interval=settings.JWKS_MIN_REFETCH_INTERVAL,
+)
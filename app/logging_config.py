@@ -0,0 +1,257 @@
+import atexit
+import logging
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+import orjson
+
+from app.config import settings
+from app.tracing import current_span
+
+# Attributes every LogRecord has; anything else was passed in ``extra``
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "trace_id",
+    "span_id",
+}
+
+REDACTED = "[REDACTED]"
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+TEXT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_sampling(value: str) -> Dict[str, float]:
+    """``"app.services=0.1,app.webhook_queue=0.5"`` -> {logger prefix: rate}."""
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.strip().partition("=")
+        if name and rate:
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a share of the records below WARNING from chosen loggers.
+
+    ``rates`` maps logger names to the share kept; a name also covers its
+    child loggers and the longest match wins. Warnings and errors are always
+    kept. The rate of each logger is resolved once.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.dropped = 0
+        self._resolved: Dict[str, Optional[float]] = {}
+
+    def _rate(self, name: str) -> Optional[float]:
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+        rate, matched = None, ""
+        for prefix, value in self.rates.items():
+            if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > len(
+                matched
+            ):
+                rate, matched = value, prefix
+        self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate is None or rate >= 1 or random.random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class RedactingFilter(logging.Filter):
+    """Mask sensitive fields in log arguments and ``extra`` values.
+
+    A key is sensitive if it is one of ``fields`` or ends with ``_<field>``,
+    so ``address`` also covers ``to_address`` and ``amount`` covers
+    ``fee_amount``. Dicts and lists in the arguments are copied with the
+    values masked, at any depth; the caller's objects are left untouched.
+    Values that are not in a keyed structure can't be recognised, so log
+    addresses and amounts as ``extra`` fields rather than in the message.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        super().__init__()
+        self.fields: FrozenSet[str] = frozenset(f.strip().lower() for f in fields)
+        self._suffixes = tuple(f"_{field}" for field in self.fields)
+
+    def sensitive(self, key: Any) -> bool:
+        if not isinstance(key, str):
+            return False
+        key = key.lower()
+        return key in self.fields or key.endswith(self._suffixes)
+
+    def redact(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {
+                k: REDACTED if self.sensitive(k) else self.redact(v)
+                for k, v in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.redact(v) for v in value)
+        return value
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.fields:
+            return True
+        if record.args:
+            record.args = self.redact(record.args)
+        for key in record.__dict__.keys() - _RECORD_ATTRS:
+            value = record.__dict__[key]
+            if self.sensitive(key):
+                record.__dict__[key] = REDACTED
+            elif isinstance(value, (dict, list, tuple)):
+                record.__dict__[key] = self.redact(value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in record.__dict__.keys() - _RECORD_ATTRS:
+            entry[key] = record.__dict__[key]
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id is not None:
+            entry["trace_id"] = trace_id
+            entry["span_id"] = record.span_id
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode()
+
+    def formatTime(self, record: logging.LogRecord, datefmt=None) -> str:
+        seconds = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+        return f"{seconds}.{int(record.msecs):03d}Z"
+
+
+class BackgroundHandler(QueueHandler):
+    """Hand records to a ``QueueListener`` thread that formats and writes them.
+
+    Unlike ``QueueHandler`` the message is not formatted here: the record
+    goes on the queue with its arguments, so the logging thread only pays
+    for the filters and a queue put. The trace and span ids are taken now,
+    as the context they live in is gone by the time the record is written.
+    When the queue is full the record is dropped and counted, so a slow or
+    blocked stream never stalls the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        span = current_span.get()
+        if span is not None:
+            record.trace_id = f"{span.trace_id:032x}"
+            record.span_id = f"{span.span_id:016x}"
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """The root handler, its filters and the writer thread behind them."""
+
+    def __init__(
+        self,
+        level: str = "INFO",
+        format: str = "text",
+        sampling: Optional[Dict[str, float]] = None,
+        redact_fields: Iterable[str] = (),
+        queue_size: int = 10000,
+        stream=None,
+    ):
+        self.level = level.upper()
+        self.sampler = SamplingFilter(sampling or {})
+        self.redactor = RedactingFilter(redact_fields)
+        self.handler = BackgroundHandler(queue.Queue(queue_size))
+        self.handler.addFilter(self.sampler)
+        self.handler.addFilter(self.redactor)
+        output = logging.StreamHandler(stream or sys.stderr)
+        if format == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter(TEXT_FORMAT, TEXT_DATEFMT))
+        self.listener = QueueListener(self.handler.queue, output)
+        self._running = False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.handler.queue.qsize(),
+            "sampled_out": self.sampler.dropped,
+            "dropped": self.handler.dropped,
+        }
+
+    def install(self, logger: Optional[logging.Logger] = None) -> "LogPipeline":
+        logger = logger or logging.getLogger()
+        logger.setLevel(self.level)
+        logger.addHandler(self.handler)
+        self.listener.start()
+        self._running = True
+        return self
+
+    def uninstall(self, logger: Optional[logging.Logger] = None):
+        """Detach the handler and write out what is still queued."""
+        (logger or logging.getLogger()).removeHandler(self.handler)
+        if self._running:
+            self.listener.stop()
+            self._running = False
+
+
+pipeline: Optional[LogPipeline] = None
+
+
+def configure_logging(**overrides) -> LogPipeline:
+    """Route the root logger through a ``LogPipeline`` built from settings.
+
+    Replaces the pipeline of an earlier call; handlers added by others, such
+    as pytest's, are left in place.
+    """
+    global pipeline
+    if pipeline is not None:
+        pipeline.uninstall()
+    options = {
+        "level": settings.LOG_LEVEL,
+        "format": settings.LOG_FORMAT,
+        "sampling": parse_sampling(settings.LOG_SAMPLING),
+        "redact_fields": [f for f in settings.LOG_REDACT_FIELDS.split(",") if f],
+        "queue_size": settings.LOG_QUEUE_SIZE,
+    }
+    options.update(overrides)
+    pipeline = LogPipeline(**options).install()
+    return pipeline
+
+
+@atexit.register
+def _flush():
+    if pipeline is not None:
+        pipeline.uninstall()
@@ -1,24 +1,41 @@
-import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import router as api_router
+from app.api.routes import router as api_router, webhook_queue
 
 # %if app_type == portal
 from app.api.auth import router as auth_router
+from app.jwks import jwks_cache
 
 # %endif
+from app.api.admin import router as admin_router
+from app.api.metrics import router as metrics_router
 from app.config import settings
+from app.logging_config import configure_logging
+from app.metrics import MetricsMiddleware
+from app.profiling import SlowRequestMiddleware, SlowRequestMonitor
+from app.services.cobo_service import CoboService
+from app.tracing import TracingMiddleware, tracer
+
+# Configure logging; records are written by a background thread
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume deliveries that were persisted but not handled before a restart
+    await webhook_queue.start()
+    yield
+    await webhook_queue.stop()
+    # %if app_type == portal
+    await jwks_cache.aclose()
+    # %endif
+    CoboService.shutdown()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add middlewares
 app.add_middleware(
@@ -28,11 +45,27 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.SLOW_REQUEST_THRESHOLD > 0:
+    app.add_middleware(
+        SlowRequestMiddleware,
+        monitor=SlowRequestMonitor(
+            settings.SLOW_REQUEST_THRESHOLD,
+            settings.SLOW_REQUEST_PROFILE_DIR,
+            interval=settings.PROFILE_INTERVAL,
+            max_duration=settings.PROFILE_MAX_SECONDS,
+        ),
+    )
+app.add_middleware(TracingMiddleware, tracer=tracer)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router, prefix="/api", tags=["API"])
 # %if app_type == portal
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 # %endif
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
+app.include_router(admin_router, prefix="/admin", tags=["Admin"])
 
 
 @app.get("/")
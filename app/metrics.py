@@ -0,0 +1,305 @@
+import bisect
+import contextvars
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets (s), from local cache hits up to calls that hit the deadline
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# (labels, value) pairs produced by a collector at scrape time
+Samples = Iterable[Tuple[Dict[str, Any], float]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label values.
+
+    Metrics are only updated from the event loop thread, so plain dict updates
+    need no lock; work in other threads reports back through the loop.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """A value per label values that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: Any, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: Any):
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed ``buckets`` per label values.
+
+    Each observation is one bisect and one increment; the cumulative
+    counts Prometheus expects are only computed when rendering.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *labels: Any):
+        counts = self._values.get(labels)
+        if counts is None:
+            counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def count(self, *labels: Any) -> int:
+        counts = self._values.get(labels)
+        return sum(counts[:-1]) if counts else 0
+
+    def total(self, *labels: Any) -> float:
+        counts = self._values.get(labels)
+        return counts[-1] if counts else 0.0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, counts in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_number(counts[-1])}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics rendered in the Prometheus text format.
+
+    Besides the metrics it holds, ``add_collector`` registers gauges that
+    are read at scrape time from existing ``stats()`` methods, so the
+    components keep their plain counters and pay nothing per request.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Tuple[str, str, str, Callable[[], Samples]]] = []
+
+    def register(self, metric: _Metric) -> Any:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(
+        self, name: str, help: str, collect: Callable[[], Samples], kind: str = "gauge"
+    ):
+        self._collectors.append((name, help, kind, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for name, help, kind, collect in self._collectors:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in collect():
+                lines.append(
+                    f"{name}{_labels(list(labels), list(labels.values()))} "
+                    f"{_number(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route and status",
+    ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route, until the response is fully sent",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests being handled", ("method",)
+)
+cobo_call_duration = registry.histogram(
+    "cobo_call_duration_seconds",
+    "Cobo SDK calls as seen by the caller, including rate limiting and retries",
+    ("method",),
+)
+cobo_call_phase = registry.histogram(
+    "cobo_call_phase_seconds",
+    "Time of each Cobo SDK attempt spent queued for an SDK worker, waiting on "
+    "the upstream response, or in local signing and (de)serialization",
+    ("method", "phase"),
+)
+cobo_call_errors = registry.counter(
+    "cobo_call_errors_total",
+    "Failed Cobo SDK calls by HTTP status or exception type",
+    ("method", "error"),
+)
+
+# Upstream time of the SDK call running in the current worker thread
+upstream_seconds: contextvars.ContextVar[Optional[List[float]]] = (
+    contextvars.ContextVar("upstream_seconds", default=None)
+)
+
+
+def timed_upstream(request: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap the SDK's REST ``request`` to add its time to ``upstream_seconds``.
+
+    The response body is read here, so that reading it counts as upstream
+    time too; the SDK reads it right after anyway and keeps the bytes.
+    """
+
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = request(*args, **kwargs)
+            response.read()
+            return response
+        finally:
+            spent = upstream_seconds.get()
+            if spent is not None:
+                spent[0] += time.perf_counter() - started
+
+    return timed
+
+
+def run_timed(phases: List[float], func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run an SDK call in a worker thread, filling ``[started, total, upstream]``.
+
+    ``phases`` is only written here and read by the loop after the call, so
+    the split needs no lock.
+    """
+    started = time.perf_counter()
+    phases[0] = started
+    spent = [0.0]
+    token = upstream_seconds.set(spent)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        upstream_seconds.reset(token)
+        phases[1] = time.perf_counter() - started
+        phases[2] = spent[0]
+
+
+class MetricsMiddleware:
+    """Count and time requests per route template.
+
+    A plain ASGI middleware, so streamed responses are timed until their last
+    chunk. Requests that match no route share the ``unmatched`` label, which
+    keeps scanners from creating a series per path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+        http_requests_in_flight.inc(method)
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            http_requests_in_flight.dec(method)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_requests.inc(method, route, status)
+            http_request_duration.observe(time.perf_counter() - started, method, route)
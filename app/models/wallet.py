@@ -21,6 +21,11 @@ class WalletSubtype(str, Enum):
     SAFE_WALLET = "Safe{Wallet}"
 
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class Token(BaseModel):
     symbol: str
     balance: float
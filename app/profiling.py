@@ -0,0 +1,249 @@
+import logging
+import os
+import sys
+import itertools
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# (thread name, frames from the outermost call to the innermost)
+Stack = Tuple[str, Tuple[Tuple[str, str, int], ...]]
+
+
+class Profile:
+    """Stacks counted by a ``SamplingProfiler``, exportable for flame graphs."""
+
+    def __init__(self, samples: "Counter[Stack]", interval: float, duration: float):
+        self.samples = samples
+        self.interval = interval
+        self.duration = duration
+
+    def collapsed(self) -> str:
+        """Folded stacks, one ``thread;outer;...;inner count`` line each.
+
+        The input format of flamegraph.pl; speedscope opens it as well.
+        """
+        lines = []
+        for (thread, frames), count in self.samples.most_common():
+            names = [thread]
+            names += [f"{name} ({file}:{line})" for name, file, line in frames]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "profile") -> Dict[str, Any]:
+        """A speedscope file with one sampled profile per thread."""
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Tuple[str, str, int], int] = {}
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for (thread, stack), count in self.samples.items():
+            profile = profiles.setdefault(
+                thread,
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "samples": [],
+                    "weights": [],
+                },
+            )
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    name, file, line = frame
+                    frames.append({"name": name, "file": file, "line": line})
+                sample.append(index[frame])
+            profile["samples"].append(sample)
+            profile["weights"].append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "cobo-waas2-demo",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread every ``interval`` seconds.
+
+    Sampling runs in its own thread through ``sys._current_frames``, so the
+    code being profiled is not instrumented and runs at full speed between
+    samples. The event loop thread shows what blocks the loop; the SDK
+    worker threads show where upstream calls wait.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: "Counter[Stack]" = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._labels: Dict[Any, Tuple[str, str, int]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return Profile(self.samples, self.interval, time.monotonic() - self._started)
+
+    def _label(self, code) -> Tuple[str, str, int]:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                code.co_name,
+                code.co_filename,
+                code.co_firstlineno,
+            )
+        return label
+
+    def sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            frames.reverse()
+            self.samples[(names.get(ident, str(ident)), tuple(frames))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+class SlowRequestMonitor:
+    """Profile requests that take longer than ``threshold`` seconds.
+
+    Requests only register their start time, a dict insert and delete, so
+    the monitor costs nothing measurable while requests are fast. A watchdog
+    thread checks the running requests every ``threshold / 4`` (at most
+    0.25 s); once one is over the threshold it samples the whole process
+    until that request finishes, or for at most ``max_duration``, even if
+    the request blocks the event loop. The profile is written to
+    ``directory`` as a speedscope file, keeping the newest ``keep``. One
+    request is captured at a time, and each request at most once.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        directory: str,
+        interval: float = 0.005,
+        max_duration: float = 60.0,
+        keep: int = 20,
+    ):
+        self.threshold = threshold
+        self.directory = directory
+        self.interval = interval
+        self.max_duration = max_duration
+        self.keep = keep
+        self.captured = 0
+        self._ids = itertools.count()
+        self._active: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+        self._captured: Set[int] = set()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def begin(self, scope: Dict[str, Any]) -> int:
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="slow-request-watchdog", daemon=True
+            )
+            self._watchdog.start()
+        key = next(self._ids)
+        self._active[key] = (time.monotonic(), scope)
+        return key
+
+    def end(self, key: int):
+        self._active.pop(key, None)
+        self._captured.discard(key)
+
+    def _watch(self):
+        check_interval = min(self.threshold / 4, 0.25)
+        while True:
+            time.sleep(check_interval)
+            now = time.monotonic()
+            for key, (started, scope) in self._active.copy().items():
+                if now - started >= self.threshold and key not in self._captured:
+                    self._captured.add(key)
+                    self._capture(key, started, scope)
+                    break
+
+    def _capture(self, key: int, started: float, scope: Dict[str, Any]):
+        profiler = SamplingProfiler(self.interval).start()
+        until = time.monotonic() + self.max_duration
+        while key in self._active and time.monotonic() < until:
+            time.sleep(self.interval)
+        profile = profiler.stop()
+        elapsed = time.monotonic() - started
+        route = getattr(scope.get("route"), "path", scope.get("path", ""))
+        name = f"{scope.get('method')} {route}"
+        try:
+            path = self._write(profile, name)
+        except OSError as e:
+            logger.error(f"Failed to save profile of slow request {name}: {e}")
+            return
+        self.captured += 1
+        logger.warning(
+            f"Slow request {name} took {elapsed:.2f}s, "
+            f"{profile.duration:.2f}s of it profiled to {path}"
+        )
+
+    def _write(self, profile: Profile, name: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        slug = "".join(c if c.isalnum() else "_" for c in name).strip("_")
+        # Millisecond timestamps keep the names unique and in capture order
+        path = os.path.join(
+            self.directory, f"{time.time_ns() // 1_000_000}-{slug}.speedscope.json"
+        )
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(profile.speedscope(name)))
+        saved = sorted(
+            entry.path
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".speedscope.json")
+        )
+        for old in saved[: -self.keep]:
+            os.remove(old)
+        return path
+
+
+class SlowRequestMiddleware:
+    """Register each HTTP request with a ``SlowRequestMonitor``."""
+
+    def __init__(self, app, monitor: SlowRequestMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        key = self.monitor.begin(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.end(key)
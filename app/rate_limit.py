@@ -0,0 +1,247 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Hashable, Optional
+
+
+class RateLimitExceeded(Exception):
+    """No upstream capacity became available within the allowed wait."""
+
+    status = 429
+
+    def __init__(self, key: Hashable, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {key}, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def retry_after(e: Exception) -> Optional[float]:
+    """Seconds a 429 or 503 asks the caller to wait, if it says."""
+    if isinstance(getattr(e, "retry_after", None), (int, float)):
+        return e.retry_after
+    try:
+        return float(dict(getattr(e, "headers", None) or {}).get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """``rate`` calls per second with bursts of up to ``burst``.
+
+    Tokens are reserved in arrival order, so a caller that has to wait gets a
+    fixed start time instead of competing again when it wakes up.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token; seconds until it may be used."""
+        self._refill()
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def refund(self):
+        self.tokens += 1
+
+    def pause(self, seconds: float):
+        """Hand out no new tokens for ``seconds``, e.g. after a 429."""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class AdaptiveConcurrency:
+    """Limit on in-flight calls, adjusted AIMD-style.
+
+    Each call that completes within ``latency_tolerance`` times the lowest
+    recent latency raises the limit by ``1 / limit`` (about one per round of
+    calls) up to ``maximum``. A 429 or 5xx halves it, a slow call cuts it by
+    10%, down to ``minimum``; at most one decrease per round trip, so a burst
+    of errors caused by the same overload only counts once.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 64,
+        latency_tolerance: float = 2.0,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.min_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to ``timeout``; False if none freed up."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return True
+        except BaseException as e:
+            if waiter.done():
+                # Granted just as the wait ended: pass the slot on
+                self.in_flight -= 1
+                self._wake()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                return False
+            raise
+
+    def release(self, latency: Optional[float], overloaded: bool = False):
+        """Free a slot; ``latency`` of a completed call, None if it failed."""
+        self.in_flight -= 1
+        now = time.monotonic()
+        if overloaded:
+            self._decrease(now, 0.5)
+        elif latency is not None:
+            # Let the baseline drift up slowly, so it follows upstream changes
+            if self.min_latency is None or latency < self.min_latency:
+                self.min_latency = latency
+            else:
+                self.min_latency *= 1.01
+            if latency > self.latency_tolerance * self.min_latency:
+                self._decrease(now, 0.9)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _decrease(self, now: float, factor: float):
+        if now - self._last_decrease < (self.min_latency or 0.0):
+            return
+        self.limit = max(self.minimum, self.limit * factor)
+        self._last_decrease = now
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class _Limit:
+    def __init__(self, rate: float, burst: float, concurrency: AdaptiveConcurrency):
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.concurrency = concurrency
+        self.throttled = 0
+        self.rejected = 0
+
+
+class UpstreamLimiter:
+    """Client-side rate and concurrency limits per (org, API family).
+
+    ``rates`` maps an API family (e.g. ``"wallets"``) to calls per second;
+    calls to other families pass straight through. Each key gets a token
+    bucket and an ``AdaptiveConcurrency`` limit. A call that would wait more
+    than ``max_wait`` seconds for either raises ``RateLimitExceeded``; shorter
+    waits are queued. An upstream 429 also stops the bucket for its
+    Retry-After. Keys beyond ``max_keys`` evict the least recently used idle
+    key.
+    """
+
+    def __init__(
+        self,
+        rates: Dict[str, float],
+        burst: float,
+        max_wait: float,
+        initial_concurrency: int,
+        max_concurrency: int,
+        max_keys: int = 1024,
+    ):
+        self.rates = rates
+        self.burst = burst
+        self.max_wait = max_wait
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_keys = max_keys
+        self._limits: "OrderedDict[Hashable, _Limit]" = OrderedDict()
+
+    def _limit(self, key: Hashable, family: str) -> _Limit:
+        limit = self._limits.get(key)
+        if limit is not None:
+            self._limits.move_to_end(key)
+            return limit
+        if len(self._limits) >= self.max_keys:
+            for old_key, old in self._limits.items():
+                if old.concurrency.in_flight == 0:
+                    del self._limits[old_key]
+                    break
+        limit = _Limit(
+            self.rates[family],
+            self.burst,
+            AdaptiveConcurrency(
+                min(self.initial_concurrency, self.max_concurrency),
+                maximum=self.max_concurrency,
+            ),
+        )
+        self._limits[key] = limit
+        return limit
+
+    @asynccontextmanager
+    async def slot(
+        self, org_id: Optional[str], family: Optional[str]
+    ) -> AsyncIterator[None]:
+        if family not in self.rates:
+            yield
+            return
+        key = (org_id, family)
+        limit = self._limit(key, family)
+        wait = limit.bucket.reserve() if limit.bucket else 0.0
+        if wait > self.max_wait:
+            limit.bucket.refund()
+            limit.rejected += 1
+            raise RateLimitExceeded(key, wait)
+        if wait:
+            await asyncio.sleep(wait)
+        if not await limit.concurrency.acquire(self.max_wait - wait):
+            # The call never reaches Cobo, so it gives back its token
+            if limit.bucket:
+                limit.bucket.refund()
+            limit.rejected += 1
+            raise RateLimitExceeded(key, limit.concurrency.min_latency or 1.0)
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            status = getattr(e, "status", None) or 0
+            if status == 429:
+                limit.throttled += 1
+                if limit.bucket:
+                    limit.bucket.pause(retry_after(e) or 1.0)
+            limit.concurrency.release(None, overloaded=status == 429 or status >= 500)
+            raise
+        except BaseException:
+            limit.concurrency.release(None)
+            raise
+        limit.concurrency.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            f"{org_id or '-'}/{family}": {
+                "concurrency_limit": int(limit.concurrency.limit),
+                "in_flight": limit.concurrency.in_flight,
+                "queued": len(limit.concurrency._waiters),
+                "throttled": limit.throttled,
+                "rejected": limit.rejected,
+            }
+            for (org_id, family), limit in self._limits.items()
+        }
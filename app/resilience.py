@@ -0,0 +1,148 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from cobo_waas2.exceptions import ApiException
+from urllib3.exceptions import HTTPError
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Calls to a host are failing fast while its circuit is open."""
+
+    status = 503
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Upstream {host} is unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(e: Exception) -> bool:
+    """A timeout, connection error or 5xx: worth retrying, counts against the host."""
+    status = getattr(e, "status", None)
+    if status is not None:
+        return status >= 500
+    return isinstance(e, (HTTPError, TimeoutError, ConnectionError))
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive upstream failures.
+
+    While open, calls fail with ``CircuitOpenError``. After ``reset_timeout``
+    seconds one call is let through as a probe; its success closes the
+    circuit, its failure keeps it open for another ``reset_timeout``.
+    """
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def before_call(self):
+        if self.state == "closed":
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if elapsed < self.reset_timeout:
+            raise CircuitOpenError(self.host, self.reset_timeout - elapsed)
+        # Let this call probe; the others keep failing fast meanwhile
+        self.state = "half_open"
+        self.opened_at = time.monotonic()
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class Resilience:
+    """Deadlines, retries and per-host circuit breakers for upstream calls.
+
+    ``call`` runs ``attempt(timeout)`` with the per-attempt ``request_timeout``,
+    cut short to what remains of the overall ``deadline``. Retryable calls
+    are retried on upstream failures up to ``max_attempts`` times, after a
+    random delay of up to ``base_delay * 2**n`` (capped at ``max_delay``), as
+    long as the retry can start before the deadline. Only idempotent calls
+    should be retryable: reads, and writes carrying a request_id, which Cobo
+    refuses to execute twice.
+    """
+
+    def __init__(
+        self,
+        request_timeout: float,
+        deadline: float,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        failure_threshold: int,
+        reset_timeout: float,
+    ):
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retries = 0
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                host, self.failure_threshold, self.reset_timeout
+            )
+        return breaker
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def call(
+        self,
+        host: str,
+        attempt: Callable[[float], Awaitable[T]],
+        retryable: bool,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline
+        breaker = self.breaker(host)
+        attempts = self.max_attempts if retryable else 1
+        for n in range(attempts):
+            breaker.before_call()
+            timeout = min(self.request_timeout, deadline_at - loop.time())
+            try:
+                result = await attempt(max(timeout, 0.001))
+            except Exception as e:
+                if not is_upstream_failure(e):
+                    # Cobo answered, so the host is up, even if it refused
+                    if isinstance(e, ApiException):
+                        breaker.record_success()
+                    raise
+                breaker.record_failure()
+                delay = self.backoff(n)
+                if n + 1 == attempts or loop.time() + delay >= deadline_at:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retries": self.retries,
+            "breakers": {
+                host: {"state": breaker.state, "failures": breaker.failures}
+                for host, breaker in self._breakers.items()
+            },
+        }
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import Request, Response
+
+from app.cache_backend import CacheBackend
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Read-through cache of successful JSON response bodies.
+
+    An entry is served as-is for ``ttl`` seconds. For ``stale_ttl`` seconds
+    after that it is still served, while one background reload refreshes it
+    (stale-while-revalidate). Concurrent misses for the same key share one
+    upstream call. Responses carry an ``ETag`` so browsers can revalidate
+    with ``If-None-Match`` and get an empty ``304``.
+    """
+
+    def __init__(self, store: CacheBackend):
+        self.store = store
+        self.flight = SingleFlight()
+        self._refreshes: Set[asyncio.Task] = set()
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        ttl: float,
+        stale_ttl: float,
+        loader: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        entry = await self.store.aget(key)
+        if entry is None:
+            loaded = await self.flight.do(
+                key, lambda: self._load(key, ttl, stale_ttl, loader)
+            )
+            if isinstance(loaded, Response):
+                return loaded
+            entry = loaded
+        elif entry["fresh_until"] <= time.time() and key not in self.flight:
+            task = asyncio.create_task(
+                self.flight.do(key, lambda: self._load(key, ttl, stale_ttl, loader))
+            )
+            self._refreshes.add(task)
+            task.add_done_callback(self._refreshed)
+        return self._render(request, entry, ttl)
+
+    async def _load(
+        self,
+        key: str,
+        ttl: float,
+        stale_ttl: float,
+        loader: Callable[[], Awaitable[Response]],
+    ):
+        response = await loader()
+        if response.status_code != 200:
+            return response
+        body = bytes(response.body)
+        entry = {
+            "body": body.decode(),
+            "etag": f'"{hashlib.sha1(body).hexdigest()}"',
+            "fresh_until": time.time() + ttl,
+        }
+        await self.store.aset(key, entry, ttl=ttl + stale_ttl)
+        return entry
+
+    def _refreshed(self, task: asyncio.Task):
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background refresh failed: {task.exception()}")
+
+    @staticmethod
+    def _render(request: Request, entry: Dict, ttl: float) -> Response:
+        max_age = max(0, int(min(ttl, entry["fresh_until"] - time.time())))
+        headers = {
+            "ETag": entry["etag"],
+            "Cache-Control": f"private, max-age={max_age}",
+        }
+        if _etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=entry["body"], media_type="application/json", headers=headers
+        )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,70 @@
+import asyncio
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from app.services.cobo_service import CoboService
+from app.services.pagination import iter_pages
+
+BALANCE_FIELDS = ("total", "available", "pending", "locked")
+
+
+async def _wallet_balances(wallet_id: str, token_ids: Optional[str]) -> List[Any]:
+    balances = []
+    async for items in iter_pages(
+        lambda after: CoboService.get_wallet_balance(
+            wallet_id, token_ids, limit=50, before=None, after=after
+        )
+    ):
+        balances.extend(items)
+    return balances
+
+
+async def iter_wallet_balances(
+    wallet_ids: Iterable[str], token_ids: Optional[str], concurrency: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Fetch every page of balances for each wallet, ``concurrency`` at a time.
+
+    Results are yielded as wallets complete. A failing wallet yields an error
+    entry instead of failing the others.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(wallet_id: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                balances = await _wallet_balances(wallet_id, token_ids)
+            except Exception as e:
+                return {"wallet_id": wallet_id, "status": "error", "message": str(e)}
+            return {"wallet_id": wallet_id, "status": "success", "data": balances}
+
+    tasks = [asyncio.ensure_future(fetch(w)) for w in dict.fromkeys(wallet_ids)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class BalanceTotals:
+    """Sum of token balances across wallets, per token_id."""
+
+    def __init__(self):
+        self._totals: Dict[str, Dict[str, Decimal]] = defaultdict(
+            lambda: dict.fromkeys(BALANCE_FIELDS, Decimal(0))
+        )
+
+    def add(self, result: Dict[str, Any]):
+        for token_balance in result.get("data") or []:
+            totals = self._totals[token_balance.token_id]
+            for field in BALANCE_FIELDS:
+                value = getattr(token_balance.balance, field)
+                if value:
+                    totals[field] += Decimal(value)
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        return {
+            token_id: {field: str(value) for field, value in totals.items()}
+            for token_id, totals in self._totals.items()
+        }
@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from cobo_waas2.exceptions import ApiException
+from cobo_waas2.models import TransferParams
+
+from app.rate_limit import RateLimitExceeded, retry_after
+from app.services.cobo_service import CoboService
+
+_REQUEST_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "cobo-waas2/batch-transfer")
+
+
+def batch_request_ids(
+    transfers: List[Dict[str, Any]], batch_id: Optional[str] = None
+) -> List[str]:
+    """The request_id of each transfer: its own, or one made up for it.
+
+    With a ``batch_id`` the made-up ids depend only on it and the transfer's
+    position, so resubmitting the same batch reuses them and Cobo refuses
+    the transfers that already went through instead of sending them twice.
+    Without one each transfer gets a random id: two batches with the same
+    contents, such as a recurring payroll, are separate payouts.
+    """
+    if batch_id is None:
+        return [
+            transfer.get("request_id") or str(uuid.uuid4()) for transfer in transfers
+        ]
+    return [
+        transfer.get("request_id")
+        or str(uuid.uuid5(_REQUEST_ID_NAMESPACE, f"{batch_id}:{index}"))
+        for index, transfer in enumerate(transfers)
+    ]
+
+
+def retry_delay(e: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying a 429: Retry-After, else exponential."""
+    delay = retry_after(e)
+    return delay if delay is not None else 0.5 * 2**attempt
+
+
+async def iter_transfer_submissions(
+    transfers: List[Dict[str, Any]],
+    batch_id: Optional[str],
+    concurrency: int,
+    max_attempts: int = 5,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Submit each transfer, ``concurrency`` at a time, yielding as they finish.
+
+    Each result carries the transfer's ``index`` and ``request_id``. A
+    transfer that fails validation or is rejected yields an error entry
+    without affecting the others. A 429 pauses every submission of the batch
+    for its Retry-After; the rate-limited transfer is retried with the same
+    request_id, up to ``max_attempts`` attempts in total.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    resume_at = 0.0
+
+    async def submit(index: int, request_id: str, transfer: Dict[str, Any]):
+        nonlocal resume_at
+        result = {"index": index, "request_id": request_id}
+        try:
+            params = TransferParams.from_dict({**transfer, "request_id": request_id})
+        except ValueError as e:
+            return {**result, "status": "error", "message": str(e)}
+        async with semaphore:
+            for attempt in range(max_attempts):
+                delay = resume_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    data = await CoboService.submit_transfer(params)
+                except (ApiException, RateLimitExceeded) as e:
+                    if e.status == 429 and attempt + 1 < max_attempts:
+                        resume_at = max(
+                            resume_at, loop.time() + retry_delay(e, attempt)
+                        )
+                        continue
+                    return {**result, "status": "error", "message": str(e)}
+                except Exception as e:
+                    return {**result, "status": "error", "message": str(e)}
+                return {**result, "status": "success", "data": data}
+
+    request_ids = batch_request_ids(transfers, batch_id)
+    tasks = [
+        asyncio.ensure_future(submit(index, request_id, transfer))
+        for index, (request_id, transfer) in enumerate(zip(request_ids, transfers))
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import cobo_waas2
+
+
+class CoboApiClientPool:
+    """Long-lived SDK clients keyed by organization.
+
+    Each org keeps one client (and therefore one urllib3 connection pool) for
+    as long as it is in use, so token changes and concurrent requests from
+    other orgs no longer rebuild clients or drop keep-alive connections.
+    Clients are evicted least-recently-used once ``max_clients`` is exceeded
+    and after ``idle_ttl`` seconds without use. ``max_connections`` is split
+    evenly between the clients so the number of idle sockets kept open stays
+    bounded no matter how many orgs are active.
+
+    The pool is only touched from the event loop and does no locking.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., cobo_waas2.ApiClient],
+        max_clients: int,
+        idle_ttl: float,
+        max_connections: int,
+    ):
+        self.factory = factory
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self.connections_per_client = max(1, max_connections // max_clients)
+        self._clients: "OrderedDict[str, tuple[cobo_waas2.ApiClient, float]]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, org_id: str) -> bool:
+        return self.get(org_id) is not None
+
+    def is_active(self, org_id: str) -> bool:
+        """Whether the org has a client in use, without counting as a use."""
+        entry = self._clients.get(org_id)
+        return entry is not None and time.monotonic() - entry[1] < self.idle_ttl
+
+    def get(self, org_id: str) -> Optional[cobo_waas2.ApiClient]:
+        self.evict_idle()
+        entry = self._clients.get(org_id)
+        if entry is None:
+            return None
+        self._clients[org_id] = (entry[0], time.monotonic())
+        self._clients.move_to_end(org_id)
+        return entry[0]
+
+    def set_access_token(self, org_id: str, access_token: str) -> cobo_waas2.ApiClient:
+        """Install ``access_token`` on the org's client, creating it if needed."""
+        client = self.get(org_id)
+        if client is None:
+            client = self.factory(
+                access_token=access_token,
+                pool_maxsize=self.connections_per_client,
+            )
+            self._clients[org_id] = (client, time.monotonic())
+            while len(self._clients) > self.max_clients:
+                _, (evicted, _) = self._clients.popitem(last=False)
+                self._close(evicted)
+        else:
+            client.configuration.access_token = access_token
+            client.default_headers["Authorization"] = f"Bearer {access_token}"
+        return client
+
+    def evict_idle(self):
+        deadline = time.monotonic() - self.idle_ttl
+        while self._clients:
+            org_id, (client, last_used) = next(iter(self._clients.items()))
+            if last_used > deadline:
+                break
+            del self._clients[org_id]
+            self._close(client)
+
+    def remove(self, org_id: str):
+        entry = self._clients.pop(org_id, None)
+        if entry is not None:
+            self._close(entry[0])
+
+    def close(self):
+        while self._clients:
+            _, (client, _) = self._clients.popitem()
+            self._close(client)
+
+    @staticmethod
+    def _close(client: cobo_waas2.ApiClient):
+        client.rest_client.pool_manager.clear()
@@ -1,10 +1,19 @@
+import asyncio
+import contextvars
+import functools
 import logging
-from typing import Optional, List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Callable, TypeVar
 
+# %if app_type == portal
+from contextlib import contextmanager
+
+# %endif
 import cobo_waas2
 
 # %if app_type == portal
-from cobo_waas2 import OAuthApi, Configuration
+from cobo_waas2 import OAuthApi, Configuration, RefreshTokenRequest
 
 # %else
 from cobo_waas2 import Configuration
@@ -12,16 +21,37 @@ from cobo_waas2 import Configuration
 # %endif
 from cobo_waas2.api import WalletsApi, TransactionsApi
 from cobo_waas2.exceptions import ApiException
-from cobo_waas2.models import WalletType, WalletSubtype
+from cobo_waas2.models import TransferParams, WalletType, WalletSubtype
 
 # %if app_type == portal
 from app.cache import portal_org_token_cache
+from app.services.client_pool import CoboApiClientPool
+from app.services.org_tokens import OrgTokenManager
 
 # %endif
 from app.config import settings
+from app.metrics import (
+    cobo_call_duration,
+    cobo_call_errors,
+    cobo_call_phase,
+    run_timed,
+    timed_upstream,
+)
+from app.rate_limit import UpstreamLimiter
+from app.resilience import Resilience
+from app.tracing import propagating, tracer
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# %if app_type == portal
+# Organization the current request acts for; selects its client from the pool.
+current_org_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_org_id", default=None
+)
+# %endif
+
 
 class CoboApiClient(cobo_waas2.ApiClient):
     def __init__(
@@ -29,6 +59,7 @@ class CoboApiClient(cobo_waas2.ApiClient):
         # %if app_type == portal
         access_token: Optional[str] = None,
         # %endif
+        pool_maxsize: Optional[int] = None,
     ) -> None:
         # %if app_type == portal
         api_private_key = settings.COBO_APP_SECRET
@@ -42,7 +73,18 @@ class CoboApiClient(cobo_waas2.ApiClient):
             access_token=access_token
             # %endif
         )
+        # One pooled connection per SDK worker thread, so concurrent calls reuse
+        # keep-alive sockets instead of opening and discarding extra ones.
+        configuration.connection_pool_maxsize = (
+            pool_maxsize or settings.COBO_SDK_MAX_WORKERS
+        )
+        # Retries are CoboService.resilience's job; urllib3's own would repeat
+        # timed-out requests with no backoff, outside the call deadline
+        configuration.retries = False
         super().__init__(configuration)
+        self.rest_client.request = propagating(
+            timed_upstream(self.rest_client.request), tracer
+        )
         # %if app_type == portal
         if access_token:
             self.default_headers[
@@ -53,35 +95,263 @@ class CoboApiClient(cobo_waas2.ApiClient):
 
 class CoboService:
     cobo_api_client: cobo_waas2.ApiClient = CoboApiClient()
+    # %if app_type == portal
+    client_pool = CoboApiClientPool(
+        CoboApiClient,
+        max_clients=settings.COBO_ORG_CLIENTS_MAX,
+        idle_ttl=settings.COBO_ORG_CLIENT_IDLE_TTL,
+        max_connections=settings.COBO_MAX_CONNECTIONS,
+    )
+    org_tokens = OrgTokenManager(
+        portal_org_token_cache,
+        get_token=lambda org_id: CoboService.oauth_token(org_id),
+        refresh_token=lambda token: CoboService.oauth_refresh_token(token),
+        on_token=lambda org_id, token: CoboService.set_auth_access_token(org_id, token),
+        refresh_margin=settings.PORTAL_ORG_TOKEN_REFRESH_MARGIN,
+        is_active=lambda org_id: CoboService.client_pool.is_active(org_id),
+    )
+    # %endif
+    _executor: Optional[ThreadPoolExecutor] = None
+    # SDK reads, safe to repeat
+    IDEMPOTENT_CALLS = frozenset(
+        {
+            "list_wallets",
+            "get_wallet_by_id",
+            "list_token_balances_for_wallet",
+            "list_addresses",
+            "list_supported_chains",
+            "list_supported_tokens",
+            "check_address_validity",
+            "list_transactions",
+            "get_transaction_by_id",
+        }
+    )
+    # SDK writes, safe to repeat only when the body carries a request_id
+    REQUEST_ID_CALLS = frozenset(
+        {
+            "create_transfer_transaction",
+            "create_contract_call_transaction",
+            "create_message_sign_transaction",
+        }
+    )
+    resilience = Resilience(
+        request_timeout=settings.COBO_REQUEST_TIMEOUT,
+        deadline=settings.COBO_CALL_DEADLINE,
+        max_attempts=settings.COBO_RETRY_MAX_ATTEMPTS,
+        base_delay=settings.COBO_RETRY_BASE_DELAY,
+        max_delay=settings.COBO_RETRY_MAX_DELAY,
+        failure_threshold=settings.COBO_BREAKER_FAILURES,
+        reset_timeout=settings.COBO_BREAKER_RESET_TIMEOUT,
+    )
+    # Upstream rate and adaptive concurrency limits per (org, API family)
+    API_FAMILIES = {WalletsApi: "wallets", TransactionsApi: "transactions"}
+    limiter = UpstreamLimiter(
+        {
+            "wallets": settings.COBO_RATE_LIMIT_WALLETS,
+            "transactions": settings.COBO_RATE_LIMIT_TRANSACTIONS,
+        },
+        burst=settings.COBO_RATE_LIMIT_BURST,
+        max_wait=settings.COBO_RATE_LIMIT_MAX_WAIT,
+        initial_concurrency=settings.COBO_CONCURRENCY_INITIAL,
+        max_concurrency=settings.COBO_CONCURRENCY_MAX,
+    )
+    # Methods without side effects: identical concurrent calls may share a result
+    READ_METHODS = frozenset(
+        {
+            "list_wallets",
+            "get_wallet_by_id",
+            "get_wallet_balance",
+            "get_wallet_transactions",
+            "list_wallet_addresses",
+            "list_supported_chains",
+            "list_supported_tokens",
+            "check_address_validity",
+            "list_transactions",
+            "get_transaction_by_id",
+        }
+    )
+
+    @classmethod
+    def get_api_client(cls) -> cobo_waas2.ApiClient:
+        # %if app_type == portal
+        org_id = current_org_id.get()
+        if org_id is not None:
+            client = cls.client_pool.get(org_id)
+            if client is not None:
+                return client
+        # %endif
+        return cls.cobo_api_client
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=settings.COBO_SDK_MAX_WORKERS,
+                thread_name_prefix="cobo-sdk",
+            )
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+        # %if app_type == portal
+        cls.org_tokens.close()
+        cls.client_pool.close()
+        # %endif
+
+    @classmethod
+    def _retryable(cls, method: str, args: tuple) -> bool:
+        if method in cls.IDEMPOTENT_CALLS:
+            return True
+        if method not in cls.REQUEST_ID_CALLS or not args:
+            return False
+        body = args[0]
+        if isinstance(body, dict):
+            return bool(body.get("request_id"))
+        return bool(getattr(body, "request_id", None))
+
+    @classmethod
+    async def _call(cls, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking SDK call on the SDK worker pool.
+
+        The generated ``cobo_waas2`` APIs are synchronous (urllib3), so calling
+        them directly would stall the event loop for the whole upstream round
+        trip. The caller's context variables are carried into the worker thread.
+
+        Wallets and transactions calls go through ``limiter`` first, so bursts
+        queue briefly on the client instead of drawing 429s from Cobo. SDK
+        calls run under ``resilience``: each attempt has a request timeout,
+        ``IDEMPOTENT_CALLS`` and ``REQUEST_ID_CALLS`` whose body has a
+        request_id are retried on timeouts and 5xx, and a host that keeps
+        failing is short-circuited.
+
+        Each call is timed into the ``app.metrics`` histograms, per attempt
+        split into time queued for a worker, spent waiting on Cobo, and spent
+        locally signing and (de)serializing. It is also traced as a span,
+        with a child span and ``traceparent`` header per HTTP request.
+        """
+        loop = asyncio.get_running_loop()
+        api = getattr(func, "__self__", None)
+        family = cls.API_FAMILIES.get(type(api))
+        method = func.__name__
+        org_id = None
+        # %if app_type == portal
+        org_id = current_org_id.get()
+        # %endif
+
+        async def attempt(timeout: Optional[float] = None) -> T:
+            call_kwargs = kwargs
+            if timeout is not None and "_request_timeout" not in kwargs:
+                call_kwargs = {**kwargs, "_request_timeout": timeout}
+            async with cls.limiter.slot(org_id, family):
+                # [started, total, upstream], filled in by the worker thread
+                phases = [0.0, 0.0, 0.0]
+                # Copied here so the SDK request nests under this call's span
+                ctx = contextvars.copy_context()
+                submitted = time.perf_counter()
+                try:
+                    return await loop.run_in_executor(
+                        cls.get_executor(),
+                        functools.partial(
+                            ctx.run, run_timed, phases, func, *args, **call_kwargs
+                        ),
+                    )
+                finally:
+                    if phases[1]:
+                        cobo_call_phase.observe(phases[0] - submitted, method, "queued")
+                        cobo_call_phase.observe(phases[2], method, "upstream")
+                        cobo_call_phase.observe(phases[1] - phases[2], method, "local")
+
+        started = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(
+                f"cobo {method}", {"cobo.family": family or "other"}
+            ):
+                if not isinstance(
+                    getattr(api, "api_client", None), cobo_waas2.ApiClient
+                ):
+                    return await attempt()
+                return await cls.resilience.call(
+                    api.api_client.configuration.host,
+                    attempt,
+                    retryable=cls._retryable(method, args),
+                )
+        except Exception as e:
+            cobo_call_errors.inc(method, getattr(e, "status", None) or type(e).__name__)
+            raise
+        finally:
+            cobo_call_duration.observe(time.perf_counter() - started, method)
 
     # %if app_type == portal
+    @classmethod
+    @contextmanager
+    def use_org(cls, org_id: str):
+        token = current_org_id.set(org_id)
+        try:
+            yield
+        finally:
+            current_org_id.reset(token)
+
+    @classmethod
+    async def ensure_org_client(cls, org_id: str):
+        """Make sure ``org_id`` has a client with a current access token.
+
+        Tokens come from ``org_tokens``, which refreshes them ahead of expiry;
+        a client evicted from the pool is rebuilt from the cached token.
+        """
+        access_token = await cls.org_tokens.access_token(org_id)
+        client = cls.client_pool.get(org_id)
+        if client is None or client.configuration.access_token != access_token:
+            cls.set_auth_access_token(org_id, access_token)
+
     @classmethod
     async def set_token_by_org_id(cls, org_id: str):
-        resp = await CoboService.oauth_token(org_id)
-        access_token = resp.access_token
-        refresh_token = resp.refresh_token
-        portal_org_token_cache[org_id] = dict(
-            access_token=access_token,
-            refresh_token=refresh_token,
+        await cls.org_tokens.authorize(org_id)
+
+    @classmethod
+    async def refresh_org_token(cls, org_id: str):
+        """Replace the org's token after Cobo rejected it."""
+        client = cls.client_pool.get(org_id)
+        await cls.org_tokens.refresh(
+            org_id, replacing=client.configuration.access_token if client else None
         )
-        CoboService.set_auth_access_token(access_token)
 
     @classmethod
-    def set_auth_access_token(cls, access_token: str):
-        cls.cobo_api_client = CoboApiClient(access_token=access_token)
+    def set_auth_access_token(cls, org_id: str, access_token: str):
+        cls.client_pool.set_access_token(org_id, access_token)
 
     @classmethod
     async def oauth_token(cls, org_id: str):
         api_instance = OAuthApi(cls.cobo_api_client)
         try:
             logger.info("Calling OAuthApi -> get_token")
-            return api_instance.get_token(
+            return await cls._call(
+                api_instance.get_token,
                 client_id=settings.COBO_APP_CLIENT_ID,
                 org_id=org_id,
                 grant_type="org_implicit",
             )
         except ApiException as e:
-            logger.error(f"Exception when calling OAuthApi -> get_token: {e}\n")
+            logger.error("Exception when calling OAuthApi -> get_token: %s", e)
+            raise
+
+    @classmethod
+    async def oauth_refresh_token(cls, refresh_token: str):
+        api_instance = OAuthApi(cls.cobo_api_client)
+        try:
+            logger.info("Calling OAuthApi -> refresh_token")
+            return await cls._call(
+                api_instance.refresh_token,
+                RefreshTokenRequest(
+                    client_id=settings.COBO_APP_CLIENT_ID,
+                    grant_type="refresh_token",
+                    refresh_token=refresh_token,
+                ),
+            )
+        except ApiException as e:
+            logger.error("Exception when calling OAuthApi -> refresh_token: %s", e)
             raise
 
     # %endif
@@ -97,10 +367,11 @@ class CoboService:
         before: Optional[str] = None,
         after: Optional[str] = None,
     ):
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info("Calling WalletsApi -> list_wallets")
-            api_response = api_instance.list_wallets(
+            api_response = await cls._call(
+                api_instance.list_wallets,
                 wallet_type=wallet_type,
                 wallet_subtype=wallet_subtype,
                 project_id=project_id,
@@ -111,7 +382,7 @@ class CoboService:
             )
             return api_response
         except ApiException as e:
-            logger.error(f"Exception when calling WalletsApi -> list_wallets: {e}\n")
+            logger.error("Exception when calling WalletsApi -> list_wallets: %s", e)
             raise
 
     @classmethod
@@ -123,12 +394,14 @@ class CoboService:
         before: Optional[str] = None,
         after: Optional[str] = None,
     ):
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info(
-                f"Calling WalletsApi -> list_token_balances_for_wallet for wallet_id: {wallet_id}"
+                "Calling WalletsApi -> list_token_balances_for_wallet for wallet_id: %s",
+                wallet_id,
             )
-            api_response = api_instance.list_token_balances_for_wallet(
+            api_response = await cls._call(
+                api_instance.list_token_balances_for_wallet,
                 wallet_id,
                 token_ids=token_ids,
                 limit=limit,
@@ -138,7 +411,8 @@ class CoboService:
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling WalletsApi -> list_token_balances_for_wallet: {e}\n"
+                "Exception when calling WalletsApi -> list_token_balances_for_wallet: %s",
+                e,
             )
             raise
 
@@ -156,12 +430,14 @@ class CoboService:
         before: Optional[str] = None,
         after: Optional[str] = None,
     ):
-        api_instance = TransactionsApi(cls.cobo_api_client)
+        api_instance = TransactionsApi(cls.get_api_client())
         try:
             logger.info(
-                f"Calling TransactionsApi -> list_transactions for wallet_id: {wallet_id}"
+                "Calling TransactionsApi -> list_transactions for wallet_id: %s",
+                wallet_id,
             )
-            api_response = api_instance.list_transactions(
+            api_response = await cls._call(
+                api_instance.list_transactions,
                 wallet_ids=wallet_id,
                 types=types,
                 statuses=statuses,
@@ -176,22 +452,22 @@ class CoboService:
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling TransactionsApi -> list_transactions: {e}\n"
+                "Exception when calling TransactionsApi -> list_transactions: %s", e
             )
             raise
 
     @classmethod
     async def deposit_to_wallet(cls, wallet_id: str, amount: float, token: str):
         # Note: Deposits are typically handled by generating an address and waiting for incoming transactions
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info(
-                f"Calling WalletsApi -> create_address for wallet_id: {wallet_id}"
+                "Calling WalletsApi -> create_address for wallet_id: %s", wallet_id
             )
-            api_response = api_instance.create_address(wallet_id)
+            api_response = await cls._call(api_instance.create_address, wallet_id)
             return api_response
         except ApiException as e:
-            logger.error(f"Exception when calling WalletsApi -> create_address: {e}\n")
+            logger.error("Exception when calling WalletsApi -> create_address: %s", e)
             return None
 
     @classmethod
@@ -208,7 +484,7 @@ class CoboService:
         force_external: Optional[bool] = None,
         force_internal: Optional[bool] = None,
     ):
-        api_instance = TransactionsApi(cls.cobo_api_client)
+        api_instance = TransactionsApi(cls.get_api_client())
         try:
             request_body = {
                 "wallet_id": wallet_id,
@@ -222,13 +498,23 @@ class CoboService:
                 "force_external": force_external,
                 "force_internal": force_internal,
             }
-            logger.info("Calling TransactionsApi -> create_transfer_transaction")
-            logger.info(f"Request body: {request_body}")
-            api_response = api_instance.create_transfer_transaction(request_body)
+            logger.info(
+                "Calling TransactionsApi -> create_transfer_transaction "
+                "for request_id: %s",
+                request_id,
+                extra={"wallet_id": wallet_id, "token_id": token},
+            )
+            # Addresses and amounts are masked unless LOG_REDACT_FIELDS is empty
+            logger.debug("Request body: %s", request_body)
+            api_response = await cls._call(
+                api_instance.create_transfer_transaction,
+                request_body,
+            )
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling TransactionsApi -> create_transfer_transaction: {e}\n"
+                "Exception when calling TransactionsApi -> create_transfer_transaction: %s",
+                e,
             )
             raise
 
@@ -236,8 +522,12 @@ class CoboService:
     async def handle_webhook(cls, payload: dict):
         # Implement webhook handling logic based on the payload
         event_type = payload.get("type")
-        logger.info(f"Handling webhook event: {event_type}")
-        logger.info(f"Webhook payload: {payload}")
+        logger.info(
+            "Handling webhook event: %s",
+            event_type,
+            extra={"event_id": payload.get("event_id")},
+        )
+        logger.debug("Webhook payload: %s", payload)
         if event_type == "transaction.created":
             # Handle new transaction
             pass
@@ -254,20 +544,24 @@ class CoboService:
         count: int = 1,
         encoding: Optional[str] = None,
     ):
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info(
-                f"Calling WalletsApi -> create_address for wallet_id: {wallet_id}"
+                "Calling WalletsApi -> create_address for wallet_id: %s", wallet_id
             )
             request_body = {
                 "chain_id": chain_id,
                 "count": count,
                 "encoding": encoding,
             }
-            api_response = api_instance.create_address(wallet_id, request_body)
+            api_response = await cls._call(
+                api_instance.create_address,
+                wallet_id,
+                request_body,
+            )
             return api_response
         except ApiException as e:
-            logger.error(f"Exception when calling WalletsApi -> create_address: {e}\n")
+            logger.error("Exception when calling WalletsApi -> create_address: %s", e)
             raise
 
     @classmethod
@@ -280,12 +574,13 @@ class CoboService:
         before: Optional[str],
         after: Optional[str],
     ):
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info(
-                f"Calling WalletsApi -> list_addresses for wallet_id: {wallet_id}"
+                "Calling WalletsApi -> list_addresses for wallet_id: %s", wallet_id
             )
-            api_response = api_instance.list_addresses(
+            api_response = await cls._call(
+                api_instance.list_addresses,
                 wallet_id,
                 chain_ids=chain_ids,
                 addresses=addresses,
@@ -295,20 +590,20 @@ class CoboService:
             )
             return api_response
         except ApiException as e:
-            logger.error(f"Exception when calling WalletsApi -> list_addresses: {e}\n")
+            logger.error("Exception when calling WalletsApi -> list_addresses: %s", e)
             raise
 
     @classmethod
     async def get_wallet_by_id(cls, wallet_id: str):
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info(
-                f"Calling WalletsApi -> get_wallet_by_id for wallet_id: {wallet_id}"
+                "Calling WalletsApi -> get_wallet_by_id for wallet_id: %s", wallet_id
             )
-            api_response = api_instance.get_wallet_by_id(wallet_id)
+            api_response = await cls._call(api_instance.get_wallet_by_id, wallet_id)
             return api_response
         except ApiException as e:
-            logger.error(f"Exception when calling WalletsApi -> get_wallet: {e}\n")
+            logger.error("Exception when calling WalletsApi -> get_wallet: %s", e)
             raise
 
     @classmethod
@@ -322,14 +617,14 @@ class CoboService:
         before: Optional[str],
         after: Optional[str],
     ):
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info("Calling WalletsApi -> list_supported_chains")
-            api_response = api_instance.list_supported_chains(
+            api_response = await cls._call(
+                api_instance.list_supported_chains,
                 wallet_type=wallet_type,
                 wallet_subtype=wallet_subtype,
                 chain_ids=chain_ids,
-                token_list_id=token_list_id,
                 limit=limit,
                 before=before,
                 after=after,
@@ -337,7 +632,7 @@ class CoboService:
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling WalletsApi -> list_supported_chains: {e}\n"
+                "Exception when calling WalletsApi -> list_supported_chains: %s", e
             )
             raise
 
@@ -352,10 +647,11 @@ class CoboService:
         before: Optional[str],
         after: Optional[str],
     ):
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info("Calling WalletsApi -> list_supported_tokens")
-            api_response = api_instance.list_supported_tokens(
+            api_response = await cls._call(
+                api_instance.list_supported_tokens,
                 wallet_type=wallet_type,
                 wallet_subtype=wallet_subtype,
                 chain_ids=chain_ids,
@@ -367,22 +663,28 @@ class CoboService:
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling WalletsApi -> list_supported_tokens: {e}\n"
+                "Exception when calling WalletsApi -> list_supported_tokens: %s", e
             )
             raise
 
     @classmethod
     async def check_address_validity(cls, chain_id: str, address: str):
-        api_instance = WalletsApi(cls.cobo_api_client)
+        api_instance = WalletsApi(cls.get_api_client())
         try:
             logger.info(
-                f"Calling WalletsApi -> check_address_validity for chain_id: {chain_id}, address: {address}"
+                "Calling WalletsApi -> check_address_validity for chain_id: %s",
+                chain_id,
+                extra={"address": address},
+            )
+            api_response = await cls._call(
+                api_instance.check_address_validity,
+                chain_id,
+                address,
             )
-            api_response = api_instance.check_address_validity(chain_id, address)
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling WalletsApi -> check_address_validity: {e}\n"
+                "Exception when calling WalletsApi -> check_address_validity: %s", e
             )
             raise
 
@@ -407,10 +709,11 @@ class CoboService:
         before: Optional[str],
         after: Optional[str],
     ):
-        api_instance = TransactionsApi(cls.cobo_api_client)
+        api_instance = TransactionsApi(cls.get_api_client())
         try:
             logger.info("Calling TransactionsApi -> list_transactions")
-            api_response = api_instance.list_transactions(
+            api_response = await cls._call(
+                api_instance.list_transactions,
                 request_id=request_id,
                 cobo_ids=cobo_ids,
                 transaction_ids=transaction_ids,
@@ -432,22 +735,26 @@ class CoboService:
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling TransactionsApi -> list_transactions: {e}\n"
+                "Exception when calling TransactionsApi -> list_transactions: %s", e
             )
             raise
 
     @classmethod
     async def get_transaction_by_id(cls, transaction_id: str):
-        api_instance = TransactionsApi(cls.cobo_api_client)
+        api_instance = TransactionsApi(cls.get_api_client())
         try:
             logger.info(
-                f"Calling TransactionsApi->get_transaction for transaction_id: {transaction_id}"
+                "Calling TransactionsApi->get_transaction for transaction_id: %s",
+                transaction_id,
+            )
+            api_response = await cls._call(
+                api_instance.get_transaction_by_id,
+                transaction_id,
             )
-            api_response = api_instance.get_transaction_by_id(transaction_id)
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling TransactionsApi -> get_transaction: {e}\n"
+                "Exception when calling TransactionsApi -> get_transaction: %s", e
             )
             raise
 
@@ -467,7 +774,7 @@ class CoboService:
         note: Optional[str],
         extra_parameters: Optional[Dict[str, Any]],
     ):
-        api_instance = TransactionsApi(cls.cobo_api_client)
+        api_instance = TransactionsApi(cls.get_api_client())
         try:
             logger.info("Calling TransactionsApi -> create_transfer_transaction")
             request_body = {
@@ -484,11 +791,34 @@ class CoboService:
                 "note": note,
                 "extra_parameters": extra_parameters,
             }
-            api_response = api_instance.create_transfer_transaction(request_body)
+            api_response = await cls._call(
+                api_instance.create_transfer_transaction,
+                request_body,
+            )
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling TransactionsApi -> create_transfer_transaction: {e}\n"
+                "Exception when calling TransactionsApi -> create_transfer_transaction: %s",
+                e,
+            )
+            raise
+
+    @classmethod
+    async def submit_transfer(cls, transfer_params: TransferParams):
+        """Create a transfer from a complete ``TransferParams`` body."""
+        api_instance = TransactionsApi(cls.get_api_client())
+        try:
+            logger.info(
+                "Calling TransactionsApi -> create_transfer_transaction for request_id: %s",
+                transfer_params.request_id,
+            )
+            return await cls._call(
+                api_instance.create_transfer_transaction, transfer_params
+            )
+        except ApiException as e:
+            logger.error(
+                "Exception when calling TransactionsApi -> create_transfer_transaction: %s",
+                e,
             )
             raise
 
@@ -508,7 +838,7 @@ class CoboService:
         note: Optional[str],
         extra_parameters: Optional[Dict[str, Any]],
     ):
-        api_instance = TransactionsApi(cls.cobo_api_client)
+        api_instance = TransactionsApi(cls.get_api_client())
         try:
             logger.info("Calling TransactionsApi -> create_contract_call_transaction")
             request_body = {
@@ -525,11 +855,15 @@ class CoboService:
                 "note": note,
                 "extra_parameters": extra_parameters,
             }
-            api_response = api_instance.create_contract_call_transaction(request_body)
+            api_response = await cls._call(
+                api_instance.create_contract_call_transaction,
+                request_body,
+            )
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling TransactionsApi -> create_contract_call_transaction: {e}\n"
+                "Exception when calling TransactionsApi -> create_contract_call_transaction: %s",
+                e,
             )
             raise
 
@@ -543,7 +877,7 @@ class CoboService:
         note: Optional[str],
         extra_parameters: Optional[Dict[str, Any]],
     ):
-        api_instance = TransactionsApi(cls.cobo_api_client)
+        api_instance = TransactionsApi(cls.get_api_client())
         try:
             logger.info("Calling TransactionsApi -> create_message_sign_transaction")
             request_body = {
@@ -554,10 +888,14 @@ class CoboService:
                 "note": note,
                 "extra_parameters": extra_parameters,
             }
-            api_response = api_instance.create_message_sign_transaction(request_body)
+            api_response = await cls._call(
+                api_instance.create_message_sign_transaction,
+                request_body,
+            )
             return api_response
         except ApiException as e:
             logger.error(
-                f"Exception when calling TransactionsApi -> create_message_sign_transaction: {e}\n"
+                "Exception when calling TransactionsApi -> create_message_sign_transaction: %s",
+                e,
             )
             raise
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.cache_backend import CacheBackend
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Wait before retrying a failed refresh-ahead, while the old token still works
+RETRY_INTERVAL = 30.0
+
+
+class OrgTokenManager:
+    """Org access tokens, refreshed before they expire.
+
+    Tokens are kept in ``cache`` as ``{access_token, refresh_token,
+    expires_at}``, so workers sharing the cache share tokens. From
+    ``refresh_margin`` seconds before a token expires, ``access_token`` still
+    returns it but starts a refresh in the background; each token also
+    schedules that refresh itself for orgs that are still ``is_active``, so
+    requests do not run into an expired token and a 401. Only a missing or
+    expired token is refreshed in the foreground.
+
+    A refresh uses the stored refresh token and falls back to a new
+    ``get_token`` grant if that fails. Concurrent refreshes of an org share
+    one call, and a token another worker already refreshed is adopted from
+    the cache instead. ``on_token`` receives every new token.
+    """
+
+    def __init__(
+        self,
+        cache: CacheBackend,
+        get_token: Callable[[str], Awaitable[Any]],
+        refresh_token: Callable[[str], Awaitable[Any]],
+        on_token: Callable[[str, str], None],
+        refresh_margin: float = 300,
+        is_active: Callable[[str], bool] = lambda org_id: True,
+    ):
+        self.cache = cache
+        self.get_token = get_token
+        self.refresh_token = refresh_token
+        self.on_token = on_token
+        self.refresh_margin = refresh_margin
+        self.is_active = is_active
+        self.refreshes = 0
+        self._flight = SingleFlight()
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._retry_at: Dict[str, float] = {}
+        # Local copy of the cached entries, read back from ``cache`` on refresh
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def _fresh(self, entry: Optional[Dict[str, Any]], now: float) -> bool:
+        """Usable without a foreground refresh; unknown expiry counts as fresh."""
+        if not entry or not entry.get("access_token"):
+            return False
+        return not entry.get("expires_at") or entry["expires_at"] > now
+
+    async def _entry(self, org_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(org_id)
+        if entry is None:
+            entry = await self.cache.aget(org_id)
+            if entry:
+                self._entries[org_id] = entry
+        return entry
+
+    async def access_token(self, org_id: str) -> str:
+        entry = await self._entry(org_id)
+        now = time.time()
+        if not self._fresh(entry, now):
+            replacing = (entry or {}).get("access_token")
+            entry = await self.refresh(org_id, replacing)
+        elif entry.get("expires_at") and (
+            entry["expires_at"] - self.refresh_margin <= now
+        ):
+            self.refresh_in_background(org_id, entry["access_token"])
+        return entry["access_token"]
+
+    async def refresh(
+        self, org_id: str, replacing: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Replace the org's token ``replacing``, e.g. one Cobo rejected."""
+        return await self._flight.do(
+            ("refresh", org_id), lambda: self._refresh(org_id, replacing)
+        )
+
+    async def authorize(self, org_id: str) -> Dict[str, Any]:
+        """A new token from a fresh grant, e.g. after the org approved the app."""
+        return await self._flight.do(("authorize", org_id), lambda: self._grant(org_id))
+
+    def refresh_in_background(self, org_id: str, replacing: Optional[str]):
+        if ("refresh", org_id) in self._flight:
+            return
+        if self._retry_at.get(org_id, 0) > time.monotonic():
+            return
+        task = asyncio.ensure_future(self._refresh_ahead(org_id, replacing))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _refresh_ahead(self, org_id: str, replacing: Optional[str]):
+        try:
+            await self.refresh(org_id, replacing)
+        except Exception as e:
+            self._retry_at[org_id] = time.monotonic() + RETRY_INTERVAL
+            logger.warning(f"Failed to refresh token for org {org_id}: {e}")
+
+    async def _refresh(self, org_id: str, replacing: Optional[str]) -> Dict[str, Any]:
+        entry = await self.cache.aget(org_id) or {}
+        now = time.time()
+        if entry.get("access_token") != replacing and self._fresh(entry, now):
+            # Another worker already refreshed it
+            self._entries[org_id] = entry
+            self.on_token(org_id, entry["access_token"])
+            self._schedule(org_id, entry)
+            return entry
+        response = None
+        if entry.get("refresh_token"):
+            try:
+                response = await self.refresh_token(entry["refresh_token"])
+            except Exception as e:
+                logger.warning(
+                    f"Refresh token for org {org_id} was not accepted, "
+                    f"requesting a new token: {e}"
+                )
+        if response is None:
+            response = await self.get_token(org_id)
+        return await self._store(org_id, response, entry.get("refresh_token"))
+
+    async def _grant(self, org_id: str) -> Dict[str, Any]:
+        return await self._store(org_id, await self.get_token(org_id))
+
+    async def _store(
+        self, org_id: str, response: Any, refresh_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        expires_in = getattr(response, "expires_in", None)
+        entry = dict(
+            access_token=response.access_token,
+            refresh_token=response.refresh_token or refresh_token,
+            expires_at=time.time() + expires_in if expires_in else None,
+        )
+        await self.cache.aset(org_id, entry)
+        self._entries[org_id] = entry
+        self.refreshes += 1
+        self._retry_at.pop(org_id, None)
+        self.on_token(org_id, entry["access_token"])
+        self._schedule(org_id, entry)
+        return entry
+
+    def _schedule(self, org_id: str, entry: Dict[str, Any]):
+        timer = self._timers.pop(org_id, None)
+        if timer is not None:
+            timer.cancel()
+        if not entry.get("expires_at"):
+            return
+        delay = max(0.0, entry["expires_at"] - self.refresh_margin - time.time())
+        self._timers[org_id] = asyncio.get_running_loop().call_later(
+            delay, self._on_timer, org_id, entry["access_token"]
+        )
+
+    def _on_timer(self, org_id: str, access_token: str):
+        self._timers.pop(org_id, None)
+        # Inactive orgs refresh on their next request instead
+        if self.is_active(org_id):
+            self.refresh_in_background(org_id, access_token)
+
+    def close(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in self._background:
+            task.cancel()
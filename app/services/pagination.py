@@ -0,0 +1,25 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+
+async def iter_pages(
+    fetch_page: Callable[[Optional[str]], Awaitable[Any]],
+) -> AsyncIterator[List[Any]]:
+    """Yield the ``data`` of every page of a cursor-paginated list call.
+
+    ``fetch_page(after)`` returns one SDK list response. The request for the
+    next page is started as soon as a page arrives, so it is in flight while
+    the caller is still processing the current one. At most two pages are
+    held at any time.
+    """
+    task = asyncio.ensure_future(fetch_page(None))
+    try:
+        while task is not None:
+            page = await task
+            data = page.data or []
+            after = page.pagination.after if page.pagination else None
+            task = asyncio.ensure_future(fetch_page(after)) if after and data else None
+            yield data
+    finally:
+        if task is not None:
+            task.cancel()
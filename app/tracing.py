@@ -0,0 +1,268 @@
+import contextvars
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import orjson
+
+from app.config import settings
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """One timed operation; the fields follow OpenTelemetry's span model.
+
+    A span that is not sampled still carries its ids, so the trace context is
+    passed on to Cobo, but records no times or attributes.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "sampled",
+        "recording",
+        "attributes",
+        "status",
+        "start_ns",
+        "end_ns",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: int,
+        parent_id: Optional[int],
+        sampled: bool,
+        recording: bool,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64) or 1
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.recording = recording
+        self.attributes = dict(attributes) if recording and attributes else {}
+        self.status = "OK"
+        self.start_ns = time.time_ns() if recording else 0
+        self.end_ns = 0
+
+    @property
+    def traceparent(self) -> str:
+        flags = "01" if self.sampled else "00"
+        return f"00-{self.trace_id:032x}-{self.span_id:016x}-{flags}"
+
+    def set_attribute(self, key: str, value: Any):
+        if self.recording:
+            self.attributes[key] = value
+
+    def record_exception(self, e: BaseException):
+        self.status = "ERROR"
+        if self.recording:
+            self.attributes["exception.type"] = type(e).__name__
+            self.attributes["exception.message"] = str(e)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": f"{self.trace_id:032x}",
+            "span_id": f"{self.span_id:016x}",
+            "parent_span_id": f"{self.parent_id:016x}" if self.parent_id else None,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+# Span of the operation running in this task or SDK worker thread
+current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class MemoryExporter:
+    """Keeps the last ``max_spans`` finished spans, e.g. for tests and benchmarks."""
+
+    def __init__(self, max_spans: int = 10000):
+        self._spans: deque = deque(maxlen=max_spans)
+
+    def export(self, span: Span):
+        self._spans.append(span)
+
+    @property
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def trace(self, trace_id: str) -> List[Span]:
+        return [span for span in self._spans if f"{span.trace_id:032x}" == trace_id]
+
+    def close(self):
+        pass
+
+
+class FileExporter:
+    """Appends finished spans to ``path`` as JSON lines, for offline analysis."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "ab", buffering=0)
+
+    def export(self, span: Span):
+        line = orjson.dumps(span.to_dict()) + b"\n"
+        # Spans also finish in SDK worker threads
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        self._file.close()
+
+
+def create_exporter(kind: str, path: str = "", max_spans: int = 10000):
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return MemoryExporter(max_spans)
+    if kind == "file":
+        return FileExporter(path or "traces.jsonl")
+    raise ValueError(f"Unknown trace exporter: {kind}")
+
+
+def parse_traceparent(value: Optional[str]):
+    """``(trace_id, parent_id, sampled)`` of a W3C ``traceparent``, or None."""
+    match = _TRACEPARENT_RE.match((value or "").strip().lower())
+    if not match:
+        return None
+    trace_id, parent_id = int(match[1], 16), int(match[2], 16)
+    if not trace_id or not parent_id:
+        return None
+    return trace_id, parent_id, bool(int(match[3], 16) & 1)
+
+
+class Tracer:
+    """Creates spans and hands the sampled ones to ``exporter``.
+
+    A new trace is sampled with probability ``sample_rate``, decided from its
+    trace id; spans in an existing trace, including one continued from an
+    incoming ``traceparent``, follow their parent's decision. Without an
+    exporter nothing is recorded, but trace context is still propagated.
+
+    ``start_as_current_span`` has the signature of OpenTelemetry's, so code
+    taking a tracer works with either.
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def _sampled(self, trace_id: int) -> bool:
+        return (trace_id & 0xFFFFFFFFFFFFFFFF) < self.sample_rate * 2**64
+
+    @contextmanager
+    def start_as_current_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        traceparent: Optional[str] = None,
+    ) -> Iterator[Span]:
+        remote = parse_traceparent(traceparent) if traceparent else None
+        parent = current_span.get()
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+        elif parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+            sampled = parent.sampled
+        else:
+            trace_id, parent_id = random.getrandbits(128) or 1, None
+            sampled = self.exporter is not None and self._sampled(trace_id)
+        span = Span(
+            name,
+            trace_id,
+            parent_id,
+            sampled,
+            sampled and self.exporter is not None,
+            attributes,
+        )
+        token = current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            current_span.reset(token)
+            if span.recording:
+                span.end_ns = time.time_ns()
+                self.exporter.export(span)
+
+
+tracer = Tracer(
+    create_exporter(
+        settings.TRACE_EXPORTER, settings.TRACE_FILE, settings.TRACE_MAX_SPANS
+    ),
+    settings.TRACE_SAMPLE_RATE,
+)
+
+
+def propagating(request: Callable[..., Any], tracer: Tracer) -> Callable[..., Any]:
+    """Wrap the SDK's REST ``request`` in a span and send its ``traceparent``."""
+
+    def traced(method: str, url: str, headers=None, **kwargs):
+        with tracer.start_as_current_span(
+            f"HTTP {method}",
+            {"http.method": method, "http.url": url.partition("?")[0]},
+        ) as span:
+            headers = {**(headers or {}), TRACEPARENT: span.traceparent}
+            response = request(method, url, headers=headers, **kwargs)
+            span.set_attribute("http.status_code", response.status)
+            return response
+
+    return traced
+
+
+class TracingMiddleware:
+    """Start a span per HTTP request, continuing the caller's ``traceparent``.
+
+    The span is named after the route template once routing is done; the
+    spans of auth, the service call and the Cobo requests nest under it.
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+        with self.tracer.start_as_current_span(
+            scope["method"], {"http.method": scope["method"]}, traceparent
+        ) as span:
+
+            async def send_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "ERROR"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_status)
+            finally:
+                route = getattr(scope.get("route"), "path", "unmatched")
+                span.name = f"{scope['method']} {route}"
+                span.set_attribute("http.route", route)
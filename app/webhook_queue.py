@@ -0,0 +1,253 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (row id, org id, raw payload, attempts)
+_Delivery = Tuple[int, Optional[str], bytes, int]
+
+
+class WebhookQueue:
+    """Durable inbox for webhook deliveries.
+
+    ``enqueue`` returns once the delivery is committed to SQLite, so the
+    endpoint can ACK without waiting for the handler. Deliveries that arrive
+    while a commit is in progress are written together in the next one (group
+    commit), so a burst costs one commit per batch instead of one per event.
+    Deliveries with an ``event_id`` seen in the last ``dedup_ttl`` seconds are
+    dropped.
+
+    ``workers`` tasks run ``handler(payload, org_id)`` on committed deliveries.
+    A handled delivery is deleted; a failing one is retried after
+    ``retry_delay`` seconds and kept with ``failed_at`` set after
+    ``max_attempts``. Deliveries still pending when the process stopped are
+    picked up again by ``start``.
+    """
+
+    PURGE_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        handler: Callable[[Dict[str, Any], Optional[str]], Awaitable[None]],
+        workers: int = 4,
+        dedup_ttl: float = 86400,
+        max_attempts: int = 5,
+        retry_delay: float = 30.0,
+        max_batch: int = 1000,
+    ):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.dedup_ttl = dedup_ttl
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_batch = max_batch
+        self.received = 0
+        self.duplicates = 0
+        self.processed = 0
+        self.failed = 0
+        self.commits = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        # One thread owns the connection, so writes never contend in-process.
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webhook-db")
+        self._incoming: List[
+            Tuple[Optional[str], Optional[str], bytes, asyncio.Future]
+        ] = []
+        self._finished: List[Tuple[int, bool]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._starting: Optional[asyncio.Future] = None
+        self._last_purge = 0.0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "processed": self.processed,
+            "failed": self.failed,
+            "commits": self.commits,
+            "pending": self._ready.qsize() if self._ready else 0,
+        }
+
+    def _open(self) -> List[_Delivery]:
+        self._conn = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS webhook_deliveries ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, event_id TEXT, org_id TEXT, "
+            "payload BLOB NOT NULL, received_at REAL NOT NULL, failed_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS webhook_seen ("
+            "event_id TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        rows = self._conn.execute(
+            "SELECT id, org_id, payload FROM webhook_deliveries "
+            "WHERE failed_at IS NULL ORDER BY id"
+        ).fetchall()
+        return [(row_id, org_id, payload, 0) for row_id, org_id, payload in rows]
+
+    def _commit(
+        self,
+        incoming: List[Tuple[Optional[str], Optional[str], bytes]],
+        finished: List[Tuple[int, bool]],
+    ) -> List[Optional[int]]:
+        """Write one batch in a single transaction; row ids, None for duplicates."""
+        now = time.time()
+        row_ids: List[Optional[int]] = []
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for event_id, org_id, payload in incoming:
+                if event_id is not None:
+                    seen = conn.execute(
+                        "INSERT INTO webhook_seen VALUES (?, ?) ON CONFLICT "
+                        "(event_id) DO UPDATE SET seen_at = excluded.seen_at "
+                        "WHERE seen_at < ?",
+                        (event_id, now, now - self.dedup_ttl),
+                    )
+                    if seen.rowcount == 0:
+                        row_ids.append(None)
+                        continue
+                cursor = conn.execute(
+                    "INSERT INTO webhook_deliveries "
+                    "(event_id, org_id, payload, received_at) VALUES (?, ?, ?, ?)",
+                    (event_id, org_id, payload, now),
+                )
+                row_ids.append(cursor.lastrowid)
+            conn.executemany(
+                "DELETE FROM webhook_deliveries WHERE id = ?",
+                [(row_id,) for row_id, ok in finished if ok],
+            )
+            conn.executemany(
+                "UPDATE webhook_deliveries SET failed_at = ? WHERE id = ?",
+                [(now, row_id) for row_id, ok in finished if not ok],
+            )
+            if now - self._last_purge > self.PURGE_INTERVAL:
+                conn.execute(
+                    "DELETE FROM webhook_seen WHERE seen_at < ?",
+                    (now - self.dedup_ttl,),
+                )
+                self._last_purge = now
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row_ids
+
+    async def start(self):
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._start())
+        await asyncio.shield(self._starting)
+
+    async def _start(self):
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._ready = asyncio.Queue()
+        for delivery in await loop.run_in_executor(self._db, self._open):
+            self._ready.put_nowait(delivery)
+        self._tasks = [asyncio.create_task(self._write())] + [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._starting = None
+        loop = asyncio.get_running_loop()
+        if self._finished:
+            await loop.run_in_executor(self._db, self._commit, [], self._finished)
+            self._finished = []
+        if self._conn is not None:
+            await loop.run_in_executor(self._db, self._conn.close)
+            self._conn = None
+
+    async def enqueue(
+        self, event_id: Optional[str], payload: bytes, org_id: Optional[str] = None
+    ) -> bool:
+        """Persist a delivery; False if ``event_id`` was already received."""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._incoming.append((event_id, org_id, payload, future))
+        self._wakeup.set()
+        return await future
+
+    async def _write(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._incoming or self._finished:
+                batch = self._incoming[: self.max_batch]
+                del self._incoming[: self.max_batch]
+                finished, self._finished = self._finished, []
+                try:
+                    row_ids = await loop.run_in_executor(
+                        self._db,
+                        self._commit,
+                        [item[:3] for item in batch],
+                        finished,
+                    )
+                except Exception as e:
+                    logger.error("Failed to commit webhook deliveries: %s", e)
+                    for *_, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    self._finished.extend(finished)
+                    await asyncio.sleep(1)
+                    continue
+                self.commits += 1
+                for (_, org_id, payload, future), row_id in zip(batch, row_ids):
+                    self.received += 1
+                    if row_id is None:
+                        self.duplicates += 1
+                    else:
+                        self._ready.put_nowait((row_id, org_id, payload, 0))
+                    if not future.done():
+                        future.set_result(row_id is not None)
+
+    def _finish(self, row_id: int, ok: bool):
+        self._finished.append((row_id, ok))
+        self._wakeup.set()
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            row_id, org_id, payload, attempts = await self._ready.get()
+            try:
+                await self.handler(json.loads(payload), org_id)
+            except Exception as e:
+                attempts += 1
+                if attempts < self.max_attempts:
+                    logger.warning(
+                        "Webhook delivery %s failed (attempt %s): %s",
+                        row_id,
+                        attempts,
+                        e,
+                    )
+                    loop.call_later(
+                        self.retry_delay,
+                        self._ready.put_nowait,
+                        (row_id, org_id, payload, attempts),
+                    )
+                else:
+                    logger.error(
+                        "Webhook delivery %s failed permanently: %s", row_id, e
+                    )
+                    self.failed += 1
+                    self._finish(row_id, False)
+            else:
+                self.processed += 1
+                self._finish(row_id, True)
@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from eth_abi import decode, encode
+from eth_utils.abi import (
+    function_abi_to_4byte_selector,
+    get_abi_input_types,
+    get_abi_output_types,
+)
+from web3 import AsyncWeb3
+
+from ..core.base import Collector
+from ..core.events import Event
+
+logger = logging.getLogger(__name__)
+
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+_AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+
+
+@dataclass
+class ViewCall:
+    """One contract view call; its decoded result is returned under ``key``.
+
+    ``abi`` is the contract ABI (or just the function's entry). Functions are
+    looked up by name, so overloaded functions are not supported.
+    """
+
+    key: str
+    address: str
+    abi: Union[List[Dict], Dict]
+    function: str
+    args: Tuple = ()
+
+
+class OnChainReader:
+    """Reads many contract view calls in few RPC round trips.
+
+    With ``mode="multicall"`` each chunk of up to ``batch_size`` calls is one
+    ``eth_call`` to Multicall3 ``aggregate3``; with ``mode="batch"`` it is one
+    JSON-RPC batch request of plain ``eth_call``s, for chains without
+    Multicall3. Selectors and ABI types are resolved once per contract
+    function and calldata is encoded with ``eth_abi`` directly, without
+    building web3 contract objects. Requests go straight to ``w3.provider``,
+    skipping the middleware that would add an ``eth_chainId`` lookup per call.
+    Calls that revert or return nothing decodable come back as ``None``.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        multicall_address: str = MULTICALL3_ADDRESS,
+        batch_size: int = 500,
+        mode: str = "multicall",
+    ):
+        if mode not in ("multicall", "batch"):
+            raise ValueError(f"Unknown read mode: {mode}")
+        self.w3 = w3
+        self.multicall_address = multicall_address
+        self.batch_size = batch_size
+        self.mode = mode
+        self.round_trips = 0
+        # (address, function) -> (selector, input types, output types)
+        self._functions: Dict[Tuple[str, str], Tuple[bytes, List[str], List[str]]] = {}
+
+    def _function(self, call: ViewCall) -> Tuple[bytes, List[str], List[str]]:
+        cache_key = (call.address.lower(), call.function)
+        function = self._functions.get(cache_key)
+        if function is None:
+            entries = call.abi if isinstance(call.abi, list) else [call.abi]
+            entry = next(
+                e
+                for e in entries
+                if e.get("type") == "function" and e["name"] == call.function
+            )
+            function = (
+                function_abi_to_4byte_selector(entry),
+                get_abi_input_types(entry),
+                get_abi_output_types(entry),
+            )
+            self._functions[cache_key] = function
+        return function
+
+    def encode(self, call: ViewCall) -> bytes:
+        selector, input_types, _ = self._function(call)
+        return selector + encode(input_types, call.args)
+
+    def decode(self, call: ViewCall, data: bytes) -> Any:
+        _, _, output_types = self._function(call)
+        try:
+            values = decode(output_types, data)
+        except Exception as e:
+            logger.warning(f"Failed to decode {call.function} from {call.address}: {e}")
+            return None
+        return values[0] if len(values) == 1 else values
+
+    @staticmethod
+    def _eth_call(to: str, data: bytes, block_identifier: Any) -> List[Any]:
+        if isinstance(block_identifier, int):
+            block_identifier = hex(block_identifier)
+        return [{"to": to, "data": "0x" + data.hex()}, block_identifier]
+
+    @staticmethod
+    def _result(response: Dict[str, Any]) -> Optional[bytes]:
+        result = response.get("result")
+        if "error" in response or not result:
+            return None
+        return bytes.fromhex(result[2:])
+
+    async def block_number(self) -> int:
+        response = await self.w3.provider.make_request("eth_blockNumber", [])
+        if "error" in response:
+            raise RuntimeError(f"eth_blockNumber failed: {response['error']}")
+        return int(response["result"], 16)
+
+    async def read(
+        self, calls: Sequence[ViewCall], block_identifier: Any = "latest"
+    ) -> Dict[str, Any]:
+        """Run every call against the same block; results keyed by ``call.key``."""
+        size = self.batch_size
+        chunks = [calls[i : i + size] for i in range(0, len(calls), size)]
+        read_chunk = self._multicall if self.mode == "multicall" else self._batch
+        results: Dict[str, Any] = {}
+        for values in await asyncio.gather(
+            *(read_chunk(chunk, block_identifier) for chunk in chunks)
+        ):
+            results.update(values)
+        return results
+
+    async def _multicall(
+        self, calls: Sequence[ViewCall], block_identifier: Any
+    ) -> Dict[str, Any]:
+        data = _AGGREGATE3_SELECTOR + encode(
+            ["(address,bool,bytes)[]"],
+            [[(call.address, True, self.encode(call)) for call in calls]],
+        )
+        self.round_trips += 1
+        response = await self.w3.provider.make_request(
+            "eth_call", self._eth_call(self.multicall_address, data, block_identifier)
+        )
+        raw = self._result(response)
+        if raw is None:
+            raise RuntimeError(f"Multicall failed: {response.get('error')}")
+        (results,) = decode(["(bool,bytes)[]"], raw)
+        return {
+            call.key: self.decode(call, return_data) if success else None
+            for call, (success, return_data) in zip(calls, results)
+        }
+
+    async def _batch(
+        self, calls: Sequence[ViewCall], block_identifier: Any
+    ) -> Dict[str, Any]:
+        self.round_trips += 1
+        responses = await self.w3.provider.make_batch_request(
+            [
+                (
+                    "eth_call",
+                    self._eth_call(call.address, self.encode(call), block_identifier),
+                )
+                for call in calls
+            ]
+        )
+        results = {}
+        for call, response in zip(calls, responses):
+            data = self._result(response)
+            results[call.key] = self.decode(call, data) if data is not None else None
+        return results
+
+
+class OnChainCollector(Collector):
+    """Emits the results of a set of view calls every ``interval`` seconds.
+
+    Each reading is one ``Event(type=event_type, data={key: value, ...})``,
+    fetched with a single ``OnChainReader.read``.
+    """
+
+    def __init__(
+        self,
+        reader: OnChainReader,
+        calls: Sequence[ViewCall],
+        event_type: str = "onchain_read",
+        interval: float = 1.0,
+    ):
+        self.reader = reader
+        self.calls = list(calls)
+        self.event_type = event_type
+        self.interval = interval
+
+    async def start(self) -> "Collector":
+        return self
+
+    async def stop(self):
+        pass
+
+    async def events(self) -> AsyncIterable[Event]:
+        while True:
+            try:
+                values = await self.reader.read(self.calls)
+            except Exception as e:
+                logger.error(f"On-chain read failed: {e}")
+            else:
+                yield Event(type=self.event_type, data=values)
+            await asyncio.sleep(self.interval)
+
+
+Condition = Callable[[Optional[Dict[str, Any]], Dict[str, Any]], bool]
+
+
+def changed(*keys: str) -> Condition:
+    """Emit when any of ``keys`` (all keys if none given) changed."""
+
+    def condition(previous, values):
+        if previous is None:
+            return True
+        return any(previous.get(k) != values.get(k) for k in keys or values)
+
+    return condition
+
+
+def crossed(
+    key: str,
+    threshold: Any,
+    value: Callable[[Any], Any] = lambda v: v,
+    cooldown: Optional[float] = 60.0,
+) -> Condition:
+    """Emit when ``value(values[key])`` rises to ``threshold`` or above.
+
+    Fires when the value crosses the threshold, and again every ``cooldown``
+    seconds while it stays at or above it, so a claim that failed is tried
+    again; strategies should expect repeats. With ``cooldown=None`` it fires
+    once per crossing only.
+    """
+    fired_at: Optional[float] = None
+
+    def reached(values):
+        if values is None or values.get(key) is None:
+            return False
+        return value(values[key]) >= threshold
+
+    def condition(previous, values):
+        nonlocal fired_at
+        if not reached(values):
+            return False
+        now = time.monotonic()
+        if reached(previous):
+            if cooldown is None:
+                return False
+            if fired_at is not None and now - fired_at < cooldown:
+                return False
+        fired_at = now
+        return True
+
+    return condition
+
+
+class BlockCollector(Collector):
+    """Re-reads a set of view calls on every new block, emitting on change.
+
+    New heads are found by polling ``eth_blockNumber``. After a new block the
+    collector sleeps for half the observed block time, then polls from every
+    ``min_interval`` seconds, backing off towards ``max_interval`` while no
+    new block arrives. All calls are read at the new block number in
+    one ``OnChainReader.read``. The reading is emitted as an event with the
+    values and ``block_number`` only when ``condition(previous, values)``
+    holds; the default, ``changed()``, emits when any value changed.
+    """
+
+    def __init__(
+        self,
+        reader: OnChainReader,
+        calls: Sequence[ViewCall],
+        event_type: str = "onchain_change",
+        condition: Optional[Condition] = None,
+        min_interval: float = 0.5,
+        max_interval: float = 12.0,
+    ):
+        self.reader = reader
+        self.calls = list(calls)
+        self.event_type = event_type
+        self.condition = condition or changed()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.block_time: Optional[float] = None
+        self.polls = 0
+        self.reads = 0
+
+    async def start(self) -> "Collector":
+        return self
+
+    async def stop(self):
+        pass
+
+    async def events(self) -> AsyncIterable[Event]:
+        loop = asyncio.get_running_loop()
+        previous: Optional[Dict[str, Any]] = None
+        last_block: Optional[int] = None
+        last_seen = 0.0
+        misses = 0
+        while True:
+            delay = min(self.min_interval * 1.5**misses, self.max_interval)
+            try:
+                self.polls += 1
+                block = await self.reader.block_number()
+                if last_block is not None and block <= last_block:
+                    misses += 1
+                else:
+                    self.reads += 1
+                    values = await self.reader.read(self.calls, block)
+                    now = loop.time()
+                    if last_block is not None:
+                        gap = (now - last_seen) / (block - last_block)
+                        self.block_time = (
+                            gap
+                            if self.block_time is None
+                            else 0.8 * self.block_time + 0.2 * gap
+                        )
+                    last_block, last_seen, misses = block, now, 0
+                    if self.condition(previous, values):
+                        yield Event(
+                            type=self.event_type,
+                            data={"block_number": block, **values},
+                        )
+                    previous = values
+                    delay = max(self.min_interval, (self.block_time or 0) / 2)
+            except Exception as e:
+                logger.error(f"Block-driven read failed: {e}")
+                misses += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterable, Dict, Iterable, Optional, Tuple, Union
+
+from cobo_waas2.crypto.signing_helper import SignHelper
+
+from ..core.base import Collector
+from ..core.events import Event
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1024 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+class WebhookCollector(Collector):
+    """Pushes Cobo webhook deliveries into the pipeline as they arrive.
+
+    Deliveries come in through ``deliver(payload)`` from the same process, or
+    as ``POST {path}`` on a local HTTP listener (``host``/``port``, or a Unix
+    socket at ``unix_socket``) that Cobo, a reverse proxy or another local
+    service can post to. Each accepted delivery becomes an ``Event`` whose
+    type is the webhook event type and whose data is the delivery body.
+
+    Only ``event_types`` are forwarded (all types when None). When
+    ``pub_key`` is set, HTTP deliveries must carry a valid ``Biz-Timestamp`` /
+    ``Biz-Resp-Signature`` pair signed by Cobo. Once ``max_pending`` events
+    are waiting, deliveries are refused with 503 so Cobo retries them later.
+
+    The listener only takes bodies sized by ``Content-Length``: chunked
+    requests are answered with 411 and the connection is closed. A
+    connection that sends nothing for ``read_timeout`` seconds, or stalls in
+    the middle of a request, is closed.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8090,
+        path: str = "/webhook",
+        event_types: Optional[Iterable[str]] = (
+            "transaction.created",
+            "transaction.confirmed",
+        ),
+        pub_key: Optional[str] = None,
+        unix_socket: Optional[str] = None,
+        max_pending: int = 10000,
+        read_timeout: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.event_types = frozenset(event_types) if event_types else None
+        self.pub_key = pub_key
+        self.unix_socket = unix_socket
+        self.read_timeout = read_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(max_pending)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "Collector":
+        if self.unix_socket:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=self.unix_socket
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, self.host, self.port
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Webhook collector listening on {self.unix_socket or self.port}")
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def events(self) -> AsyncIterable[Event]:
+        while True:
+            yield await self._queue.get()
+
+    def deliver(self, payload: Dict) -> bool:
+        """Queue a webhook delivery; False if too many events are pending."""
+        event_type = payload.get("type")
+        if self.event_types is not None and event_type not in self.event_types:
+            return True
+        try:
+            self._queue.put_nowait(Event(type=event_type, data=payload))
+        except asyncio.QueueFull:
+            logger.warning(f"Webhook collector full, refusing {event_type}")
+            return False
+        return True
+
+    def _verify(self, headers: Dict[str, str], body: str) -> bool:
+        if self.pub_key is None:
+            return True
+        signature = headers.get("biz-resp-signature")
+        timestamp = headers.get("biz-timestamp")
+        if not signature or not timestamp:
+            return False
+        return SignHelper.verify(
+            pub_key=self.pub_key,
+            signature=signature,
+            content=f"{body}|{timestamp}",
+        )
+
+    def _accept(self, method: str, target: str, headers, body: bytes) -> int:
+        if target.split("?", 1)[0] != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        try:
+            text = body.decode()
+        except UnicodeDecodeError:
+            return 400
+        if not self._verify(headers, text):
+            return 401
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            return 400
+        if not isinstance(payload, dict):
+            return 400
+        return 200 if self.deliver(payload) else 503
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Union[int, Tuple[str, str, Dict[str, str], bytes]]:
+        """The next request, or the status to answer before closing."""
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.read_timeout)
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method, target, _ = request_line.split(" ", 2)
+        headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        # Without a usable length the next request can't be found either
+        if "transfer-encoding" in headers:
+            return 411
+        length = headers.get("content-length")
+        if length is None:
+            if method == "POST":
+                return 411
+            length = "0"
+        if not length.isdigit():
+            return 400
+        size = int(length)
+        if size > MAX_BODY_SIZE:
+            return 413
+        body = b""
+        if size:
+            body = await asyncio.wait_for(reader.readexactly(size), self.read_timeout)
+        return method, target, headers, body
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                except (
+                    asyncio.IncompleteReadError,
+                    ConnectionError,
+                    asyncio.TimeoutError,
+                ):
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    request = 400
+                if isinstance(request, int):
+                    status = request
+                else:
+                    method, target, headers, body = request
+                    status = self._accept(method, target, headers, body)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                content = b'{"status":"success"}' if status == 200 else b""
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    f"\r\n".encode() + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
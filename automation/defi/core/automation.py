@@ -1,24 +1,97 @@
 import asyncio
-from typing import List, Union, Callable, AsyncIterable, Awaitable, Optional
+import logging
+from contextlib import nullcontext
+from typing import (
+    Any,
+    Dict,
+    List,
+    Union,
+    Callable,
+    AsyncIterable,
+    Awaitable,
+    Optional,
+    Hashable,
+)
 from .base import (
     Collector,
     Strategy,
     Executor,
+    BatchStrategy,
+    BatchExecutor,
     FunctionCollector,
     FunctionStrategy,
     FunctionExecutor,
 )
 from .events import Event, Action
+from .queues import OverflowPolicy
+from .workers import WorkerPool
+
+logger = logging.getLogger(__name__)
 
 
 class CoboAutomation:
-    def __init__(self):
+    """Collectors feed events to strategies, whose actions go to executors.
+
+    ``strategy_workers`` and ``executor_workers`` set how many events and
+    actions are processed at once. ``strategy_key``/``executor_key`` keep items
+    with the same key (e.g. ``lambda action: action.data.get("wallet_id")``)
+    sequential and in order while other keys proceed in parallel.
+
+    Events and actions wait in queues bounded by ``collector_queue_size`` and
+    ``executor_queue_size`` (0 means unbounded). ``collector_overflow`` and
+    ``executor_overflow`` choose what happens when a queue is full; with
+    ``OverflowPolicy.COALESCE`` the matching ``*_coalesce_key`` decides which
+    queued items supersede each other, e.g. ``lambda event: event.type`` to
+    keep only the latest reading of a polling collector.
+
+    When ``BatchStrategy``/``BatchExecutor`` instances are registered, workers
+    take up to the largest ``max_batch_size`` of them at once, waiting at most
+    the shortest ``max_batch_wait``. Batch members get the batch in one call
+    (split to their own ``max_batch_size``); other strategies and executors
+    still get one item per call, in queue order.
+
+    With a ``tracer`` (an OpenTelemetry tracer, or anything with its
+    ``start_as_current_span``), each collected event, strategy call and
+    executor call is recorded as a span.
+    """
+
+    def __init__(
+        self,
+        strategy_workers: int = 1,
+        executor_workers: int = 1,
+        strategy_key: Optional[Callable[[Event], Hashable]] = None,
+        executor_key: Optional[Callable[[Action], Hashable]] = None,
+        collector_queue_size: int = 1000,
+        collector_overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        collector_coalesce_key: Optional[Callable[[Event], Hashable]] = None,
+        executor_queue_size: int = 1000,
+        executor_overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        executor_coalesce_key: Optional[Callable[[Action], Hashable]] = None,
+        tracer: Any = None,
+    ):
+        self.tracer = tracer
         self.collectors: List[Collector] = []
         self.strategies: List[Strategy] = []
         self.executors: List[Executor] = []
         self.running = False
-        self.collector_queue = asyncio.Queue()
-        self.executor_queue = asyncio.Queue()
+        self.strategy_pool = WorkerPool(
+            "strategy",
+            self._process_events,
+            strategy_workers,
+            strategy_key,
+            collector_queue_size,
+            collector_overflow,
+            collector_coalesce_key,
+        )
+        self.executor_pool = WorkerPool(
+            "executor",
+            self._execute_actions,
+            executor_workers,
+            executor_key,
+            executor_queue_size,
+            executor_overflow,
+            executor_coalesce_key,
+        )
         self._tasks: Optional[List[asyncio.Task]] = None
 
     def add_collector(
@@ -45,19 +118,34 @@ class CoboAutomation:
         else:
             self.executors.append(FunctionExecutor(executor))
 
+    @staticmethod
+    def _configure_batching(pool: WorkerPool, members: list):
+        if members:
+            pool.batch_size = max(member.max_batch_size for member in members)
+            pool.batch_wait = min(member.max_batch_wait for member in members)
+
     async def start(self):
         self.running = True
+        self._configure_batching(
+            self.strategy_pool,
+            [s for s in self.strategies if isinstance(s, BatchStrategy)],
+        )
+        self._configure_batching(
+            self.executor_pool,
+            [e for e in self.executors if isinstance(e, BatchExecutor)],
+        )
         start_tasks = [collector.start() for collector in self.collectors]
         await asyncio.gather(*start_tasks)
 
         # Create and store all tasks
-        self._tasks = [
-            asyncio.create_task(self._run_collector(collector))
-            for collector in self.collectors
-        ] + [
-            asyncio.create_task(self._run_strategies()),
-            asyncio.create_task(self._run_executors()),
-        ]
+        self._tasks = (
+            [
+                asyncio.create_task(self._run_collector(collector))
+                for collector in self.collectors
+            ]
+            + self.strategy_pool.start()
+            + self.executor_pool.start()
+        )
 
     async def stop(self):
         self.running = False
@@ -65,33 +153,105 @@ class CoboAutomation:
         await asyncio.gather(*stop_tasks)
 
         if self._tasks:
+            for task in self._tasks:
+                task.cancel()
             await asyncio.gather(*self._tasks, return_exceptions=True)
             self._tasks = None
+        await asyncio.gather(*(executor.stop() for executor in self.executors))
 
     async def join(self):
         """Wait for all tasks to complete."""
         if self._tasks:
             await asyncio.gather(*self._tasks)
 
+    async def drain(self):
+        """Wait until every event and action queued so far has been handled."""
+        await self.strategy_pool.join()
+        await self.executor_pool.join()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Depth, drop and wait-time gauges of the event and action queues."""
+        return {
+            "collector_queue": self.strategy_pool.stats(),
+            "executor_queue": self.executor_pool.stats(),
+        }
+
+    def _span(self, name: str, attributes: Dict[str, Any]):
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.start_as_current_span(name, attributes=attributes)
+
     async def _run_collector(self, collector: Collector):
         while self.running:
             async for event in collector.events():
                 if not self.running:
                     break
-                await self.collector_queue.put(event)
+                # Covers the wait for queue space when strategies fall behind
+                with self._span(
+                    "automation.collect",
+                    {"collector": type(collector).__name__, "event.type": event.type},
+                ):
+                    await self.strategy_pool.put(event)
 
-    async def _run_strategies(self):
-        while self.running:
-            event = await self.collector_queue.get()
-            for strategy in self.strategies:
-                actions = await strategy.process_event(event)
-                for action in actions:
-                    await self.executor_queue.put(action)
-            self.collector_queue.task_done()
-
-    async def _run_executors(self):
-        while self.running:
-            action = await self.executor_queue.get()
-            for executor in self.executors:
-                await executor.execute(action)
-            self.executor_queue.task_done()
+    @staticmethod
+    def _chunks(items: list, size: int) -> List[list]:
+        return [items[i : i + size] for i in range(0, len(items), size)]
+
+    async def _run_strategy(
+        self, strategy: Strategy, events: List[Event]
+    ) -> List[Action]:
+        actions = []
+        if isinstance(strategy, BatchStrategy):
+            calls = [
+                (strategy.process_events, chunk)
+                for chunk in self._chunks(events, strategy.max_batch_size)
+            ]
+        else:
+            calls = [(strategy.process_event, event) for event in events]
+        for call, item in calls:
+            try:
+                with self._span(
+                    "automation.strategy",
+                    {
+                        "strategy": type(strategy).__name__,
+                        "batch_size": len(item) if isinstance(item, list) else 1,
+                    },
+                ):
+                    actions.extend(await call(item))
+            except Exception as e:
+                logger.error(f"Strategy {strategy} failed on {item}: {e}")
+        return actions
+
+    async def _run_executor(self, executor: Executor, actions: List[Action]):
+        if isinstance(executor, BatchExecutor):
+            calls = [
+                (executor.execute_batch, chunk)
+                for chunk in self._chunks(actions, executor.max_batch_size)
+            ]
+        else:
+            calls = [(executor.execute, action) for action in actions]
+        for call, item in calls:
+            try:
+                with self._span(
+                    "automation.executor",
+                    {
+                        "executor": type(executor).__name__,
+                        "batch_size": len(item) if isinstance(item, list) else 1,
+                    },
+                ):
+                    await call(item)
+            except Exception as e:
+                logger.error(f"Executor {executor} failed on {item}: {e}")
+
+    async def _process_events(self, events: List[Event]):
+        results = await asyncio.gather(
+            *(self._run_strategy(strategy, events) for strategy in self.strategies)
+        )
+        for actions in results:
+            for action in actions:
+                await self.executor_pool.put(action)
+
+    async def _execute_actions(self, actions: List[Action]):
+        await asyncio.gather(
+            *(self._run_executor(executor, actions) for executor in self.executors)
+        )
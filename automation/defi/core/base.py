@@ -33,6 +33,48 @@ class Executor(ABC):
         """Execute an action."""
         pass
 
+    async def stop(self):
+        """Release the executor's resources once the automation stops."""
+        pass
+
+
+class BatchStrategy(Strategy):
+    """Strategy that evaluates several events per call.
+
+    ``process_events`` receives up to ``max_batch_size`` events, or whatever
+    arrived within ``max_batch_wait`` seconds of the first one.
+    """
+
+    max_batch_size: int = 100
+    max_batch_wait: float = 0.05
+
+    @abstractmethod
+    async def process_events(self, events: List[Event]) -> List[Action]:
+        """Process a batch of events and return the actions for all of them."""
+        pass
+
+    async def process_event(self, event: Event) -> List[Action]:
+        return await self.process_events([event])
+
+
+class BatchExecutor(Executor):
+    """Executor that handles several actions per call, e.g. in one request.
+
+    ``execute_batch`` receives up to ``max_batch_size`` actions, or whatever
+    arrived within ``max_batch_wait`` seconds of the first one.
+    """
+
+    max_batch_size: int = 100
+    max_batch_wait: float = 0.05
+
+    @abstractmethod
+    async def execute_batch(self, actions: List[Action]):
+        """Execute a batch of actions."""
+        pass
+
+    async def execute(self, action: Action):
+        await self.execute_batch([action])
+
 
 class FunctionCollector(Collector):
     def __init__(self, events_func: Callable[[], AsyncIterable[Event]]):
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class OverflowPolicy(str, Enum):
+    """What ``put`` does when a bounded queue is full.
+
+    BLOCK waits for a free slot, pushing back on the producer. DROP_OLDEST
+    discards the item at the head of the queue, DROP_NEWEST discards the item
+    being put. COALESCE replaces a queued item that has the same key in place,
+    and drops the oldest item when a new key arrives at a full queue.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    COALESCE = "coalesce"
+
+
+class PipelineQueue(asyncio.Queue):
+    """asyncio.Queue with an overflow policy and depth/wait-time gauges."""
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        key: Optional[Callable[[Any], Hashable]] = None,
+    ):
+        if policy == OverflowPolicy.COALESCE and key is None:
+            raise ValueError("the coalesce policy needs a key")
+        super().__init__(maxsize)
+        self.policy = OverflowPolicy(policy)
+        self.key = key
+        self.dropped = 0
+        self.coalesced = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    # Entries are [key, item, enqueued_at]; a coalesced put swaps the item.
+    def _init(self, maxsize):
+        self._queue = deque()
+        self._pending: Dict[Hashable, list] = {}
+
+    def _put(self, item):
+        key = self.key(item) if self.policy == OverflowPolicy.COALESCE else None
+        entry = [key, item, time.monotonic()]
+        self._queue.append(entry)
+        if key is not None:
+            self._pending[key] = entry
+
+    def _get(self):
+        key, item, enqueued_at = self._queue.popleft()
+        if key is not None:
+            del self._pending[key]
+        waited = time.monotonic() - enqueued_at
+        self.wait_count += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        return item
+
+    def _drop_oldest(self):
+        key, _, _ = self._queue.popleft()
+        if key is not None:
+            del self._pending[key]
+        self.dropped += 1
+        self.task_done()
+
+    async def put(self, item):
+        if self.policy == OverflowPolicy.BLOCK:
+            await super().put(item)
+        else:
+            self.put_nowait(item)
+
+    def put_nowait(self, item):
+        if self.policy == OverflowPolicy.COALESCE:
+            entry = self._pending.get(self.key(item))
+            if entry is not None:
+                entry[1] = item
+                self.coalesced += 1
+                return
+        if self.full() and self.policy != OverflowPolicy.BLOCK:
+            if self.policy == OverflowPolicy.DROP_NEWEST:
+                self.dropped += 1
+                return
+            self._drop_oldest()
+        super().put_nowait(item)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.qsize(),
+            "maxsize": self.maxsize,
+            "policy": self.policy.value,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "wait_avg": self.wait_total / self.wait_count if self.wait_count else 0.0,
+            "wait_max": self.wait_max,
+        }
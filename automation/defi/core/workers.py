@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from .queues import OverflowPolicy, PipelineQueue
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """Runs ``handler`` on batches of queued items with ``workers`` workers.
+
+    A worker takes the next item, then up to ``batch_size - 1`` more that are
+    queued or arrive within ``batch_wait`` seconds, and passes them to
+    ``handler`` as one list. The default batch size of 1 hands over one item
+    at a time.
+
+    Without ``key`` all workers share one queue and items may complete out of
+    order. With ``key`` each worker owns a queue and an item goes to the queue
+    picked by ``hash(key(item))``, so items with the same key are handled one
+    at a time in the order they were put.
+
+    ``maxsize``, ``policy`` and ``coalesce_key`` configure each queue, see
+    ``PipelineQueue``. With ``key`` the bound applies per worker queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[List[Any]], Awaitable[None]],
+        workers: int = 1,
+        key: Optional[Callable[[Any], Hashable]] = None,
+        maxsize: int = 0,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        coalesce_key: Optional[Callable[[Any], Hashable]] = None,
+        batch_size: int = 1,
+        batch_wait: float = 0.0,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.key = key
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.batches = 0
+        self.batched_items = 0
+        self.queues: List[PipelineQueue] = [
+            PipelineQueue(maxsize, policy, coalesce_key)
+            for _ in range(workers if key else 1)
+        ]
+        self._tasks: List[asyncio.Task] = []
+
+    def _queue_for(self, item: Any) -> PipelineQueue:
+        if self.key is None:
+            return self.queues[0]
+        return self.queues[hash(self.key(item)) % len(self.queues)]
+
+    async def put(self, item: Any):
+        await self._queue_for(item).put(item)
+
+    def qsize(self) -> int:
+        return sum(queue.qsize() for queue in self.queues)
+
+    def stats(self) -> Dict[str, Any]:
+        queues = [queue.stats() for queue in self.queues]
+        waits = sum(queue.wait_count for queue in self.queues)
+        return {
+            "workers": self.workers,
+            "depth": sum(q["depth"] for q in queues),
+            "maxsize": sum(q["maxsize"] for q in queues),
+            "policy": queues[0]["policy"],
+            "dropped": sum(q["dropped"] for q in queues),
+            "coalesced": sum(q["coalesced"] for q in queues),
+            "wait_avg": (
+                sum(queue.wait_total for queue in self.queues) / waits if waits else 0.0
+            ),
+            "wait_max": max(q["wait_max"] for q in queues),
+            "batches": self.batches,
+            "batch_avg": self.batched_items / self.batches if self.batches else 0.0,
+        }
+
+    def start(self) -> List[asyncio.Task]:
+        self._tasks = [
+            asyncio.create_task(
+                self._work(self.queues[i % len(self.queues)]),
+                name=f"{self.name}-worker-{i}",
+            )
+            for i in range(self.workers)
+        ]
+        return self._tasks
+
+    async def join(self):
+        """Wait until every queued item has been handled."""
+        for queue in self.queues:
+            await queue.join()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _next_batch(self, queue: PipelineQueue) -> List[Any]:
+        items = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_wait
+        while len(items) < self.batch_size:
+            if not queue.empty():
+                items.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _work(self, queue: PipelineQueue):
+        while True:
+            items = await self._next_batch(queue)
+            self.batches += 1
+            self.batched_items += len(items)
+            try:
+                await self.handler(items)
+            except Exception as e:
+                logger.error(f"{self.name} worker failed on {items}: {e}")
+            finally:
+                for _ in items:
+                    queue.task_done()
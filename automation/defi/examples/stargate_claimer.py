@@ -1,12 +1,19 @@
 import uuid
 from automation.defi.core.automation import CoboAutomation
 from automation.defi.core.events import Action, Event
+from automation.defi.core.queues import OverflowPolicy
 import asyncio
 from web3 import AsyncHTTPProvider, AsyncWeb3
 import cobo_waas2
 
 from typing import List
 
+from automation.defi.collectors.onchain import (
+    BlockCollector,
+    OnChainReader,
+    ViewCall,
+    crossed,
+)
 from automation.defi.executors.devapi import DevApiExecutor, DevApiTransactionAction
 
 
@@ -31,43 +38,50 @@ stargate_multi_rewarder_address = "0x9Aa02D4Fae7F58b8E8f34c66E756cC734DAc7fe4"
 stargate_staking_address = "0xDFc47DCeF7e8f9Ab19a1b8Af3eeCF000C7ea0B80"
 
 
-async def get_stg_reward(w3: AsyncWeb3):
-    stargate_multi_rewarder = w3.eth.contract(
-        address=stargate_multi_rewarder_address,
-        abi=[
+get_rewards_abi = [
+    {
+        "inputs": [
             {
-                "inputs": [
-                    {
-                        "internalType": "contract IERC20",
-                        "name": "stakingToken",
-                        "type": "address",
-                    },
-                    {"internalType": "address", "name": "user", "type": "address"},
-                ],
-                "name": "getRewards",
-                "outputs": [
-                    {"internalType": "address[]", "name": "", "type": "address[]"},
-                    {"internalType": "uint256[]", "name": "", "type": "uint256[]"},
-                ],
-                "stateMutability": "view",
-                "type": "function",
-            }
+                "internalType": "contract IERC20",
+                "name": "stakingToken",
+                "type": "address",
+            },
+            {"internalType": "address", "name": "user", "type": "address"},
         ],
-    )
-    rewards = await stargate_multi_rewarder.functions.getRewards(
-        staking_lp_address, wallet_address
-    ).call()
-    return rewards[1][0]
+        "name": "getRewards",
+        "outputs": [
+            {"internalType": "address[]", "name": "", "type": "address[]"},
+            {"internalType": "uint256[]", "name": "", "type": "uint256[]"},
+        ],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
 
 
-async def collect_reward_events():
+def reward_collector() -> BlockCollector:
     """
-    Monitor stargate rewards for a wallet
+    Monitor stargate rewards for a wallet. Rewards are re-read once per new
+    block and an event is emitted only when they cross the threshold. More
+    wallets or LP tokens are more ViewCalls, still read in one Multicall3
+    request per block.
     """
-    w3 = AsyncWeb3(AsyncHTTPProvider(rpc_url))
-    while True:
-        await asyncio.sleep(1)
-        yield Event(type="reward", data={"amount": await get_stg_reward(w3)})
+    reader = OnChainReader(AsyncWeb3(AsyncHTTPProvider(rpc_url)))
+    calls = [
+        ViewCall(
+            key="rewards",
+            address=stargate_multi_rewarder_address,
+            abi=get_rewards_abi,
+            function="getRewards",
+            args=(staking_lp_address, wallet_address),
+        )
+    ]
+    return BlockCollector(
+        reader,
+        calls,
+        event_type="reward",
+        condition=crossed("rewards", threshold, value=lambda rewards: rewards[1][0]),
+    )
 
 
 async def build_claim_reward_request(amount: int):
@@ -114,18 +128,24 @@ async def claim_reward_strategy(event: Event) -> List[Action]:
     """
     Claim reward strategy, claim reward when reward is greater than a threshold
     """
-    if event.type == "reward":
-        if event.data["amount"] >= threshold:
-            request = await build_claim_reward_request(event.data["amount"])
-            return [DevApiTransactionAction(data=request.model_dump())]
+    if event.type == "reward" and event.data["rewards"] is not None:
+        amount = event.data["rewards"][1][0]
+        if amount >= threshold:
+            request = await build_claim_reward_request(amount)
+            return [DevApiTransactionAction(data=request.to_dict())]
     return []
 
 
 async def main():
-    automation = CoboAutomation()
+    # only the latest reward reading matters, so a newer one replaces a
+    # reading that is still queued
+    automation = CoboAutomation(
+        collector_overflow=OverflowPolicy.COALESCE,
+        collector_coalesce_key=lambda event: event.type,
+    )
 
     # collect rewards
-    automation.add_collector(collect_reward_events)
+    automation.add_collector(reward_collector())
 
     # add strategies
     automation.add_strategy(claim_reward_strategy)
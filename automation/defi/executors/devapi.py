@@ -1,26 +1,135 @@
+import asyncio
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
-from pydantic import BaseModel, Field
-from ..core.base import Executor
-from ..core.events import Action
-from services.cobo_service import CoboService
+import cobo_waas2
+from cobo_waas2 import Configuration, ContractCallParams, TransactionsApi
+from cobo_waas2.exceptions import ApiException
+from pydantic import Field
 
+from ..core.base import BatchExecutor
+from ..core.events import Action
 
 logger = logging.getLogger(__name__)
 
+API_HOSTS = {
+    "dev": "https://api.dev.cobo.com/v2",
+    "development": "https://api.dev.cobo.com/v2",
+    "sandbox": "https://api.sandbox.cobo.com/v2",
+    "prod": "https://api.cobo.com/v2",
+    "production": "https://api.cobo.com/v2",
+}
+
 
 class DevApiTransactionAction(Action):
     type: str = "devapi_transaction"
+    # Used when ``data`` has no request_id; fixed when the action is made
+    request_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+
+
+def action_request_id(action: DevApiTransactionAction) -> str:
+    """The request_id in the action's data, or the one made with the action."""
+    return action.data.get("request_id") or action.request_id
+
 
+class DevApiExecutor(BatchExecutor):
+    """Submits ``DevApiTransactionAction``s as Cobo contract call transactions.
 
-class DevApiExecutor(Executor):
-    def __init__(self, api_private_key: str, env: str):
-        self.api_private_key = api_private_key
+    ``action.data`` is a ``ContractCallParams`` body. The actions of a batch
+    are submitted together, at most ``max_concurrency`` requests in flight
+    over one pooled SDK client. An action without a ``request_id`` in its
+    data uses the one generated when the action was created, so executing
+    the same action again cannot create a second transaction, while another
+    action with the same contents still runs. A 429 pauses all submissions for its
+    Retry-After and the request is retried, up to ``max_attempts`` attempts.
+    """
+
+    max_batch_size = 50
+    max_batch_wait = 0.01
+
+    def __init__(
+        self,
+        api_private_key: str,
+        env: str,
+        max_concurrency: int = 8,
+        max_attempts: int = 5,
+        host: Optional[str] = None,
+    ):
         self.env = env
-        self.cobo_service = CoboService.get_instance(self.api_private_key, self.env)
+        self.max_attempts = max_attempts
+        configuration = Configuration(
+            api_private_key=api_private_key, host=host or API_HOSTS[env]
+        )
+        configuration.connection_pool_maxsize = max_concurrency
+        self.api = TransactionsApi(cobo_waas2.ApiClient(configuration))
+        # The SDK is blocking; its calls run on these threads
+        self._threads = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="devapi"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._resume_at = 0.0
+        self.submitted = 0
+        self.failed = 0
+
+    async def execute_batch(self, actions: List[Action]):
+        await asyncio.gather(
+            *(
+                self._submit(action)
+                for action in actions
+                if isinstance(action, DevApiTransactionAction)
+            )
+        )
+
+    async def _submit(self, action: Action):
+        loop = asyncio.get_running_loop()
+        try:
+            params = ContractCallParams.from_dict(
+                {**action.data, "request_id": action_request_id(action)}
+            )
+        except ValueError as e:
+            logger.error(f"Invalid contract call in {action}: {e}")
+            self.failed += 1
+            return
+        async with self._semaphore:
+            for attempt in range(self.max_attempts):
+                delay = self._resume_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    result = await loop.run_in_executor(
+                        self._threads,
+                        self.api.create_contract_call_transaction,
+                        params,
+                    )
+                except ApiException as e:
+                    if e.status == 429 and attempt + 1 < self.max_attempts:
+                        self._resume_at = max(
+                            self._resume_at, loop.time() + _retry_delay(e, attempt)
+                        )
+                        continue
+                    logger.error(f"Failed to submit {params.request_id}: {e}")
+                    self.failed += 1
+                    return
+                except Exception as e:
+                    logger.error(f"Failed to submit {params.request_id}: {e}")
+                    self.failed += 1
+                    return
+                logger.info(
+                    f"Submitted {params.request_id} as transaction "
+                    f"{result.transaction_id}"
+                )
+                self.submitted += 1
+                return
+
+    async def stop(self):
+        # Calls still running finish in the background; queued ones are dropped
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
 
-    async def execute(self, action: Action):
-        logger.info(f"Executing action: {action}")
-        if isinstance(action, DevApiTransactionAction):
-            await self.cobo_service.create_contract_call_transaction(action.data)
+def _retry_delay(e: ApiException, attempt: int) -> float:
+    try:
+        return float(dict(e.headers or {}).get("Retry-After"))
+    except (TypeError, ValueError):
+        return 0.5 * 2**attempt
@@ -2,6 +2,7 @@ import asyncio
 import time
 from typing import List
 
+from .defi.collectors.webhook import WebhookCollector
 from .defi.core.automation import CoboAutomation
 from .defi.core.events import Action, Event
 
@@ -21,6 +22,13 @@ async def my_strategy(event: Event) -> List[Action]:
     """
     if event.type == "tick":
         return [Action(type="log", data={"message": "Tick received"})]
+    if event.type == "transaction.confirmed":
+        return [
+            Action(
+                type="log",
+                data={"message": f"Transaction confirmed: {event.data['data']}"},
+            )
+        ]
     return []
 
 
@@ -32,12 +40,15 @@ async def my_executor(action: Action):
         print(action.data["message"])
 
 
-# simple example to print a message every second
+# simple example to print a message every second, and one for every
+# confirmed transaction as soon as Cobo delivers its webhook
 async def main():
     automation = CoboAutomation()
 
     # add collectors
     automation.add_collector(my_events)
+    # Cobo webhook deliveries posted to http://127.0.0.1:8090/webhook
+    automation.add_collector(WebhookCollector(port=8090))
 
     # add strategies
     automation.add_strategy(my_strategy)
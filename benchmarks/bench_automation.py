@@ -0,0 +1,176 @@
+"""Throughput of the CoboAutomation pipeline as worker counts grow.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_automation [--events 400] [--wallets 32]
+
+A collector emits ``--events`` events spread over ``--wallets`` wallets. A
+strategy spends ``--strategy-ms`` on each and returns one action, which goes to
+two executors that take ``--executor-ms`` and a tenth of that. ``workers=1`` is
+the previous single-task pipeline. Actions are keyed by wallet_id, and the run
+checks that each wallet's actions were executed in the order they were emitted.
+
+With ``--batch-size N`` the slow executor is a ``BatchExecutor`` that takes up
+to N actions per call for the cost of one round trip.
+
+Latency percentiles are from an event leaving the collector to its action
+being executed. ``--output`` and ``--baseline`` store and compare the rows as
+in ``benchmarks.bench_routes``.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import defaultdict
+from typing import AsyncIterable, List
+
+from automation.defi.core.automation import CoboAutomation
+from automation.defi.core.base import BatchExecutor, Collector, Executor
+from automation.defi.core.events import Action, Event
+from benchmarks.results import compare, latency_row, print_rows, write_results
+
+
+class ListCollector(Collector):
+    def __init__(self, events: List[Event]):
+        self._events = events
+
+    async def start(self) -> "Collector":
+        return self
+
+    async def stop(self):
+        pass
+
+    async def events(self) -> AsyncIterable[Event]:
+        for event in self._events:
+            event.data["emitted"] = time.perf_counter()
+            yield event
+        await asyncio.Event().wait()
+
+
+class SleepExecutor(Executor):
+    def __init__(self, seconds: float, done: asyncio.Event, total: int):
+        self.seconds = seconds
+        self.done = done
+        self.total = total
+        self.executed = defaultdict(list)
+        self.latencies: List[float] = []
+        self.count = 0
+
+    async def execute(self, action: Action):
+        await asyncio.sleep(self.seconds)
+        self.executed[action.data["wallet_id"]].append(action.data["seq"])
+        self.latencies.append(time.perf_counter() - action.data["emitted"])
+        self.count += 1
+        if self.count == self.total:
+            self.done.set()
+
+
+class SleepBatchExecutor(BatchExecutor):
+    max_batch_wait = 0.005
+
+    def __init__(self, seconds: float, batch_size: int, recorder: SleepExecutor):
+        self.seconds = seconds
+        self.max_batch_size = batch_size
+        self.recorder = recorder
+
+    async def execute_batch(self, actions: List[Action]):
+        await asyncio.sleep(self.seconds)
+        for action in actions:
+            await self.recorder.execute(action)
+
+
+async def run_once(
+    workers: int,
+    events: int,
+    wallets: int,
+    strategy_s: float,
+    executor_s: float,
+    batch_size: int = 0,
+) -> dict:
+    done = asyncio.Event()
+
+    async def strategy(event: Event) -> List[Action]:
+        await asyncio.sleep(strategy_s)
+        return [Action(type="tx", data=event.data)]
+
+    automation = CoboAutomation(
+        strategy_workers=workers,
+        executor_workers=workers,
+        strategy_key=lambda event: event.data["wallet_id"],
+        executor_key=lambda action: action.data["wallet_id"],
+    )
+    automation.add_collector(
+        ListCollector(
+            [
+                Event(type="tick", data={"wallet_id": f"w{i % wallets}", "seq": i})
+                for i in range(events)
+            ]
+        )
+    )
+    automation.add_strategy(strategy)
+    slow = SleepExecutor(executor_s, done, events)
+    if batch_size:
+        slow.seconds = 0
+        automation.add_executor(SleepBatchExecutor(executor_s, batch_size, slow))
+    else:
+        automation.add_executor(slow)
+    automation.add_executor(SleepExecutor(executor_s / 10, asyncio.Event(), events))
+
+    started = time.perf_counter()
+    await automation.start()
+    await done.wait()
+    await automation.drain()
+    elapsed = time.perf_counter() - started
+    await automation.stop()
+
+    assert all(seqs == sorted(seqs) for seqs in slow.executed.values())
+    return latency_row(f"workers={workers}", slow.latencies, elapsed)
+
+
+async def main(args) -> int:
+    print(
+        f"{args.events} events over {args.wallets} wallets, strategy "
+        f"{args.strategy_ms} ms, executors {args.executor_ms} ms, "
+        f"batch size {args.batch_size or 'off'}"
+    )
+    rows = []
+    for workers in args.workers:
+        rows.append(
+            await run_once(
+                workers,
+                args.events,
+                args.wallets,
+                args.strategy_ms / 1000,
+                args.executor_ms / 1000,
+                args.batch_size,
+            )
+        )
+    print_rows(rows)
+    if args.output:
+        params = {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline")
+        }
+        write_results(args.output, "bench_automation", params, rows)
+    if args.baseline:
+        regressions = compare(rows, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=400)
+    parser.add_argument("--wallets", type=int, default=32)
+    parser.add_argument("--strategy-ms", type=float, default=2.0)
+    parser.add_argument("--executor-ms", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--batch-size", type=int, default=0)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,83 @@
+"""Transfers/sec submitted through the batch transfer path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch_transfer [--transfers 200] [--rate-limit 0]
+
+Each row submits ``--transfers`` transfers with ``iter_transfer_submissions``
+against the local stub, at most ``concurrency`` in flight. ``concurrency=1`` is
+the previous one-request-at-a-time submission. With ``--rate-limit N`` the stub
+answers more than N transfers per second with 429; ``429s`` counts them, and
+every transfer should still succeed once. The last row resubmits the first
+batch, which must be refused in full because its request_ids are reused.
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.config import settings
+from app.rate_limit import UpstreamLimiter
+from app.services.batch_transfers import iter_transfer_submissions
+from app.services.cobo_service import CoboService
+from benchmarks.stub_server import StubCoboServer
+
+
+def transfer(i: int) -> dict:
+    return {
+        "source": {"source_type": "Asset", "wallet_id": f"wallet-{i % 10}"},
+        "token_id": "ETH",
+        "destination": {
+            "destination_type": "Address",
+            "account_output": {"address": f"0x{i:040x}", "amount": "0.01"},
+        },
+    }
+
+
+async def run_once(transfers: list, batch_id: str, concurrency: int) -> tuple:
+    succeeded = 0
+    started = time.perf_counter()
+    async for result in iter_transfer_submissions(transfers, batch_id, concurrency):
+        succeeded += result["status"] == "success"
+    elapsed = time.perf_counter() - started
+    return len(transfers) / elapsed, succeeded
+
+
+async def main(args):
+    transfers = [transfer(i) for i in range(args.transfers)]
+    with StubCoboServer(latency=args.latency, rate_limit=args.rate_limit) as stub:
+        stub.attach()
+        CoboService.shutdown()
+        # Upstream 429s come from the stub; no client-side limits on top
+        CoboService.limiter = UpstreamLimiter(
+            {}, burst=0, max_wait=0, initial_concurrency=0, max_concurrency=0
+        )
+        settings.COBO_SDK_MAX_WORKERS = max(args.concurrency)
+        print(
+            f"stub latency {args.latency * 1000:.0f} ms, {args.transfers} transfers "
+            f"per row, rate limit {args.rate_limit or 'off'}"
+        )
+        print(f"{'in-flight':>10} {'transfers/s':>12} {'succeeded':>10} {'429s':>6}")
+        for concurrency in args.concurrency:
+            throttled = stub.throttled
+            rate, succeeded = await run_once(
+                transfers, f"bench-{concurrency}", concurrency
+            )
+            print(
+                f"{concurrency:>10} {rate:>12.1f} {succeeded:>10} "
+                f"{stub.throttled - throttled:>6}"
+            )
+        rate, succeeded = await run_once(
+            transfers, f"bench-{args.concurrency[0]}", max(args.concurrency)
+        )
+        print(f"{'resubmit':>10} {rate:>12.1f} {succeeded:>10}")
+        CoboService.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transfers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,77 @@
+"""Requests/sec of CoboService calls as the number of in-flight calls grows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_concurrency [--latency 0.05] [--requests 256]
+
+Each row fires ``--requests`` concurrent ``CoboService.list_wallets`` calls,
+at most ``concurrency`` in flight at a time, against the local stub. With one
+SDK worker the calls are serialised (the behaviour of calling the SDK on the
+event loop); with a pool, throughput should grow with concurrency until the pool
+is saturated. ``loop lag`` is the worst delay seen by a 10 ms ticker running on
+the same event loop while the calls are in flight.
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.config import settings
+from app.rate_limit import UpstreamLimiter
+from app.services.cobo_service import CoboService
+from benchmarks.stub_server import StubCoboServer
+
+
+async def _ticker(lags: list, stop: asyncio.Event, interval: float = 0.01):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run_once(concurrency: int, total: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await CoboService.list_wallets(limit=10)
+
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    return total / elapsed, max(lags, default=0.0)
+
+
+async def main(latency: float, total: int, levels: list, pool_sizes: list):
+    with StubCoboServer(latency=latency) as stub:
+        stub.attach()
+        # Measure the SDK pool, not the client-side rate limits
+        CoboService.limiter = UpstreamLimiter(
+            {}, burst=0, max_wait=0, initial_concurrency=0, max_concurrency=0
+        )
+        print(f"stub latency {latency * 1000:.0f} ms, {total} calls per row")
+        print(f"{'workers':>8} {'in-flight':>10} {'req/s':>10} {'loop lag ms':>12}")
+        for workers in pool_sizes:
+            CoboService.shutdown()
+            settings.COBO_SDK_MAX_WORKERS = workers
+            for concurrency in levels:
+                rps, lag = await run_once(concurrency, total)
+                print(
+                    f"{workers:>8} {concurrency:>10} {rps:>10.1f} {lag * 1000:>12.1f}"
+                )
+        CoboService.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 32, 64])
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.requests, args.levels, args.workers))
@@ -0,0 +1,176 @@
+"""Logging cost per request on the calling thread, by logging setup.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_logging [--requests 20000] [--write-delay 0]
+        [--output logging.json] [--baseline previous.json] [--tolerance 0.2]
+
+Each "request" makes the log calls of a withdrawal at INFO: the call line
+with its ``extra`` fields, the request body at DEBUG, and the webhook line.
+The setups are:
+
+- ``disabled``: logging off, the floor;
+- ``previous``: f-strings formatted eagerly, the body logged at INFO and a
+  ``StreamHandler`` writing on the calling thread (the old ``basicConfig``);
+- ``text`` / ``json``: ``LogPipeline`` in either format, with redaction;
+- ``json sampled``: ``json`` keeping 10% of the service's INFO records.
+
+Output goes to /dev/null. ``--write-delay`` makes every write take that many
+seconds, like a full pipe or a slow disk: the previous setup then stalls
+each request while the pipeline only queues. The latencies are per request;
+the writer thread's own time is not included, but it competes for the GIL.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from app.logging_config import LogPipeline
+from benchmarks.results import compare, latency_row, print_rows, write_results
+
+LOGGER = "bench.cobo_service"
+
+
+class SlowStream:
+    def __init__(self, stream, delay: float):
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, text: str):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def body(i: int) -> Dict[str, Any]:
+    return {
+        "wallet_id": f"wallet-{i % 10}",
+        "token_id": "ETH",
+        "amount": "0.01",
+        "to_address": f"0x{i:040x}",
+        "request_id": f"bench-{i}",
+        "memo": None,
+        "fee_amount": None,
+        "fee_token": None,
+    }
+
+
+def previous_request(logger: logging.Logger, i: int):
+    request_body = body(i)
+    logger.info("Calling TransactionsApi -> create_transfer_transaction")
+    logger.info(f"Request body: {request_body}")
+    logger.info("Handling webhook event: transaction.created")
+    payload = {"type": "transaction.created", "data": request_body}
+    logger.info(f"Webhook payload: {payload}")
+
+
+def current_request(logger: logging.Logger, i: int):
+    request_body = body(i)
+    logger.info(
+        "Calling TransactionsApi -> create_transfer_transaction for request_id: %s",
+        request_body["request_id"],
+        extra={"wallet_id": request_body["wallet_id"], "token_id": "ETH"},
+    )
+    logger.debug("Request body: %s", request_body)
+    logger.info(
+        "Handling webhook event: %s",
+        "transaction.created",
+        extra={"event_id": f"event-{i}"},
+    )
+    logger.debug(
+        "Webhook payload: %s", {"type": "transaction.created", "data": request_body}
+    )
+
+
+def measure(name: str, setup, request, requests: int) -> Dict[str, Any]:
+    logger = logging.getLogger(f"{LOGGER}.{name.replace(' ', '_')}")
+    logger.propagate = False
+    teardown = setup(logger)
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for i in range(requests):
+        before = time.perf_counter()
+        request(logger, i)
+        latencies.append(time.perf_counter() - before)
+    elapsed = time.perf_counter() - started
+    teardown()
+    mean_us = round(sum(latencies) / len(latencies) * 1e6, 2)
+    return latency_row(name, latencies, elapsed, mean_us=mean_us)
+
+
+def main(args) -> int:
+    devnull = open(os.devnull, "w")
+    stream = SlowStream(devnull, args.write_delay)
+    redact = ["address", "amount"]
+
+    def disabled(logger):
+        logger.setLevel(logging.CRITICAL)
+        return lambda: None
+
+    def previous(logger):
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        return lambda: logger.removeHandler(handler)
+
+    def pipeline(**options):
+        def setup(logger):
+            installed = LogPipeline(
+                stream=stream,
+                redact_fields=redact,
+                queue_size=args.requests * 4,
+                **options,
+            ).install(logger)
+            return lambda: installed.uninstall(logger)
+
+        return setup
+
+    setups = [
+        ("disabled", disabled, current_request),
+        ("previous", previous, previous_request),
+        ("text", pipeline(format="text"), current_request),
+        ("json", pipeline(format="json"), current_request),
+        (
+            "json sampled",
+            pipeline(format="json", sampling={LOGGER: 0.1}),
+            current_request,
+        ),
+    ]
+    rows = [measure(*setup, args.requests) for setup in setups]
+    devnull.close()
+    print(f"{args.requests} requests, write delay {args.write_delay * 1000:.1f} ms")
+    print_rows(rows)
+    for row in rows:
+        print(f"{row['name']:<44} {row['mean_us']:>8.2f} us per request")
+    if args.output:
+        params = {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline")
+        }
+        write_results(args.output, "bench_logging", params, rows)
+    if args.baseline:
+        regressions = compare(rows, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--write-delay", type=float, default=0.0)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(main(parser.parse_args()))
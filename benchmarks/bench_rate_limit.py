@@ -0,0 +1,100 @@
+"""Goodput of transfer calls against a rate-limited upstream.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rate_limit [--transfers 600] [--upstream-limit 100]
+
+Each row fires ``--transfers`` ``CoboService.submit_transfer`` calls, 64 at a
+time, at a stub that answers more than ``--upstream-limit`` transaction
+requests per second with 429. Rows differ in the client-side limiter: none,
+adaptive concurrency only, and token buckets set below and above the upstream
+limit. ``accepted`` transfers went through (nothing is retried) and ``ok/s``
+is their rate; ``429s`` are upstream refusals and ``queued out`` calls the
+limiter refused after waiting ``--max-wait`` seconds.
+"""
+
+import argparse
+import asyncio
+import time
+
+from cobo_waas2.models import TransferParams
+
+from app.config import settings
+from app.rate_limit import RateLimitExceeded, UpstreamLimiter
+from app.services.cobo_service import CoboService
+from benchmarks.bench_batch_transfer import transfer
+from benchmarks.stub_server import StubCoboServer
+
+
+async def run_once(rows: int, offset: int, limiter: UpstreamLimiter) -> tuple:
+    CoboService.limiter = limiter
+    semaphore = asyncio.Semaphore(64)
+    accepted = rejected = 0
+
+    async def one(i: int):
+        nonlocal accepted, rejected
+        params = TransferParams.from_dict({**transfer(i), "request_id": f"r{i}"})
+        async with semaphore:
+            try:
+                await CoboService.submit_transfer(params)
+                accepted += 1
+            except RateLimitExceeded:
+                rejected += 1
+            except Exception:
+                pass
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(offset + i) for i in range(rows)))
+    return accepted, accepted / (time.perf_counter() - started), rejected
+
+
+async def main(args):
+    def limiter(rate):
+        rates = {} if rate is None else {"transactions": rate}
+        return UpstreamLimiter(
+            rates,
+            burst=5,
+            max_wait=args.max_wait,
+            initial_concurrency=8,
+            max_concurrency=64,
+        )
+
+    rows = [
+        ("off", None),
+        ("adaptive only", 0),
+        ("bucket 0.9x", args.upstream_limit * 0.9),
+        ("bucket 2x", args.upstream_limit * 2),
+    ]
+    with StubCoboServer(latency=args.latency, rate_limit=args.upstream_limit) as stub:
+        stub.attach()
+        CoboService.shutdown()
+        settings.COBO_SDK_MAX_WORKERS = 64
+        print(
+            f"stub latency {args.latency * 1000:.0f} ms, upstream limit "
+            f"{args.upstream_limit}/s, {args.transfers} transfers per row"
+        )
+        print(
+            f"{'limiter':<14} {'accepted':>9} {'ok/s':>8} {'429s':>6} "
+            f"{'queued out':>11}"
+        )
+        for n, (name, rate) in enumerate(rows):
+            throttled = stub.throttled
+            await asyncio.sleep(1)  # start each row in a fresh upstream window
+            accepted, ok, rejected = await run_once(
+                args.transfers, n * args.transfers, limiter(rate)
+            )
+            print(
+                f"{name:<14} {accepted:>9} {ok:>8.1f} "
+                f"{stub.throttled - throttled:>6} "
+                f"{rejected:>11}"
+            )
+        CoboService.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transfers", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--upstream-limit", type=int, default=100)
+    parser.add_argument("--max-wait", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
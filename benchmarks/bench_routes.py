@@ -0,0 +1,282 @@
+"""Latency, throughput and memory of every API route against the local stub.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_routes [--requests 200] [--concurrency 16]
+        [--latency 0.05] [--error-rate 0] [--page-size 50]
+        [--output routes.json] [--baseline previous.json] [--tolerance 0.2]
+
+The app runs in-process with its lifespan, driven over ASGI by httpx, and its
+SDK client points at the stub. Each route gets ``--requests`` requests with at
+most ``--concurrency`` in flight, after ``--concurrency`` untimed warm-up
+requests. The stub answers after ``--latency`` seconds,
+fails ``--error-rate`` of the requests with a 500, and pages lists by at most
+``--page-size`` items. ``errors`` counts responses with a 4xx/5xx status; the
+single transfer, contract call, message sign and withdraw routes still build
+flat SDK requests and fail here, which their rows show.
+
+``--output`` stores the rows as JSON (see ``benchmarks.results``). With
+``--baseline`` the run is compared against an earlier file and exits with
+status 1 if a route's p95 latency or throughput got worse by more than
+``--tolerance``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from app.api.routes import webhook_queue
+
+# %if app_type == portal
+from app.auth import get_org_id
+from app.cache import portal_org_token_cache
+
+# %endif
+from app.config import settings
+from app.main import app
+from app.rate_limit import UpstreamLimiter
+from app.services.cobo_service import CoboService
+from benchmarks.bench_batch_transfer import transfer
+from benchmarks.results import compare, latency_row, print_rows, write_results
+from benchmarks.stub_server import StubCoboServer
+
+ORG_ID = "org-bench"
+
+# name -> (method, path, request keyword arguments for the i-th request)
+Scenario = Tuple[str, str, Callable[[int], Dict[str, Any]]]
+
+
+def transaction_body(i: int, **fields) -> Dict[str, Any]:
+    return {
+        "request_id": f"bench-{time.time_ns()}-{i}",
+        "source_wallet_id": "wallet-1",
+        "source_address": "0x01",
+        **fields,
+    }
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "GET /api/wallets": ("GET", "/api/wallets", lambda i: {}),
+    "GET /api/wallets/chains": ("GET", "/api/wallets/chains", lambda i: {}),
+    "GET /api/wallets/tokens": ("GET", "/api/wallets/tokens", lambda i: {}),
+    "GET /api/wallets/check_address_validity": (
+        "GET",
+        "/api/wallets/check_address_validity",
+        lambda i: {"params": {"chain_id": "ETH", "address": f"0x{i:040x}"}},
+    ),
+    "POST /api/wallets/balances": (
+        "POST",
+        "/api/wallets/balances",
+        lambda i: {"json": {"wallet_ids": [f"wallet-{j}" for j in range(10)]}},
+    ),
+    "GET /api/wallets/{wallet_id}": (
+        "GET",
+        "/api/wallets/wallet-{i}",
+        lambda i: {},
+    ),
+    "GET /api/wallets/{wallet_id}/balance": (
+        "GET",
+        "/api/wallets/wallet-{i}/balance",
+        lambda i: {},
+    ),
+    "GET /api/wallets/{wallet_id}/transactions": (
+        "GET",
+        "/api/wallets/wallet-{i}/transactions",
+        lambda i: {},
+    ),
+    "POST /api/wallets/{wallet_id}/addresses": (
+        "POST",
+        "/api/wallets/wallet-{i}/addresses",
+        lambda i: {"json": {"chain_id": "ETH", "count": 2}},
+    ),
+    "GET /api/wallets/{wallet_id}/addresses": (
+        "GET",
+        "/api/wallets/wallet-{i}/addresses",
+        lambda i: {},
+    ),
+    "GET /api/wallets/{wallet_id}/addresses/export": (
+        "GET",
+        "/api/wallets/wallet-{i}/addresses/export",
+        lambda i: {"params": {"format": "csv"}},
+    ),
+    "POST /api/wallets/{wallet_id}/withdraw": (
+        "POST",
+        "/api/wallets/wallet-{i}/withdraw",
+        lambda i: {
+            "json": {
+                "amount": 0.01,
+                "token": "ETH",
+                "address": f"0x{i:040x}",
+                "request_id": f"bench-{time.time_ns()}-{i}",
+            }
+        },
+    ),
+    "GET /api/transactions": ("GET", "/api/transactions", lambda i: {}),
+    "GET /api/transactions/export": (
+        "GET",
+        "/api/transactions/export",
+        lambda i: {},
+    ),
+    "GET /api/transactions/{transaction_id}": (
+        "GET",
+        "/api/transactions/tx-{i}",
+        lambda i: {},
+    ),
+    "POST /api/transactions/transfer": (
+        "POST",
+        "/api/transactions/transfer",
+        lambda i: {
+            "json": transaction_body(
+                i, destination_address=f"0x{i:040x}", token_id="ETH", amount="0.01"
+            )
+        },
+    ),
+    "POST /api/transactions/transfer/batch": (
+        "POST",
+        "/api/transactions/transfer/batch",
+        lambda i: {
+            "json": {
+                "transfers": [transfer(j) for j in range(10)],
+                "batch_id": f"bench-{time.time_ns()}-{i}",
+            }
+        },
+    ),
+    "POST /api/transactions/contract_call": (
+        "POST",
+        "/api/transactions/contract_call",
+        lambda i: {
+            "json": transaction_body(
+                i,
+                destination_address=f"0x{i:040x}",
+                token_id="ETH",
+                amount="0",
+                calldata="0x",
+            )
+        },
+    ),
+    "POST /api/transactions/message_sign": (
+        "POST",
+        "/api/transactions/message_sign",
+        lambda i: {"json": transaction_body(i, message="hello")},
+    ),
+    "POST /api/webhook": (
+        "POST",
+        "/api/webhook",
+        lambda i: {
+            "json": {
+                "event_id": f"bench-{time.time_ns()}-{i}",
+                "type": "transaction.created",
+                "data": {"transaction_id": f"tx-{i}"},
+            }
+        },
+    ),
+    "GET /metrics": ("GET", "/metrics", lambda i: {}),
+}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    method, path, build = scenario
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            i = next(counter)
+            started = time.perf_counter()
+            response = await client.request(method, path.format(i=i % 10), **build(i))
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code >= 400
+
+    # Warm up connections, caches and the SDK worker threads first
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+    latencies.clear()
+    errors = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latency_row(name, latencies, time.perf_counter() - started, errors)
+
+
+async def main(args) -> int:
+    names = args.routes or list(SCENARIOS)
+    settings.WEBHOOK_VERIFY_SIGNATURE = False
+    stub = StubCoboServer(
+        latency=args.latency,
+        total_records=args.total_records,
+        error_rate=args.error_rate,
+        page_size=args.page_size,
+    )
+    with stub, tempfile.TemporaryDirectory() as tmp:
+        stub.attach()
+        webhook_queue.path = os.path.join(tmp, "webhooks.db")
+        settings.COBO_SDK_MAX_WORKERS = max(args.concurrency, 8)
+        CoboService.shutdown()
+        if not args.client_limits:
+            # Measure the routes, not the client-side rate limits
+            CoboService.limiter = UpstreamLimiter(
+                {}, burst=0, max_wait=0, initial_concurrency=0, max_concurrency=0
+            )
+        # %if app_type == portal
+        app.dependency_overrides[get_org_id] = lambda: ORG_ID
+        portal_org_token_cache[ORG_ID] = {"access_token": "bench"}
+        # %endif
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        rows = []
+        async with app.router.lifespan_context(app), httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=60
+        ) as client:
+            for name in names:
+                rows.append(
+                    await run_scenario(
+                        client, name, SCENARIOS[name], args.requests, args.concurrency
+                    )
+                )
+    print(
+        f"stub latency {args.latency * 1000:.0f} ms, error rate {args.error_rate}, "
+        f"{args.requests} requests per route, {args.concurrency} in flight"
+    )
+    print_rows(rows)
+    if args.output:
+        params = {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline")
+        }
+        write_results(args.output, "bench_routes", params, rows)
+    if args.baseline:
+        regressions = compare(rows, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--total-records", type=int, default=100)
+    parser.add_argument("--client-limits", action="store_true")
+    parser.add_argument("--routes", nargs="+", choices=list(SCENARIOS))
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,65 @@
+"""Cost of turning SDK list responses into HTTP response bodies.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization [--items 50] [--rounds 200]
+
+Compares the previous path (``to_dict()`` then ``JSONResponse``, which
+re-encodes with stdlib ``json``) with ``ModelJSONResponse`` on 50-item pages of
+``list_transactions`` and ``list_wallet_addresses``, and checks that both
+produce the same JSON.
+"""
+
+import argparse
+import json
+import timeit
+
+from cobo_waas2.models import ListAddresses200Response, ListTransactions200Response
+from fastapi.responses import JSONResponse
+
+from app.api.responses import ModelJSONResponse, model_content
+from benchmarks.stub_server import _address, _transaction
+
+
+def previous_path(result) -> bytes:
+    return JSONResponse(content={"status": "success", **result.to_dict()}).body
+
+
+def current_path(result) -> bytes:
+    return ModelJSONResponse(
+        content={"status": "success", **model_content(result)}
+    ).body
+
+
+def page(model, make, items: int):
+    return model.from_dict(
+        {
+            "data": [make(i) for i in range(items)],
+            "pagination": {"before": "", "after": "", "total_count": items},
+        }
+    )
+
+
+def main(items: int, rounds: int):
+    pages = {
+        "list_transactions": page(ListTransactions200Response, _transaction, items),
+        "list_wallet_addresses": page(ListAddresses200Response, _address, items),
+    }
+    print(f"{items}-item pages, {rounds} rounds")
+    print(f"{'endpoint':<24} {'previous ms':>12} {'current ms':>11} {'speedup':>8}")
+    for name, result in pages.items():
+        assert json.loads(previous_path(result)) == json.loads(current_path(result))
+        previous = timeit.timeit(lambda: previous_path(result), number=rounds)
+        current = timeit.timeit(lambda: current_path(result), number=rounds)
+        print(
+            f"{name:<24} {previous / rounds * 1000:>12.3f} "
+            f"{current / rounds * 1000:>11.3f} {previous / current:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    main(args.items, args.rounds)
@@ -0,0 +1,109 @@
+"""Latency percentiles, memory and JSON results shared by the benchmarks.
+
+A results file holds one benchmark run::
+
+    {"benchmark": ..., "created": ..., "python": ..., "params": {...},
+     "rows": [{"name": ..., "p50_ms": ..., "p95_ms": ..., "p99_ms": ...,
+               "throughput": ..., "errors": ..., "rss_mb": ...}, ...]}
+
+``compare`` matches rows by name against a baseline file and reports those
+whose p95 latency rose, or whose throughput fell, by more than a tolerance.
+"""
+
+import json
+import platform
+import resource
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile ``q`` (0-100) of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, round(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def latency_row(
+    name: str, latencies: Sequence[float], elapsed: float, errors: int = 0, **extra
+) -> Dict[str, Any]:
+    """Percentiles (ms), throughput (/s) and current RSS for one scenario."""
+    return {
+        "name": name,
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "throughput": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "errors": errors,
+        "rss_mb": round(rss_mb(), 1),
+        **extra,
+    }
+
+
+def rss_mb() -> float:
+    """Resident memory of this process, or its peak where that is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if platform.system() == "Darwin" else peak / 2**10
+
+
+def print_rows(rows: List[Dict[str, Any]]):
+    print(
+        f"{'scenario':<44} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'per s':>8} {'errors':>6} {'RSS MB':>7}"
+    )
+    for row in rows:
+        print(
+            f"{row['name']:<44} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {row['throughput']:>8.1f} {row['errors']:>6} "
+            f"{row['rss_mb']:>7.1f}"
+        )
+
+
+def write_results(
+    path: str, benchmark: str, params: Dict[str, Any], rows: List[Dict[str, Any]]
+):
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "benchmark": benchmark,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "params": params,
+                "rows": rows,
+            },
+            f,
+            indent=2,
+        )
+        f.write("\n")
+
+
+def compare(
+    rows: List[Dict[str, Any]], baseline_path: str, tolerance: float
+) -> List[str]:
+    """Regressions of ``rows`` against the results file at ``baseline_path``."""
+    with open(baseline_path) as f:
+        baseline = {row["name"]: row for row in json.load(f)["rows"]}
+    regressions = []
+    for row in rows:
+        before: Optional[Dict[str, Any]] = baseline.get(row["name"])
+        if before is None:
+            continue
+        if before["p95_ms"] and row["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{row['name']}: p95 {before['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms"
+            )
+        if row["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{row['name']}: throughput {before['throughput']:.1f} -> "
+                f"{row['throughput']:.1f}/s"
+            )
+    return regressions
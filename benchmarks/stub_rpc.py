@@ -0,0 +1,145 @@
+"""A local stand-in for an EVM JSON-RPC node, used by the on-chain reader.
+
+Contracts are plain Python: ``register(address, abi, handlers)`` maps function
+names to callables returning the decoded outputs (raise to revert). The stub
+answers ``eth_call`` directly and through Multicall3 ``aggregate3``, plus
+``eth_chainId`` and ``eth_blockNumber``, for single and batch requests.
+``requests`` counts HTTP round trips and ``calls`` counts contract calls.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict
+
+from eth_abi import decode, encode
+from eth_utils.abi import (
+    function_abi_to_4byte_selector,
+    get_abi_input_types,
+    get_abi_output_types,
+)
+
+from automation.defi.collectors.onchain import MULTICALL3_ADDRESS
+
+_AGGREGATE3 = bytes.fromhex("82ad56cb")
+
+
+class Revert(Exception):
+    pass
+
+
+class StubRpcServer:
+    def __init__(self, latency: float = 0.0, chain_id: int = 8453):
+        self.latency = latency
+        self.chain_id = chain_id
+        self.block_number = 1
+        self.requests = 0
+        self.calls = 0
+        self.url = None
+        # address -> selector -> (input types, output types, handler)
+        self._contracts: Dict[str, Dict[bytes, tuple]] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def register(self, address: str, abi: list, handlers: Dict[str, Callable]):
+        functions = {}
+        for entry in abi:
+            if entry.get("type") == "function" and entry["name"] in handlers:
+                functions[function_abi_to_4byte_selector(entry)] = (
+                    get_abi_input_types(entry),
+                    get_abi_output_types(entry),
+                    handlers[entry["name"]],
+                )
+        self._contracts[address.lower()] = functions
+
+    def call(self, address: str, data: bytes) -> bytes:
+        with self._lock:
+            self.calls += 1
+        functions = self._contracts.get(address.lower())
+        if functions is None or data[:4] not in functions:
+            raise Revert()
+        input_types, output_types, handler = functions[data[:4]]
+        result = handler(*decode(input_types, data[4:]))
+        if len(output_types) == 1:
+            result = (result,)
+        return encode(output_types, result)
+
+    def _aggregate3(self, data: bytes) -> bytes:
+        (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+        results = []
+        for target, allow_failure, call_data in calls:
+            try:
+                results.append((True, self.call(target, call_data)))
+            except Revert:
+                if not allow_failure:
+                    raise
+                results.append((False, b""))
+        return encode(["(bool,bytes)[]"], [results])
+
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        method, params = request["method"], request.get("params", [])
+        try:
+            if method == "eth_chainId":
+                response["result"] = hex(self.chain_id)
+            elif method == "eth_blockNumber":
+                response["result"] = hex(self.block_number)
+            elif method == "eth_call":
+                to = params[0]["to"]
+                data = bytes.fromhex(params[0].get("data", "0x")[2:])
+                if to.lower() == MULTICALL3_ADDRESS.lower() and data[:4] == _AGGREGATE3:
+                    result = self._aggregate3(data)
+                else:
+                    result = self.call(to, data)
+                response["result"] = "0x" + result.hex()
+            else:
+                response["error"] = {"code": -32601, "message": "Method not found"}
+        except Revert:
+            response["error"] = {"code": 3, "message": "execution reverted"}
+        return response
+
+    def start(self) -> "StubRpcServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                with stub._lock:
+                    stub.requests += 1
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if isinstance(body, list):
+                    result = [stub._dispatch(request) for request in body]
+                else:
+                    result = stub._dispatch(body)
+                payload = json.dumps(result).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubRpcServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
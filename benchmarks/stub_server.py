@@ -0,0 +1,294 @@
+"""A local stand-in for the Cobo WaaS 2 REST API, used by the benchmarks.
+
+The stub answers the endpoints the app proxies with small, well-formed payloads
+after a configurable delay. Transaction requests reuse Cobo's idempotency rule
+(a repeated ``request_id`` is refused) and, with ``rate_limit``, more than that
+many per second are answered with 429 and ``Retry-After``. With ``error_rate``
+that share of requests fails with a 500, and list endpoints return at most
+``page_size`` items per page. Responses are signed with a throwaway Ed25519 key;
+``StubCoboServer.attach()`` points ``CoboService`` at the stub and makes the SDK
+trust that key.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from nacl.signing import SigningKey
+
+
+def _wallet(i: int) -> dict:
+    return {
+        "wallet_id": f"wallet-{i}",
+        "wallet_type": "Custodial",
+        "wallet_subtype": "Asset",
+        "name": f"Wallet {i}",
+        "org_id": "org-stub",
+    }
+
+
+def _transaction(i: int) -> dict:
+    return {
+        "transaction_id": f"tx-{i}",
+        "request_id": f"req-{i}",
+        "wallet_id": f"wallet-{i % 10}",
+        "status": "Completed",
+        "chain_id": "ETH",
+        "token_id": "ETH",
+        "source": {"source_type": "Asset", "wallet_id": f"wallet-{i % 10}"},
+        "destination": {
+            "destination_type": "Address",
+            "account_output": {"address": f"0x{i:040x}", "amount": "1.5"},
+        },
+        "initiator_type": "API",
+        "created_timestamp": 1700000000000 + i,
+        "updated_timestamp": 1700000000000 + i,
+    }
+
+
+def _balance(i: int) -> dict:
+    return {
+        "token_id": ["ETH", "BTC", "USDT"][i % 3],
+        "balance": {"total": str(i + 1), "available": str(i + 1)},
+    }
+
+
+def _address(i: int) -> dict:
+    return {"address": f"0x{i:040x}", "chain_id": "ETH"}
+
+
+def _chain(i: int) -> dict:
+    return {"chain_id": f"CHAIN{i}", "symbol": f"C{i}"}
+
+
+def _token(i: int) -> dict:
+    return {"token_id": f"TOKEN{i}", "chain_id": "ETH", "symbol": f"T{i}"}
+
+
+class StubCoboServer:
+    """Serve the stub from a child process so it does not compete for the GIL."""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        total_records: int = 10,
+        rate_limit: int = 0,
+        error_rate: float = 0.0,
+        page_size: int = 50,
+    ):
+        self.latency = latency
+        self.total_records = total_records
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self._signing_key = SigningKey.generate()
+        self.api_secret = SigningKey.generate().encode().hex()
+        self.public_key = self._signing_key.verify_key.encode().hex()
+        self._requests = multiprocessing.Value("L", 0)
+        self._throttled = multiprocessing.Value("L", 0)
+        self._errors = multiprocessing.Value("L", 0)
+        self._process = None
+        self.url = ""
+
+    @property
+    def requests(self) -> int:
+        return self._requests.value
+
+    @property
+    def throttled(self) -> int:
+        """Requests answered with 429."""
+        return self._throttled.value
+
+    @property
+    def errors(self) -> int:
+        """Requests failed on purpose because of ``error_rate``."""
+        return self._errors.value
+
+    def start(self) -> "StubCoboServer":
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=self._serve, args=(child,), daemon=True
+        )
+        self._process.start()
+        host, port = parent.recv()
+        self.url = f"http://{host}:{port}/v2"
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _serve(self, conn):
+        # Served in the child process only
+        self._lock = threading.Lock()
+        self._request_ids = set()
+        self._window = (0, 0)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        server.daemon_threads = True
+        conn.send(server.server_address[:2])
+        server.serve_forever()
+
+    def attach(self):
+        """Point the app's SDK client at this stub."""
+        from cobo_waas2 import Configuration
+
+        from app.config import settings
+        from app.services.cobo_service import CoboApiClient, CoboService
+
+        public_key = self.public_key
+        Configuration.resp_pubkey = property(lambda _: public_key)
+        settings.COBO_API_HOST = self.url
+        for name in ("COBO_API_SECRET", "COBO_APP_SECRET"):
+            if hasattr(settings, name):
+                setattr(settings, name, self.api_secret)
+        CoboService.cobo_api_client = CoboApiClient()
+
+    def sign(self, body: bytes) -> dict:
+        timestamp = str(int(time.time() * 1000))
+        content = f"{body.decode()}|{timestamp}".encode()
+        digest = hashlib.sha256(hashlib.sha256(content).digest()).digest()
+        signature = self._signing_key.sign(digest).signature.hex()
+        return {"Biz-Timestamp": timestamp, "Biz-Resp-Signature": signature}
+
+    def page(self, make, query: dict) -> dict:
+        """One page of ``total_records`` items; cursors are item offsets."""
+        limit = min(int(query.get("limit", ["10"])[0]), self.page_size)
+        start = int(query.get("after", ["0"])[0] or 0)
+        end = min(start + limit, self.total_records)
+        return {
+            "data": [make(i) for i in range(start, end)],
+            "pagination": {
+                "before": str(start) if start else "",
+                "after": str(end) if end < self.total_records else "",
+                "total_count": self.total_records,
+            },
+        }
+
+    def _throttle(self) -> bool:
+        """Count one transaction request; True if it is over ``rate_limit``."""
+        if not self.rate_limit:
+            return False
+        second = int(time.time())
+        with self._lock:
+            start, count = self._window
+            count = count + 1 if start == second else 1
+            self._window = (second, count)
+        if count <= self.rate_limit:
+            return False
+        with self._throttled.get_lock():
+            self._throttled.value += 1
+        return True
+
+    def route(self, method: str, path: str, query: dict, body: dict):
+        if method == "GET":
+            if path == "/wallets":
+                return 200, self.page(_wallet, query)
+            if path == "/wallets/chains":
+                return 200, self.page(_chain, query)
+            if path == "/wallets/tokens":
+                return 200, self.page(_token, query)
+            if path == "/wallets/check_address_validity":
+                return 200, {"validity": True}
+            if path == "/transactions":
+                return 200, self.page(_transaction, query)
+            if m := re.fullmatch(r"/wallets/([^/]+)/tokens", path):
+                return 200, self.page(_balance, query)
+            if m := re.fullmatch(r"/wallets/([^/]+)/addresses", path):
+                return 200, self.page(_address, query)
+            if m := re.fullmatch(r"/transactions/([^/]+)", path):
+                return 200, {**_transaction(0), "transaction_id": m.group(1)}
+            if m := re.fullmatch(r"/wallets/([^/]+)", path):
+                return 200, {**_wallet(0), "wallet_id": m.group(1)}
+        if method == "POST":
+            if path in (
+                "/transactions/transfer",
+                "/transactions/contract_call",
+                "/transactions/message_sign",
+            ):
+                if self._throttle():
+                    return 429, {
+                        "error_code": 429,
+                        "error_message": "Too many requests",
+                    }
+                request_id = body.get("request_id") or str(uuid.uuid4())
+                with self._lock:
+                    duplicate = request_id in self._request_ids
+                    self._request_ids.add(request_id)
+                if duplicate:
+                    return 400, {
+                        "error_code": 2003,
+                        "error_message": f"Duplicate request_id: {request_id}",
+                    }
+                return 201, {
+                    "request_id": request_id,
+                    "transaction_id": str(uuid.uuid4()),
+                    "status": "Submitted",
+                }
+            if m := re.fullmatch(r"/wallets/([^/]+)/addresses", path):
+                return 201, [_address(i) for i in range(body.get("count", 1))]
+        return 404, {"error_code": 404, "error_message": f"No stub for {path}"}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self, method: str):
+                with stub._requests.get_lock():
+                    stub._requests.value += 1
+                url = urlparse(self.path)
+                path = url.path.removeprefix("/v2")
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw else {}
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.error_rate and random.random() < stub.error_rate:
+                    with stub._errors.get_lock():
+                        stub._errors.value += 1
+                    status, payload = 500, {
+                        "error_code": 500,
+                        "error_message": "Stub error",
+                    }
+                else:
+                    status, payload = stub.route(
+                        method, path, parse_qs(url.query), body
+                    )
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", f"{1 - time.time() % 1:.3f}")
+                for key, value in stub.sign(data).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        return Handler
@@ -7,7 +7,7 @@ client = TestClient(app)
 def test_root():
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"message": "Welcome to Cobo WaaS 2 Demo"}
+    assert response.json() == {"message": "Welcome to Cobo WaaS 2 Demo !!"}
 
 
 # Add more tests for each API endpoint
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from automation.defi.core.queues import OverflowPolicy, PipelineQueue
+
+
+def drain(queue: PipelineQueue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+        queue.task_done()
+    return items
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        (OverflowPolicy.DROP_OLDEST, [2, 3, 4]),
+        (OverflowPolicy.DROP_NEWEST, [0, 1, 2]),
+    ],
+)
+def test_drop_policies_never_block(policy, expected):
+    async def scenario():
+        queue = PipelineQueue(3, policy)
+        for i in range(5):
+            await queue.put(i)
+        assert queue.stats()["dropped"] == 2
+        items = drain(queue)
+        await asyncio.wait_for(queue.join(), 1)
+        return items
+
+    assert asyncio.run(scenario()) == expected
+
+
+def test_coalesce_keeps_latest_value_in_original_position():
+    async def scenario():
+        queue = PipelineQueue(2, OverflowPolicy.COALESCE, key=lambda item: item[0])
+        for item in [("reward", 1), ("price", 10), ("reward", 2), ("reward", 3)]:
+            await queue.put(item)
+        assert queue.stats()["coalesced"] == 2
+        await queue.put(("gas", 5))
+        stats = queue.stats()
+        items = drain(queue)
+        await asyncio.wait_for(queue.join(), 1)
+        return stats, items
+
+    stats, items = asyncio.run(scenario())
+    assert items == [("price", 10), ("gas", 5)]
+    assert stats["dropped"] == 1 and stats["depth"] == 2
+
+
+def test_block_applies_backpressure_and_tracks_wait_time():
+    async def scenario():
+        queue = PipelineQueue(1)
+        await queue.put("a")
+        blocked = asyncio.create_task(queue.put("b"))
+        await asyncio.sleep(0.02)
+        assert not blocked.done()
+        assert queue.get_nowait() == "a"
+        await blocked
+        return queue.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["depth"] == 1 and stats["dropped"] == 0
+    assert stats["wait_max"] >= 0.02
@@ -0,0 +1,152 @@
+import asyncio
+from contextlib import contextmanager
+from typing import List
+
+from automation.defi.core.automation import CoboAutomation
+from automation.defi.core.base import BatchExecutor
+from automation.defi.core.events import Action, Event
+from automation.defi.core.workers import WorkerPool
+
+
+def test_worker_pool_keeps_per_key_order_and_runs_keys_in_parallel():
+    handled = []
+    running = []
+    peak = []
+
+    async def handler(items):
+        (item,) = items
+        running.append(item)
+        peak.append(len(running))
+        await asyncio.sleep(0.01 if item[1] == 0 else 0)
+        running.remove(item)
+        handled.append(item)
+
+    async def scenario():
+        pool = WorkerPool("test", handler, workers=4, key=lambda item: item[0])
+        pool.start()
+        for seq in range(5):
+            for key in "abcd":
+                await pool.put((key, seq))
+        await pool.join()
+        await pool.stop()
+
+    asyncio.run(scenario())
+    assert len(handled) == 20
+    for key in "abcd":
+        assert [seq for k, seq in handled if k == key] == list(range(5))
+    assert max(peak) > 1
+
+
+def test_failing_executor_does_not_stall_other_executors():
+    executed = []
+
+    async def strategy(event: Event) -> List[Action]:
+        return [Action(type="tx", data=event.data)]
+
+    async def failing(action: Action):
+        raise RuntimeError("boom")
+
+    async def recording(action: Action):
+        executed.append(action.data["seq"])
+
+    async def scenario():
+        automation = CoboAutomation(strategy_workers=2, executor_workers=2)
+        automation.add_strategy(strategy)
+        automation.add_executor(failing)
+        automation.add_executor(recording)
+        await automation.start()
+        for seq in range(10):
+            await automation.strategy_pool.put(Event(type="tick", data={"seq": seq}))
+        await automation.drain()
+        await automation.stop()
+
+    asyncio.run(scenario())
+    assert sorted(executed) == list(range(10))
+
+
+class RecordingBatchExecutor(BatchExecutor):
+    max_batch_size = 8
+    max_batch_wait = 0.05
+
+    def __init__(self):
+        self.batches = []
+
+    async def execute_batch(self, actions: List[Action]):
+        self.batches.append([action.data["seq"] for action in actions])
+
+
+def test_batch_executor_receives_batches_alongside_single_executors():
+    batch_executor = RecordingBatchExecutor()
+    singles = []
+
+    async def single(action: Action):
+        singles.append(action.data["seq"])
+
+    async def scenario():
+        automation = CoboAutomation()
+        automation.add_executor(batch_executor)
+        automation.add_executor(single)
+        await automation.start()
+        for seq in range(20):
+            await automation.executor_pool.put(Action(type="tx", data={"seq": seq}))
+        await automation.drain()
+        # Arrives after the batch window closed: handled on its own
+        await asyncio.sleep(0.1)
+        await automation.executor_pool.put(Action(type="tx", data={"seq": 20}))
+        await automation.drain()
+        stats = automation.stats()["executor_queue"]
+        await automation.stop()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert batch_executor.batches == [
+        list(range(0, 8)),
+        list(range(8, 16)),
+        list(range(16, 20)),
+        [20],
+    ]
+    assert singles == list(range(21))
+    assert stats["batches"] == 4
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = {"name": name, **(attributes or {}), "error": None}
+        try:
+            yield span
+        except Exception as e:
+            span["error"] = str(e)
+            raise
+        finally:
+            self.spans.append(span)
+
+
+def test_stages_are_traced_when_a_tracer_is_given():
+    tracer = RecordingTracer()
+
+    async def strategy(event: Event) -> List[Action]:
+        return [Action(type="tx", data=event.data)]
+
+    async def failing(action: Action):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        automation = CoboAutomation(tracer=tracer)
+        automation.add_strategy(strategy)
+        automation.add_executor(failing)
+        await automation.start()
+        await automation.strategy_pool.put(Event(type="tick", data={"seq": 1}))
+        await automation.drain()
+        await automation.stop()
+
+    asyncio.run(scenario())
+    assert [span["name"] for span in tracer.spans] == [
+        "automation.strategy",
+        "automation.executor",
+    ]
+    assert tracer.spans[0]["batch_size"] == 1
+    assert tracer.spans[1]["error"] == "boom"
@@ -0,0 +1,61 @@
+import asyncio
+
+from cobo_waas2.models import ListTokenBalancesForAddress200Response
+
+from app.services import balances
+from app.services.balances import BalanceTotals, iter_wallet_balances
+
+
+def balance_page(token_balances, after=""):
+    return ListTokenBalancesForAddress200Response.from_dict(
+        {
+            "data": [
+                {"token_id": token_id, "balance": {"total": total, "available": total}}
+                for token_id, total in token_balances
+            ],
+            "pagination": {"before": "", "after": after, "total_count": 0},
+        }
+    )
+
+
+def test_fan_out_bounds_concurrency_and_reports_partial_failures(monkeypatch):
+    running = []
+    peak = []
+
+    async def get_wallet_balance(wallet_id, token_ids, limit, before, after):
+        running.append(wallet_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(wallet_id)
+        if wallet_id == "bad":
+            raise RuntimeError("boom")
+        if after is None:
+            return balance_page([("ETH", "1.5")], after="next")
+        return balance_page([("BTC", "0.1")])
+
+    monkeypatch.setattr(balances.CoboService, "get_wallet_balance", get_wallet_balance)
+
+    async def collect():
+        wallet_ids = ["a", "b", "bad", "c", "a"]
+        return [r async for r in iter_wallet_balances(wallet_ids, None, 2)]
+
+    results = asyncio.run(collect())
+    by_wallet = {r["wallet_id"]: r for r in results}
+    assert len(results) == 4
+    assert by_wallet["bad"] == {
+        "wallet_id": "bad",
+        "status": "error",
+        "message": "boom",
+    }
+    assert [b.token_id for b in by_wallet["a"]["data"]] == ["ETH", "BTC"]
+    # One call in flight per wallet: the fan-out reaches the concurrency of 2
+    # and goes no further
+    assert max(peak) == 2
+
+    totals = BalanceTotals()
+    for result in results:
+        totals.add(result)
+    assert totals.to_dict() == {
+        "ETH": {"total": "4.5", "available": "4.5", "pending": "0", "locked": "0"},
+        "BTC": {"total": "0.3", "available": "0.3", "pending": "0", "locked": "0"},
+    }
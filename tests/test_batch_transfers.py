@@ -0,0 +1,107 @@
+import asyncio
+import json
+import uuid
+
+from cobo_waas2.exceptions import ApiException
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.main import app
+from app.services import batch_transfers
+from app.services.batch_transfers import batch_request_ids, iter_transfer_submissions
+
+
+def transfer(i: int, **extra) -> dict:
+    return {
+        "source": {"source_type": "Asset", "wallet_id": "wallet-1"},
+        "token_id": "ETH",
+        "destination": {
+            "destination_type": "Address",
+            "account_output": {"address": f"0x{i:040x}", "amount": "0.01"},
+        },
+        **extra,
+    }
+
+
+def rate_limited() -> ApiException:
+    e = ApiException(status=429, reason="Too Many Requests")
+    e.headers = {"Retry-After": "0.05"}
+    return e
+
+
+def test_request_ids_are_stable_per_batch_id_only():
+    transfers = [transfer(0), transfer(1, request_id="mine")]
+    assert batch_request_ids(transfers, "b1") == batch_request_ids(
+        [transfer(5), transfer(1, request_id="mine")], "b1"
+    )
+    assert (
+        batch_request_ids(transfers, "b1")[0] != batch_request_ids(transfers, "b2")[0]
+    )
+    # Without a batch_id, the same contents are a new payout with new ids
+    ids = batch_request_ids(transfers)
+    assert ids[1] == "mine"
+    assert ids[0] != batch_request_ids([transfer(0), transfer(1)])[0]
+    assert uuid.UUID(ids[0]).version == 4
+
+
+def test_submissions_bound_concurrency_retry_429_and_report_failures(monkeypatch):
+    running = []
+    peak = []
+    attempts = {}
+
+    async def submit_transfer(params):
+        running.append(params.request_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(params.request_id)
+        attempts[params.request_id] = attempts.get(params.request_id, 0) + 1
+        if params.destination.actual_instance.account_output.amount == "9":
+            raise RuntimeError("rejected")
+        if params.request_id == "limited" and attempts["limited"] == 1:
+            raise rate_limited()
+        return {"request_id": params.request_id, "status": "Submitted"}
+
+    monkeypatch.setattr(batch_transfers.CoboService, "submit_transfer", submit_transfer)
+
+    transfers = [transfer(i) for i in range(4)]
+    transfers.append(transfer(4, request_id="limited"))
+    transfers.append({"token_id": "ETH"})
+    bad = transfer(6)
+    bad["destination"]["account_output"]["amount"] = "9"
+    transfers.append(bad)
+
+    async def collect():
+        return [r async for r in iter_transfer_submissions(transfers, "b1", 2)]
+
+    results = sorted(asyncio.run(collect()), key=lambda r: r["index"])
+    assert [r["status"] for r in results] == ["success"] * 5 + ["error"] * 2
+    assert results[4]["request_id"] == "limited" and attempts["limited"] == 2
+    assert "source" in results[5]["message"]
+    assert results[6]["message"] == "rejected"
+    assert max(peak) <= 2
+
+
+def test_batch_route_streams_results_and_summary(monkeypatch):
+    async def submit_transfer(params):
+        return {"request_id": params.request_id, "status": "Submitted"}
+
+    async def ensure_org_client(org_id):
+        pass
+
+    monkeypatch.setattr(batch_transfers.CoboService, "submit_transfer", submit_transfer)
+    if hasattr(routes, "get_org_id"):
+        monkeypatch.setattr(routes.CoboService, "ensure_org_client", ensure_org_client)
+        app.dependency_overrides[routes.get_org_id] = lambda: "org"
+
+    try:
+        response = TestClient(app).post(
+            "/api/transactions/transfer/batch",
+            json={"transfers": [transfer(0), transfer(1)], "batch_id": "b1"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines[:-1]) == [0, 1]
+    assert lines[-1] == {"summary": {"total": 2, "succeeded": 2, "failed": 0}}
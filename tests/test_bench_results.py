@@ -0,0 +1,20 @@
+from benchmarks.results import compare, latency_row, percentile, write_results
+
+
+def test_percentiles_and_regressions_against_a_baseline(tmp_path):
+    samples = [i / 1000 for i in range(1, 101)]
+    assert (percentile(samples, 50), percentile(samples, 99)) == (0.05, 0.099)
+
+    baseline = latency_row("GET /api/wallets", samples, elapsed=1.0)
+    assert (baseline["p95_ms"], baseline["throughput"]) == (95.0, 100.0)
+    path = str(tmp_path / "baseline.json")
+    write_results(path, "bench_routes", {}, [baseline])
+
+    same = latency_row("GET /api/wallets", samples, elapsed=1.1)
+    slower = latency_row("GET /api/wallets", [s * 2 for s in samples], elapsed=2.0)
+    new = latency_row("GET /metrics", samples, elapsed=10.0)
+    assert compare([same, new], path, tolerance=0.2) == []
+    assert compare([slower], path, tolerance=0.2) == [
+        "GET /api/wallets: p95 95.0 -> 190.0 ms",
+        "GET /api/wallets: throughput 100.0 -> 50.0/s",
+    ]
@@ -0,0 +1,134 @@
+import asyncio
+import fnmatch
+import socketserver
+import threading
+import time
+
+import pytest
+
+from app.cache_backend import FileCache, MemoryCache, RedisCache
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of a Redis server for RedisCache: GET, SET [PX], DEL, SCAN."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.data = {}
+        super().__init__(("127.0.0.1", 0), RespHandler)
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        store = self.server.data
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2].decode())
+            command = args[0].upper()
+            if command == "GET":
+                value, expires_at = store.get(args[1], (None, None))
+                if value is None or (expires_at and expires_at <= time.time()):
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    data = value.encode()
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(data), data))
+            elif command == "SET":
+                expires_at = None
+                if len(args) == 5 and args[3].upper() == "PX":
+                    expires_at = time.time() + int(args[4]) / 1000
+                store[args[1]] = (args[2], expires_at)
+                self.wfile.write(b"+OK\r\n")
+            elif command == "DEL":
+                self.wfile.write(b":%d\r\n" % int(store.pop(args[1], None) is not None))
+            elif command == "SCAN":
+                # One page for everything; the pattern has no escapes here
+                keys = [k.encode() for k in store if fnmatch.fnmatchcase(k, args[3])]
+                reply = [b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys)]
+                reply += [b"$%d\r\n%s\r\n" % (len(k), k) for k in keys]
+                self.wfile.write(b"".join(reply))
+
+
+@pytest.fixture
+def resp_server():
+    server = RespStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_memory_cache_lru_ttl_and_stats():
+    cache = MemoryCache(max_entries=2, ttl=60)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+    assert cache.get("b") is None
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert "d" not in cache
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 3, "size": 1}
+
+
+def test_file_cache_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = FileCache(path, "tokens", max_entries=2)
+    worker_b = FileCache(path, "tokens", max_entries=2)
+    worker_a["org-1"] = {"access_token": "t1"}
+    assert worker_b["org-1"] == {"access_token": "t1"}
+    worker_b["org-2"] = {"access_token": "t2"}
+    worker_b["org-3"] = {"access_token": "t3"}
+    assert worker_a.get("org-1") is None
+    assert len(worker_a) == 2
+    with pytest.raises(KeyError):
+        worker_a["missing"]
+
+
+def test_redis_cache_against_stand_in(resp_server):
+    port = resp_server.server_address[1]
+    cache = RedisCache(f"redis://127.0.0.1:{port}/0", "payloads", ttl=60)
+    cache["user-org"] = {"sub": "user", "org_id": "org"}
+    assert cache["user-org"] == {"sub": "user", "org_id": "org"}
+    assert resp_server.data["cobo:payloads:user-org"][1] is not None
+    cache.set("short", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    del cache["user-org"]
+    assert "user-org" not in cache
+    assert cache.stats()["hits"] == 1
+
+    # Only this cache's keys count towards its size
+    resp_server.data["other:key"] = ("1", None)
+    cache["a"] = 1
+    assert len(cache) == 2  # "a" and the expired "short" the stand-in keeps
+    cache.close()
+
+
+def test_shared_cache_io_runs_off_the_event_loop(tmp_path):
+    cache = FileCache(str(tmp_path / "cache.sqlite3"), "payloads")
+    threads = []
+    get = cache.get
+
+    def recording_get(key, default=None):
+        threads.append(threading.current_thread().name)
+        return get(key, default)
+
+    cache.get = recording_get
+
+    async def main():
+        await cache.aset("k", {"v": 1})
+        assert await cache.aget("k") == {"v": 1}
+        await cache.adelete("k")
+        assert await cache.aget("k") is None
+        await cache.refresh_size()
+
+    asyncio.run(main())
+    assert threads and all(name.startswith("cache-payloads") for name in threads)
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,34 @@
+import time
+
+from app.services.client_pool import CoboApiClientPool
+from app.services.cobo_service import CoboApiClient
+
+
+def make_pool(**kwargs):
+    options = dict(max_clients=2, idle_ttl=60, max_connections=8)
+    options.update(kwargs)
+    return CoboApiClientPool(CoboApiClient, **options)
+
+
+def test_token_change_keeps_client():
+    pool = make_pool()
+    client = pool.set_access_token("org-1", "token-a")
+    assert pool.set_access_token("org-1", "token-b") is client
+    assert client.configuration.access_token == "token-b"
+    assert client.default_headers["Authorization"] == "Bearer token-b"
+    assert client.configuration.connection_pool_maxsize == 4
+
+
+def test_lru_and_idle_eviction():
+    pool = make_pool()
+    pool.set_access_token("org-1", "a")
+    pool.set_access_token("org-2", "b")
+    pool.get("org-1")
+    pool.set_access_token("org-3", "c")
+    assert "org-2" not in pool
+    assert "org-1" in pool and "org-3" in pool
+
+    pool.idle_ttl = 0.01
+    time.sleep(0.02)
+    assert pool.get("org-1") is None
+    assert len(pool) == 0
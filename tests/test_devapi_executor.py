@@ -0,0 +1,50 @@
+import asyncio
+
+from cobo_waas2 import Configuration
+
+from automation.defi.executors.devapi import (
+    DevApiExecutor,
+    DevApiTransactionAction,
+    action_request_id,
+)
+from benchmarks.stub_server import StubCoboServer
+
+
+def contract_call(i: int) -> dict:
+    return {
+        "chain_id": "BASE_ETH",
+        "source": {
+            "source_type": "Org-Controlled",
+            "wallet_id": "wallet-1",
+            "address": "0x" + "1" * 40,
+        },
+        "destination": {
+            "destination_type": "EVM_Contract",
+            "address": "0x" + "2" * 40,
+            "calldata": f"0x{i:08x}",
+        },
+    }
+
+
+def test_batch_is_submitted_once_each_through_rate_limits(monkeypatch):
+    with StubCoboServer(latency=0.01, rate_limit=5) as stub:
+        monkeypatch.setattr(
+            Configuration, "resp_pubkey", property(lambda _: stub.public_key)
+        )
+        executor = DevApiExecutor(stub.api_secret, "dev", host=stub.url)
+        actions = [DevApiTransactionAction(data=contract_call(i)) for i in range(8)]
+        # The same action again keeps its request_id and is rejected...
+        actions.append(actions[0])
+        # ...while a new action with the same contents is a new transaction
+        actions.append(DevApiTransactionAction(data=contract_call(1)))
+
+        async def run():
+            await executor.execute_batch(actions)
+            await executor.stop()
+
+        asyncio.run(run())
+
+        assert stub.throttled > 0
+        assert (executor.submitted, executor.failed) == (9, 1)
+        assert action_request_id(actions[1]) != action_request_id(actions[-1])
+        assert executor._threads._shutdown
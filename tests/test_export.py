@@ -0,0 +1,138 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from cobo_waas2.models import AddressInfo, ListAddresses200Response
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.api.export import _encode
+from app.main import app
+from app.models.wallet import ExportFormat
+from app.services.pagination import iter_pages
+
+
+def address_page(addresses, after=""):
+    return ListAddresses200Response.from_dict(
+        {
+            "data": [
+                {"address": address, "chain_id": "ETH", "path": f"m/{i}"}
+                for i, address in enumerate(addresses)
+            ],
+            "pagination": {"before": "", "after": after, "total_count": 0},
+        }
+    )
+
+
+def pages_of(*pages, error=None):
+    async def gen():
+        for page in pages:
+            yield [AddressInfo.from_dict(item) for item in page]
+        if error is not None:
+            raise error
+
+    return gen()
+
+
+def encode(pages, export_format):
+    chunks = []
+
+    async def collect():
+        async for chunk in _encode(pages, export_format):
+            chunks.append(chunk)
+
+    try:
+        asyncio.run(collect())
+    except Exception as e:
+        return b"".join(chunks).decode(), e
+    return b"".join(chunks).decode(), None
+
+
+def test_iter_pages_follows_the_cursor_and_prefetches():
+    responses = {
+        None: address_page(["0x1", "0x2"], after="c1"),
+        "c1": address_page(["0x3"], after="c2"),
+        "c2": address_page([], after="c3"),
+    }
+    requested = []
+
+    async def fetch_page(after):
+        requested.append(after)
+        return responses[after]
+
+    async def collect():
+        seen = []
+        async for data in iter_pages(fetch_page):
+            # The next page is requested while this one is being processed
+            await asyncio.sleep(0)
+            seen.append((len(requested), [a.address for a in data]))
+        return seen
+
+    assert asyncio.run(collect()) == [(2, ["0x1", "0x2"]), (3, ["0x3"]), (3, [])]
+    # An empty page ends the walk even when it carries a cursor
+    assert requested == [None, "c1", "c2"]
+
+
+def test_csv_has_one_header_in_model_field_order():
+    page = [{"chain_id": "ETH", "address": "0x1", "path": "m/0"}]
+    text, error = encode(
+        pages_of(page, [{"address": "0x2", "chain_id": "BTC"}]), ExportFormat.CSV
+    )
+
+    assert error is None
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == list(AddressInfo.model_fields)
+    assert rows[1][:3] == ["0x1", "ETH", ""] and rows[1][3] == "m/0"
+    assert rows[2][:2] == ["0x2", "BTC"]
+    assert len(rows) == 3
+
+
+def test_ndjson_ends_with_an_error_line_and_aborts():
+    text, error = encode(
+        pages_of([{"address": "0x1", "chain_id": "ETH"}], error=RuntimeError("boom")),
+        ExportFormat.NDJSON,
+    )
+
+    lines = [json.loads(line) for line in text.splitlines()]
+    assert lines[0]["address"] == "0x1"
+    assert lines[-1] == {"status": "error", "message": "boom"}
+    assert isinstance(error, RuntimeError)
+
+
+def test_csv_aborts_on_an_upstream_error():
+    text, error = encode(
+        pages_of([{"address": "0x1", "chain_id": "ETH"}], error=RuntimeError("boom")),
+        ExportFormat.CSV,
+    )
+
+    assert isinstance(error, RuntimeError)
+    assert len(list(csv.reader(io.StringIO(text)))) == 2
+
+
+def test_export_responses_are_cut_off_on_upstream_errors(monkeypatch):
+    async def list_wallet_addresses(*args, limit, before, after):
+        if after is None:
+            return address_page(["0x1"], after="c1")
+        raise RuntimeError("boom")
+
+    async def ensure_org_client(org_id):
+        pass
+
+    monkeypatch.setattr(
+        routes.CoboService, "list_wallet_addresses", list_wallet_addresses
+    )
+    if hasattr(routes, "get_org_id"):
+        monkeypatch.setattr(routes.CoboService, "ensure_org_client", ensure_org_client)
+        app.dependency_overrides[routes.get_org_id] = lambda: "org"
+
+    try:
+        # The middleware stack may wrap the error in an ExceptionGroup
+        with pytest.raises(Exception) as raised:
+            TestClient(app).get("/api/wallets/w1/addresses/export?format=csv")
+    finally:
+        app.dependency_overrides.clear()
+    assert isinstance(raised.value, RuntimeError) or raised.group_contains(
+        RuntimeError, match="boom", depth=None
+    )
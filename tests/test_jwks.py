@@ -0,0 +1,42 @@
+import asyncio
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.jwks import JWKSCache
+
+
+def make_cache(jwks: dict, fetches: list) -> JWKSCache:
+    def handler(request):
+        fetches.append(request.url)
+        return httpx.Response(
+            200, json=jwks, headers={"Cache-Control": "public, max-age=600"}
+        )
+
+    cache = JWKSCache("https://jwks.test/jwks.json", min_refetch_interval=60)
+    cache._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return cache
+
+
+def test_burst_of_logins_fetches_once():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    fetches = []
+    cache = make_cache({"keys": [{**jwk, "kid": "k1"}]}, fetches)
+
+    async def scenario():
+        keys = await asyncio.gather(*(cache.get_key("k1", "RS256") for _ in range(20)))
+        missing = await asyncio.gather(
+            *(cache.get_key("unknown", "RS256") for _ in range(5))
+        )
+        await cache.aclose()
+        return keys, missing
+
+    keys, missing = asyncio.run(scenario())
+    assert len(fetches) == 1
+    assert cache._max_age == 600
+    assert all(key is keys[0] and key is not None for key in keys)
+    assert missing == [None] * 5
+    token = jwt.encode({"sub": "u"}, private_key, algorithm="RS256")
+    assert jwt.decode(token, keys[0], algorithms=["RS256"]) == {"sub": "u"}
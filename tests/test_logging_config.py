@@ -0,0 +1,98 @@
+import io
+import json
+import logging
+import threading
+
+from app.logging_config import (
+    REDACTED,
+    LogPipeline,
+    RedactingFilter,
+    SamplingFilter,
+    parse_sampling,
+)
+from app.tracing import MemoryExporter, Tracer
+
+
+def run_pipeline(records, **options):
+    stream = io.StringIO()
+    logger = logging.getLogger("test.pipeline")
+    logger.propagate = False
+    pipeline = LogPipeline(stream=stream, **options).install(logger)
+    try:
+        for record in records:
+            record(logger)
+    finally:
+        pipeline.uninstall(logger)
+        logger.propagate = True
+    return pipeline, stream.getvalue().splitlines()
+
+
+def test_json_lines_are_redacted_and_carry_the_trace():
+    body = {
+        "request_id": "r-1",
+        "to_address": "0xabc",
+        "amount": "1.5",
+        "fees": [{"fee_amount": "0.1", "token_id": "ETH"}],
+    }
+    tracer = Tracer(MemoryExporter(), sample_rate=1)
+    traceparents = []
+
+    def log(logger):
+        with tracer.start_as_current_span("request") as span:
+            logger.info("Request body: %s", body, extra={"address": "0xdef"})
+            traceparents.append(span.traceparent)
+
+    _, lines = run_pipeline([log], format="json", redact_fields=["address", "amount"])
+
+    (entry,) = [json.loads(line) for line in lines]
+    assert entry["level"] == "INFO" and entry["logger"] == "test.pipeline"
+    assert "0xabc" not in entry["message"] and "1.5" not in entry["message"]
+    assert "'fee_amount': '[REDACTED]'" in entry["message"]
+    assert "'request_id': 'r-1'" in entry["message"]
+    assert entry["address"] == REDACTED
+    assert traceparents[0].split("-")[1:3] == [entry["trace_id"], entry["span_id"]]
+    # The caller's objects are not modified
+    assert body["to_address"] == "0xabc"
+
+
+def test_records_are_formatted_on_the_writer_thread():
+    formatted_on = []
+
+    class Arg:
+        def __str__(self):
+            formatted_on.append(threading.current_thread().name)
+            return "arg"
+
+    _, lines = run_pipeline([lambda logger: logger.warning("value %s", Arg())])
+
+    assert lines[0].endswith("test.pipeline - WARNING - value arg")
+    assert formatted_on and formatted_on[0] != "MainThread"
+
+
+def test_sampling_keeps_warnings_and_the_configured_share():
+    sampler = SamplingFilter(parse_sampling("test=0, test.pipeline.kept=1"))
+
+    def record(name, level):
+        return logging.LogRecord(name, level, "", 0, "msg", (), None)
+
+    assert not sampler.filter(record("test.pipeline", logging.INFO))
+    assert sampler.filter(record("test.pipeline", logging.WARNING))
+    assert sampler.filter(record("test.pipeline.kept.child", logging.INFO))
+    assert sampler.filter(record("testing", logging.INFO))
+    assert sampler.dropped == 1
+
+    def noisy(logger):
+        for i in range(100):
+            logger.info("call %s", i)
+
+    pipeline, lines = run_pipeline([noisy], sampling={"test.pipeline": 0})
+    assert lines == [] and pipeline.stats()["sampled_out"] == 100
+
+
+def test_redaction_matches_field_suffixes_only():
+    redactor = RedactingFilter(["address"])
+    assert redactor.sensitive("to_address") and redactor.sensitive("Address")
+    assert not redactor.sensitive("addresses") and not redactor.sensitive(1)
+    assert redactor.redact(({"addresses": [{"address": "0x1"}]},)) == (
+        {"addresses": [{"address": REDACTED}]},
+    )
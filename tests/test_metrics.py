@@ -0,0 +1,91 @@
+import asyncio
+
+from cobo_waas2 import Configuration
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.metrics import Registry, cobo_call_duration, cobo_call_phase
+from app.services.cobo_service import CoboService
+from benchmarks.stub_server import StubCoboServer
+
+
+def test_histograms_render_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), (0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, "/a")
+    registry.add_collector("queued", "Queued", lambda: [({"pool": 'x"y'}, 2)])
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+    ]
+    assert lines[2:7] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+    assert lines[-1] == 'queued{pool="x\\"y"} 2'
+
+
+def test_requests_are_counted_per_route_template():
+    client = TestClient(app)
+    client.get("/")
+    client.get("/no/such/path")
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/"}' in body
+    assert "webhook_pending 0" in body
+
+
+def test_sdk_calls_split_upstream_and_local_time(monkeypatch):
+    with StubCoboServer(latency=0.05) as stub:
+        monkeypatch.setattr(
+            Configuration, "resp_pubkey", Configuration.__dict__["resp_pubkey"]
+        )
+        monkeypatch.setattr(settings, "COBO_API_HOST", settings.COBO_API_HOST)
+        monkeypatch.setattr(CoboService, "cobo_api_client", CoboService.cobo_api_client)
+        stub.attach()
+        calls = cobo_call_duration.count("list_wallets")
+        upstream = cobo_call_phase.total("list_wallets", "upstream")
+        local = cobo_call_phase.total("list_wallets", "local")
+        try:
+            asyncio.run(CoboService.list_wallets())
+        finally:
+            CoboService.shutdown()
+
+    assert cobo_call_duration.count("list_wallets") == calls + 1
+    upstream = cobo_call_phase.total("list_wallets", "upstream") - upstream
+    local = cobo_call_phase.total("list_wallets", "local") - local
+    assert upstream >= 0.05
+    assert 0 < local < upstream
+
+
+def test_limiter_metrics_leave_out_org_ids_unless_asked(monkeypatch):
+    class Limiter:
+        def stats(self):
+            counts = {"throttled": 1, "rejected": 0, "queued": 0}
+            counts["concurrency_limit"] = 32
+            return {
+                "org-a/wallets": {**counts, "in_flight": 2},
+                "org-b/wallets": {**counts, "in_flight": 1},
+            }
+
+    monkeypatch.setattr(CoboService, "limiter", Limiter())
+    client = TestClient(app)
+
+    body = client.get("/metrics").text
+    assert "# HELP cobo_limiter_throttled_total Cobo calls answered with 429" in body
+    assert 'cobo_limiter_throttled_total{family="wallets"} 2' in body
+    assert 'cobo_limiter_in_flight{family="wallets"} 3' in body
+    assert "org-a" not in body
+
+    monkeypatch.setattr(settings, "METRICS_ORG_LABELS", True)
+    body = client.get("/metrics").text
+    assert 'cobo_limiter_in_flight{org="org-a",family="wallets"} 2' in body
@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from automation.defi.collectors.onchain import (
+    BlockCollector,
+    OnChainCollector,
+    OnChainReader,
+    ViewCall,
+    changed,
+    crossed,
+)
+from benchmarks.stub_rpc import Revert, StubRpcServer
+
+TOKEN = "0x00000000000000000000000000000000000000aa"
+ERC20_ABI = [
+    {
+        "type": "function",
+        "name": "balanceOf",
+        "stateMutability": "view",
+        "inputs": [{"name": "owner", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+    {
+        "type": "function",
+        "name": "paused",
+        "stateMutability": "view",
+        "inputs": [],
+        "outputs": [{"name": "", "type": "bool"}],
+    },
+]
+
+
+def owner(i: int) -> str:
+    return f"0x{i + 1:040x}"
+
+
+def paused():
+    raise Revert()
+
+
+@pytest.fixture
+def stub():
+    with StubRpcServer() as server:
+        server.register(
+            TOKEN,
+            ERC20_ABI,
+            {"balanceOf": lambda address: int(address, 16) * 10, "paused": paused},
+        )
+        yield server
+
+
+async def connect(url: str):
+    session = aiohttp.ClientSession()
+    provider = AsyncHTTPProvider(url)
+    await provider.cache_async_session(session)
+    return AsyncWeb3(provider), session
+
+
+def balance_calls(count: int):
+    return [
+        ViewCall(f"balance:{i}", TOKEN, ERC20_ABI, "balanceOf", (owner(i),))
+        for i in range(count)
+    ] + [ViewCall("paused", TOKEN, ERC20_ABI, "paused")]
+
+
+@pytest.mark.parametrize("mode, round_trips", [("multicall", 2), ("batch", 2)])
+def test_reads_are_batched_and_decoded(stub, mode, round_trips):
+    async def scenario():
+        w3, session = await connect(stub.url)
+        reader = OnChainReader(w3, batch_size=150, mode=mode)
+        values = await reader.read(balance_calls(200))
+        await session.close()
+        return reader, values
+
+    reader, values = asyncio.run(scenario())
+    assert values["balance:0"] == 10 and values["balance:199"] == 2000
+    assert values["paused"] is None
+    assert reader.round_trips == stub.requests == round_trips
+    assert stub.calls == 201
+
+
+def test_collector_emits_one_event_per_reading(stub):
+    async def scenario():
+        w3, session = await connect(stub.url)
+        collector = OnChainCollector(
+            OnChainReader(w3), balance_calls(3), event_type="balances", interval=0
+        )
+        events = collector.events()
+        readings = [await events.__anext__() for _ in range(2)]
+        await session.close()
+        return readings
+
+    first, second = asyncio.run(scenario())
+    assert first.type == "balances"
+    assert (
+        first.data
+        == second.data
+        == {
+            "balance:0": 10,
+            "balance:1": 20,
+            "balance:2": 30,
+            "paused": None,
+        }
+    )
+    assert stub.requests == 2
+
+
+def test_block_collector_reads_once_per_block_and_emits_on_condition(stub):
+    reward = {"value": 5}
+    stub.register(TOKEN, ERC20_ABI, {"balanceOf": lambda address: reward["value"]})
+    # (block, reward) as the chain advances; the reward is claimed at block 6
+    timeline = [(1, 5), (1, 5), (2, 5), (3, 12), (4, 15), (6, 0), (7, 11)]
+
+    async def collect(condition):
+        stub.block_number, reward["value"] = timeline[0]
+        w3, session = await connect(stub.url)
+        calls = [ViewCall("reward", TOKEN, ERC20_ABI, "balanceOf", (owner(0),))]
+        collector = BlockCollector(
+            OnChainReader(w3),
+            calls,
+            condition=condition,
+            min_interval=0.005,
+            max_interval=0.01,
+        )
+        events = []
+
+        async def consume():
+            async for event in collector.events():
+                events.append(event.data)
+
+        task = asyncio.create_task(consume())
+        for block, value in timeline[1:]:
+            await asyncio.sleep(0.05)
+            stub.block_number, reward["value"] = block, value
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await session.close()
+        return collector, events
+
+    collector, events = asyncio.run(collect(changed()))
+    assert [(e["block_number"], e["reward"]) for e in events] == [
+        (1, 5),
+        (3, 12),
+        (4, 15),
+        (6, 0),
+        (7, 11),
+    ]
+    assert collector.reads == 6 and collector.polls > collector.reads
+
+    _, events = asyncio.run(collect(crossed("reward", 10)))
+    assert [(e["block_number"], e["reward"]) for e in events] == [(3, 12), (7, 11)]
+
+
+def test_crossed_fires_again_after_the_cooldown():
+    condition = crossed("reward", 10, cooldown=0.05)
+    assert condition(None, {"reward": 12})
+    # Still above the threshold, e.g. the claim failed
+    assert not condition({"reward": 12}, {"reward": 13})
+    time.sleep(0.06)
+    assert condition({"reward": 13}, {"reward": 13})
+    assert not condition({"reward": 13}, {"reward": 5})
+
+    once = crossed("reward", 10, cooldown=None)
+    assert once(None, {"reward": 12})
+    time.sleep(0.01)
+    assert not once({"reward": 12}, {"reward": 12})
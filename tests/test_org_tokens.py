@@ -0,0 +1,105 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.cache_backend import create_cache
+from app.services.org_tokens import OrgTokenManager
+
+
+class FakeOAuth:
+    def __init__(self, expires_in=3600, refresh_fails=False):
+        self.expires_in = expires_in
+        self.refresh_fails = refresh_fails
+        self.grants = 0
+        self.refreshes = 0
+        self.installed = []
+
+    async def get_token(self, org_id):
+        self.grants += 1
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(
+            access_token=f"grant-{self.grants}",
+            refresh_token=f"refresh-{self.grants}",
+            expires_in=self.expires_in,
+        )
+
+    async def refresh_token(self, refresh_token):
+        self.refreshes += 1
+        await asyncio.sleep(0.01)
+        if self.refresh_fails:
+            raise RuntimeError("invalid_grant")
+        return SimpleNamespace(
+            access_token=f"refreshed-{self.refreshes}",
+            refresh_token=None,
+            expires_in=self.expires_in,
+        )
+
+    def manager(self, cache=None, **kwargs) -> OrgTokenManager:
+        return OrgTokenManager(
+            create_cache("tokens") if cache is None else cache,
+            self.get_token,
+            self.refresh_token,
+            lambda org_id, token: self.installed.append((org_id, token)),
+            **kwargs,
+        )
+
+
+def test_concurrent_requests_share_one_grant():
+    oauth = FakeOAuth()
+    tokens = oauth.manager()
+
+    async def scenario():
+        return await asyncio.gather(*(tokens.access_token("org") for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["grant-1"] * 10
+    assert oauth.grants == 1 and oauth.installed == [("org", "grant-1")]
+
+
+def test_token_near_expiry_is_served_while_refreshing_in_background():
+    oauth = FakeOAuth()
+    cache = create_cache("tokens")
+    cache["org"] = dict(
+        access_token="old", refresh_token="r", expires_at=time.time() + 60
+    )
+    tokens = oauth.manager(cache, refresh_margin=300)
+
+    async def scenario():
+        served = await asyncio.gather(*(tokens.access_token("org") for _ in range(5)))
+        await asyncio.sleep(0.05)
+        return served, await tokens.access_token("org")
+
+    served, after = asyncio.run(scenario())
+    assert served == ["old"] * 5
+    assert after == "refreshed-1" and oauth.refreshes == 1 and oauth.grants == 0
+    # The refresh token is kept when the response does not rotate it
+    assert cache["org"]["refresh_token"] == "r"
+
+
+def test_expired_token_with_rejected_refresh_falls_back_to_a_grant():
+    oauth = FakeOAuth(refresh_fails=True)
+    cache = create_cache("tokens")
+    cache["org"] = dict(access_token="old", refresh_token="r", expires_at=time.time())
+    tokens = oauth.manager(cache)
+
+    assert asyncio.run(tokens.access_token("org")) == "grant-1"
+    assert (oauth.refreshes, oauth.grants) == (1, 1)
+
+
+def test_active_orgs_refresh_on_schedule_and_adopt_other_workers_tokens():
+    oauth = FakeOAuth(expires_in=0.35)
+    cache = create_cache("tokens")
+    tokens = oauth.manager(cache, refresh_margin=0.3)
+    other_worker = oauth.manager(cache, refresh_margin=0.3)
+
+    async def scenario():
+        await tokens.access_token("org")
+        await asyncio.sleep(0.1)
+        # The timer refreshed the token without any request asking for it
+        refreshed = cache["org"]["access_token"]
+        adopted = await other_worker.refresh("org", replacing="grant-1")
+        tokens.close()
+        return refreshed, adopted["access_token"]
+
+    refreshed, adopted = asyncio.run(scenario())
+    assert refreshed == "refreshed-1"
+    assert adopted == "refreshed-1" and oauth.refreshes == 1
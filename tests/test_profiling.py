@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.profiling import SamplingProfiler, SlowRequestMiddleware, SlowRequestMonitor
+
+
+def busy_loop(seconds: float):
+    until = time.monotonic() + seconds
+    while time.monotonic() < until:
+        pass
+
+
+def test_profiler_samples_other_threads():
+    # Longer than the GIL switch interval, so the busy thread can't delay samples
+    profiler = SamplingProfiler(interval=0.01).start()
+    worker = threading.Thread(target=busy_loop, args=(0.2,), name="busy")
+    worker.start()
+    worker.join()
+    profile = profiler.stop()
+
+    assert any(
+        line.startswith("busy;") and "busy_loop (" in line
+        for line in profile.collapsed().splitlines()
+    )
+    speedscope = profile.speedscope()
+    frames = speedscope["shared"]["frames"]
+    (busy,) = [p for p in speedscope["profiles"] if p["name"] == "busy"]
+    assert any(frames[sample[-1]]["name"] == "busy_loop" for sample in busy["samples"])
+    assert sum(busy["weights"]) > 0.05
+
+
+def test_profile_endpoint_requires_the_admin_token(monkeypatch):
+    client = TestClient(app)
+    assert client.post("/admin/profile?seconds=0.1").status_code == 404
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "wrong"}
+    assert client.post("/admin/profile?seconds=0.1", headers=headers).status_code == 403
+
+    response = client.post(
+        "/admin/profile?seconds=0.1&format=collapsed",
+        headers={"X-Admin-Token": "secret"},
+    )
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    assert " " in response.text.splitlines()[0]
+
+
+def test_slow_requests_are_captured(tmp_path):
+    monitor = SlowRequestMonitor(0.1, str(tmp_path), interval=0.002)
+    slow_app = FastAPI()
+    slow_app.add_middleware(SlowRequestMiddleware, monitor=monitor)
+
+    @slow_app.get("/items/{item_id}")
+    async def blocking_handler(item_id: str, seconds: float = 0):
+        # Blocks the event loop, the case a loop-side timer could not catch
+        busy_loop(seconds)
+        return {"item_id": item_id}
+
+    client = TestClient(slow_app)
+    client.get("/items/1")
+    client.get("/items/2?seconds=0.4")
+    deadline = time.monotonic() + 2
+    while monitor.captured == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    (path,) = tmp_path.iterdir()
+    assert path.name.endswith("-GET__items__item_id.speedscope.json")
+    profile = json.loads(path.read_text())
+    assert "blocking_handler" in [
+        frame["name"] for frame in profile["shared"]["frames"]
+    ]
+
+
+def test_a_long_request_is_captured_once(tmp_path):
+    monitor = SlowRequestMonitor(0.1, str(tmp_path), interval=0.002, max_duration=0.1)
+    slow_app = FastAPI()
+    slow_app.add_middleware(SlowRequestMiddleware, monitor=monitor)
+
+    @slow_app.get("/slow")
+    async def blocking_handler():
+        busy_loop(0.6)
+
+    TestClient(slow_app).get("/slow")
+    deadline = time.monotonic() + 2
+    while monitor.captured == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+
+    assert monitor.captured == 1 and len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+import pytest
+from cobo_waas2.exceptions import ApiException
+
+from app.api import routes
+from app.rate_limit import (
+    AdaptiveConcurrency,
+    RateLimitExceeded,
+    TokenBucket,
+    UpstreamLimiter,
+)
+
+
+def too_many_requests(retry_after: str = "1") -> ApiException:
+    e = ApiException(status=429, reason="Too Many Requests")
+    e.headers = {"Retry-After": retry_after}
+    return e
+
+
+def test_token_bucket_queues_in_arrival_order_and_pauses():
+    bucket = TokenBucket(rate=10, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+    bucket.pause(1.0)
+    assert bucket.reserve() == pytest.approx(1.1, abs=0.01)
+
+
+def test_adaptive_concurrency_grows_on_success_and_halves_on_overload():
+    concurrency = AdaptiveConcurrency(initial=4, maximum=8)
+    for _ in range(40):
+        concurrency.in_flight += 1
+        concurrency.release(0.01)
+    assert concurrency.limit == 8
+    for _ in range(5):
+        concurrency.in_flight += 1
+        concurrency.release(None, overloaded=True)
+    # One overloaded round trip counts once
+    assert concurrency.limit == 4
+
+
+def test_limiter_queues_briefly_then_rejects():
+    limiter = UpstreamLimiter(
+        {"wallets": 0},
+        burst=1,
+        max_wait=0.05,
+        initial_concurrency=1,
+        max_concurrency=1,
+    )
+
+    async def call(seconds: float):
+        async with limiter.slot("org", "wallets"):
+            await asyncio.sleep(seconds)
+
+    async def scenario():
+        started = time.monotonic()
+        await asyncio.gather(call(0.02), call(0.02))
+        queued = time.monotonic() - started
+        with pytest.raises(RateLimitExceeded):
+            await asyncio.gather(call(0.2), call(0))
+        return queued
+
+    assert asyncio.run(scenario()) >= 0.04
+    assert limiter.stats()["org/wallets"]["rejected"] == 1
+
+
+def test_calls_rejected_for_concurrency_give_their_token_back():
+    limiter = UpstreamLimiter(
+        {"wallets": 10},
+        burst=5,
+        max_wait=0.05,
+        initial_concurrency=1,
+        max_concurrency=1,
+    )
+
+    async def call(seconds: float):
+        async with limiter.slot("org", "wallets"):
+            await asyncio.sleep(seconds)
+
+    async def scenario():
+        results = await asyncio.gather(
+            call(0.2), call(0), call(0), return_exceptions=True
+        )
+        assert [type(r) for r in results[1:]] == [RateLimitExceeded] * 2
+        return limiter._limits[("org", "wallets")].bucket
+
+    bucket = asyncio.run(scenario())
+    # All three reserved a token up front; only the call that ran kept it
+    assert bucket.tokens == pytest.approx(4, abs=0.01)
+    assert limiter.stats()["org/wallets"]["rejected"] == 2
+
+
+def test_upstream_429_pauses_the_bucket_and_reduces_concurrency():
+    limiter = UpstreamLimiter(
+        {"transactions": 100},
+        burst=100,
+        max_wait=0.5,
+        initial_concurrency=8,
+        max_concurrency=8,
+    )
+
+    async def scenario():
+        with pytest.raises(ApiException):
+            async with limiter.slot(None, "transactions"):
+                raise too_many_requests("3")
+        # Other families and orgs are not affected
+        async with limiter.slot("other", "transactions"):
+            pass
+        async with limiter.slot(None, "oauth"):
+            pass
+        with pytest.raises(RateLimitExceeded) as rejected:
+            async with limiter.slot(None, "transactions"):
+                pass
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.retry_after == pytest.approx(3, abs=0.1)
+    stats = limiter.stats()["-/transactions"]
+    assert stats["throttled"] == 1 and stats["concurrency_limit"] == 4
+
+
+def test_upstream_429_is_returned_as_429(monkeypatch):
+    async def list_wallets(*args, **kwargs):
+        raise too_many_requests("2")
+
+    async def ensure_org_client(org_id):
+        pass
+
+    monkeypatch.setattr(
+        routes.CoboService, "ensure_org_client", ensure_org_client, raising=False
+    )
+
+    async def call():
+        return await routes.execute_service_call(list_wallets, request_org_id="org")
+
+    response = asyncio.run(call())
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
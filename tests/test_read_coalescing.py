@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.api import routes
+from app.singleflight import SingleFlight
+
+PORTAL = hasattr(routes, "get_org_id")
+
+
+@pytest.fixture
+def flight(monkeypatch):
+    async def ensure_org_client(org_id):
+        pass
+
+    monkeypatch.setattr(routes, "read_call_flight", SingleFlight())
+    monkeypatch.setattr(routes.CoboService, "ensure_org_client", ensure_org_client)
+    return routes.read_call_flight
+
+
+def fake_service_method(name: str):
+    calls = []
+
+    async def method(*args):
+        calls.append(args)
+        await asyncio.sleep(0.05)
+        return {"data": list(args)}
+
+    method.__name__ = name
+    return method, calls
+
+
+def call(method, *args, org="org-1"):
+    kwargs = {"request_org_id": org} if PORTAL else {}
+    return routes.execute_service_call(method, *args, **kwargs)
+
+
+async def concurrently(*calls):
+    return await asyncio.gather(*calls)
+
+
+def test_identical_reads_share_one_upstream_call(flight):
+    list_wallets, calls = fake_service_method("list_wallets")
+    responses = asyncio.run(concurrently(*(call(list_wallets, "w1") for _ in range(5))))
+
+    assert calls == [("w1",)]
+    assert flight.calls == 1 and flight.shared == 4
+    assert {response.body for response in responses} == {
+        b'{"status":"success","data":["w1"]}'
+    }
+
+    # Different arguments are separate calls
+    asyncio.run(concurrently(call(list_wallets, "w1"), call(list_wallets, "w2")))
+    assert calls[1:] == [("w1",), ("w2",)] and flight.shared == 4
+
+
+def test_writes_are_never_coalesced(flight):
+    assert "create_address" not in routes.CoboService.READ_METHODS
+    create_address, calls = fake_service_method("create_address")
+    asyncio.run(concurrently(*(call(create_address, "w1") for _ in range(3))))
+
+    assert calls == [("w1",)] * 3
+    assert flight.calls == 0 and flight.shared == 0
+
+
+@pytest.mark.skipif(not PORTAL, reason="reads are per org only in the portal")
+def test_reads_are_not_shared_across_orgs(flight):
+    list_wallets, calls = fake_service_method("list_wallets")
+    asyncio.run(
+        concurrently(
+            call(list_wallets, "w1", org="org-1"),
+            call(list_wallets, "w1", org="org-2"),
+        )
+    )
+
+    assert calls == [("w1",), ("w1",)]
+    assert flight.calls == 2 and flight.shared == 0
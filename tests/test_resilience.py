@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import pytest
+from cobo_waas2 import Configuration
+from cobo_waas2.exceptions import ApiException, ServiceException
+from cobo_waas2.models import TransferParams
+from urllib3.exceptions import HTTPError
+
+from app.config import settings
+from app.resilience import CircuitOpenError, Resilience
+from app.services.cobo_service import CoboService
+from benchmarks.bench_batch_transfer import transfer
+from benchmarks.stub_server import StubCoboServer
+
+
+def resilience(**overrides) -> Resilience:
+    options = dict(
+        request_timeout=1.0,
+        deadline=5.0,
+        max_attempts=3,
+        base_delay=0.001,
+        max_delay=0.01,
+        failure_threshold=5,
+        reset_timeout=60.0,
+    )
+    options.update(overrides)
+    return Resilience(**options)
+
+
+def failing(*errors):
+    calls = []
+
+    async def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return attempt, calls
+
+
+def test_retries_upstream_failures_of_retryable_calls_only():
+    policy = resilience()
+    attempt, calls = failing(ServiceException(status=502), TimeoutError())
+    assert asyncio.run(policy.call("h", attempt, retryable=True)) == "ok"
+    assert len(calls) == 3 and policy.retries == 2
+
+    attempt, calls = failing(ServiceException(status=502))
+    with pytest.raises(ServiceException):
+        asyncio.run(policy.call("h", attempt, retryable=False))
+    assert len(calls) == 1
+
+    attempt, calls = failing(ApiException(status=400))
+    with pytest.raises(ApiException):
+        asyncio.run(policy.call("h", attempt, retryable=True))
+    assert len(calls) == 1
+
+
+def test_deadline_bounds_attempt_timeouts_and_retries():
+    policy = resilience(request_timeout=1.0, deadline=0.1, max_attempts=10)
+    timeouts = []
+
+    async def attempt(timeout):
+        timeouts.append(timeout)
+        await asyncio.sleep(timeout)
+        raise TimeoutError()
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(policy.call("h", attempt, retryable=True))
+    assert time.monotonic() - started < 0.2
+    assert timeouts[0] <= 0.1 and sum(timeouts) <= 0.12
+
+
+def test_breaker_opens_fails_fast_and_probes_after_reset():
+    policy = resilience(max_attempts=1, failure_threshold=2, reset_timeout=0.05)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(HTTPError):
+                await policy.call("h", failing(HTTPError())[0], retryable=True)
+        attempt, calls = failing()
+        with pytest.raises(CircuitOpenError):
+            await policy.call("h", attempt, retryable=True)
+        assert calls == []
+        # Other hosts are unaffected
+        assert await policy.call("other", attempt, retryable=True) == "ok"
+        await asyncio.sleep(0.06)
+        assert await policy.call("h", attempt, retryable=True) == "ok"
+
+    asyncio.run(scenario())
+    assert policy.stats()["breakers"]["h"] == {"state": "closed", "failures": 0}
+
+
+def test_sdk_calls_time_out_and_only_idempotent_ones_retry(monkeypatch):
+    with StubCoboServer(latency=0.3) as stub:
+        monkeypatch.setattr(
+            Configuration, "resp_pubkey", Configuration.__dict__["resp_pubkey"]
+        )
+        monkeypatch.setattr(settings, "COBO_API_HOST", settings.COBO_API_HOST)
+        monkeypatch.setattr(CoboService, "cobo_api_client", CoboService.cobo_api_client)
+        stub.attach()
+        monkeypatch.setattr(
+            CoboService,
+            "resilience",
+            resilience(request_timeout=0.05, failure_threshold=4),
+        )
+
+        async def scenario():
+            started = time.monotonic()
+            with pytest.raises(HTTPError):
+                await CoboService.list_wallets()
+            elapsed = time.monotonic() - started
+            with pytest.raises(HTTPError):
+                await CoboService.create_new_address("wallet-1", "ETH", 1)
+            return elapsed
+
+        try:
+            elapsed = asyncio.run(scenario())
+            assert elapsed < 0.3
+            assert stub.requests == 4
+            with pytest.raises(CircuitOpenError):
+                asyncio.run(CoboService.list_wallets())
+            assert stub.requests == 4
+        finally:
+            CoboService.shutdown()
+
+
+def test_writes_retry_only_with_a_request_id(monkeypatch):
+    retryable = CoboService._retryable
+    assert retryable("list_wallets", ())
+    assert not retryable("create_transfer_transaction", ({"request_id": None},))
+    assert retryable("create_contract_call_transaction", ({"request_id": "r-1"},))
+    assert not retryable("create_address", ("wallet-1",))
+
+    with StubCoboServer(latency=0, error_rate=1.0) as stub:
+        monkeypatch.setattr(
+            Configuration, "resp_pubkey", Configuration.__dict__["resp_pubkey"]
+        )
+        monkeypatch.setattr(settings, "COBO_API_HOST", settings.COBO_API_HOST)
+        monkeypatch.setattr(CoboService, "cobo_api_client", CoboService.cobo_api_client)
+        stub.attach()
+        monkeypatch.setattr(CoboService, "resilience", resilience(failure_threshold=10))
+        params = TransferParams.from_dict({**transfer(1), "request_id": "r-1"})
+        try:
+            with pytest.raises(ServiceException):
+                asyncio.run(CoboService.submit_transfer(params))
+            assert stub.requests == 3
+        finally:
+            CoboService.shutdown()
@@ -0,0 +1,53 @@
+import asyncio
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.cache_backend import MemoryCache
+from app.response_cache import ResponseCache
+
+
+def make_request(if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers})
+
+
+def test_read_through_coalescing_etag_and_stale_refresh():
+    cache = ResponseCache(MemoryCache())
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return JSONResponse({"status": "success", "version": len(calls)})
+
+    async def scenario():
+        herd = await asyncio.gather(
+            *(cache.respond(make_request(), "k", 60, 60, loader) for _ in range(10))
+        )
+        etag = herd[0].headers["etag"]
+        revalidated = await cache.respond(make_request(etag), "k", 60, 60, loader)
+
+        cache.store.get("k")["fresh_until"] = 0
+        stale = await cache.respond(make_request(), "k", 60, 60, loader)
+        await asyncio.gather(*cache._refreshes)
+        fresh = await cache.respond(make_request(), "k", 60, 60, loader)
+        return herd, revalidated, stale, fresh
+
+    herd, revalidated, stale, fresh = asyncio.run(scenario())
+    assert {r.body for r in herd} == {b'{"status":"success","version":1}'}
+    assert revalidated.status_code == 304 and revalidated.body == b""
+    assert stale.body == b'{"status":"success","version":1}'
+    assert fresh.body == b'{"status":"success","version":2}'
+    assert len(calls) == 2
+
+
+def test_errors_are_not_cached():
+    cache = ResponseCache(MemoryCache())
+
+    async def loader():
+        return JSONResponse({"status": "error"}, status_code=500)
+
+    response = asyncio.run(cache.respond(make_request(), "k", 60, 60, loader))
+    assert response.status_code == 500
+    assert "k" not in cache.store
@@ -0,0 +1,51 @@
+import json
+
+from cobo_waas2.models import ListTransactions200Response, ListWallets200Response
+
+from app.api.responses import ModelJSONResponse, model_content
+
+TRANSACTIONS = {
+    "data": [
+        {
+            "transaction_id": "tx-1",
+            "wallet_id": "wallet-1",
+            "status": "Completed",
+            "source": {"source_type": "Asset", "wallet_id": "wallet-1"},
+            "destination": {
+                "destination_type": "Address",
+                "account_output": {"address": "0xabc", "amount": "1.5"},
+            },
+            "initiator_type": "API",
+        }
+    ],
+    "pagination": {"before": "", "after": "next", "total_count": 1},
+}
+
+WALLETS = {
+    "data": [
+        {
+            "wallet_id": "wallet-1",
+            "wallet_type": "Custodial",
+            "wallet_subtype": "Asset",
+            "name": "Main",
+            "org_id": "org-1",
+        }
+    ],
+    "pagination": {"before": "", "after": "", "total_count": 1},
+}
+
+
+def test_matches_sdk_to_dict():
+    for model, payload in (
+        (ListTransactions200Response, TRANSACTIONS),
+        (ListWallets200Response, WALLETS),
+    ):
+        result = model.from_dict(payload)
+        body = ModelJSONResponse(content=model_content(result)).body
+        assert json.loads(body) == json.loads(json.dumps(result.to_dict()))
+
+
+def test_lists_of_models_are_serialized():
+    wallets = ListWallets200Response.from_dict(WALLETS).data
+    body = ModelJSONResponse(content={"data": wallets}).body
+    assert json.loads(body) == {"data": WALLETS["data"]}
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+from cobo_waas2 import Configuration
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services.cobo_service import CoboService
+from app.tracing import MemoryExporter, Tracer, propagating, tracer
+from benchmarks.stub_server import StubCoboServer
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def test_request_span_continues_the_callers_trace(monkeypatch):
+    exporter = MemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+
+    client = TestClient(app)
+    client.get("/", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+    # Not sampled by the caller, and 0% of new traces are sampled
+    client.get("/", headers={"traceparent": f"00-{TRACE_ID[::-1]}-{PARENT_ID}-00"})
+    client.get("/")
+
+    (span,) = exporter.spans
+    assert span.name == "GET /"
+    assert (f"{span.trace_id:032x}", f"{span.parent_id:016x}") == (TRACE_ID, PARENT_ID)
+    assert span.attributes["http.status_code"] == 200
+
+
+def test_unsampled_spans_still_propagate_trace_context():
+    sent = []
+
+    def request(method, url, headers=None, **kwargs):
+        sent.append(headers)
+        return SimpleNamespace(status=200)
+
+    for sample_rate, flags in ((0.0, "00"), (1.0, "01")):
+        exporter = MemoryExporter()
+        sampled = Tracer(exporter, sample_rate)
+        with sampled.start_as_current_span("call") as parent:
+            propagating(request, sampled)("GET", "http://cobo/v2/wallets?limit=1")
+        _, trace_id, span_id, sent_flags = sent[-1]["traceparent"].split("-")
+        assert trace_id == f"{parent.trace_id:032x}" and sent_flags == flags
+        assert len(exporter.spans) == (2 if sample_rate else 0)
+    http, call = exporter.spans
+    assert http.parent_id == call.span_id and f"{http.span_id:016x}" == span_id
+    assert http.attributes["http.url"] == "http://cobo/v2/wallets"
+
+
+def test_sdk_requests_are_traced_under_the_service_call(monkeypatch):
+    exporter = MemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    with StubCoboServer(latency=0.01) as stub:
+        monkeypatch.setattr(
+            Configuration, "resp_pubkey", Configuration.__dict__["resp_pubkey"]
+        )
+        monkeypatch.setattr(settings, "COBO_API_HOST", settings.COBO_API_HOST)
+        monkeypatch.setattr(CoboService, "cobo_api_client", CoboService.cobo_api_client)
+        stub.attach()
+
+        async def scenario():
+            with tracer.start_as_current_span("request"):
+                await CoboService.list_wallets()
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            CoboService.shutdown()
+
+    http, call, request = exporter.spans
+    assert (request.name, call.name, http.name) == (
+        "request",
+        "cobo list_wallets",
+        "HTTP GET",
+    )
+    assert http.parent_id == call.span_id and call.parent_id == request.span_id
+    assert http.attributes["http.status_code"] == 200
+    assert http.end_ns - http.start_ns >= 10_000_000
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import json
+
+import httpx
+from nacl.signing import SigningKey
+
+from automation.defi.collectors.webhook import WebhookCollector
+
+
+def delivery(event_type: str, event_id: str) -> dict:
+    return {"event_id": event_id, "type": event_type, "data": {"status": "Completed"}}
+
+
+def test_http_deliveries_become_events_and_are_verified():
+    signing_key = SigningKey.generate()
+
+    def signed(payload: dict) -> dict:
+        body = json.dumps(payload)
+        message = f"{body}|1700000000000".encode()
+        digest = hashlib.sha256(hashlib.sha256(message).digest()).digest()
+        return {
+            "content": body,
+            "headers": {
+                "Biz-Timestamp": "1700000000000",
+                "Biz-Resp-Signature": signing_key.sign(digest).signature.hex(),
+            },
+        }
+
+    async def scenario():
+        collector = WebhookCollector(
+            port=0, pub_key=signing_key.verify_key.encode().hex(), max_pending=2
+        )
+        await collector.start()
+        url = f"http://127.0.0.1:{collector.port}/webhook"
+        async with httpx.AsyncClient() as client:
+            statuses = [
+                (await client.post(url, **signed(delivery(t, i)))).status_code
+                for t, i in [
+                    ("transaction.created", "1"),
+                    ("wallets.address.created", "2"),
+                    ("transaction.confirmed", "3"),
+                    ("transaction.confirmed", "4"),
+                ]
+            ]
+            unsigned = await client.post(url, json=delivery("transaction.created", "5"))
+            wrong_path = await client.post(url + "s", **signed(delivery("x", "6")))
+            not_utf8 = await client.post(url, content=b"\xff\xfe{}")
+        events = collector.events()
+        received = [await events.__anext__() for _ in range(2)]
+        await collector.stop()
+        return statuses, (unsigned, wrong_path, not_utf8), received
+
+    statuses, refused, received = asyncio.run(scenario())
+    assert statuses == [200, 200, 200, 503]
+    assert [response.status_code for response in refused] == [401, 404, 400]
+    assert [(e.type, e.data["event_id"]) for e in received] == [
+        ("transaction.created", "1"),
+        ("transaction.confirmed", "3"),
+    ]
+
+
+def test_in_process_delivery():
+    async def scenario():
+        collector = WebhookCollector(event_types=None)
+        assert collector.deliver(delivery("wallets.address.created", "1"))
+        return await collector.events().__anext__()
+
+    event = asyncio.run(scenario())
+    assert event.type == "wallets.address.created"
+
+
+def test_listener_requires_a_length_and_closes_idle_connections():
+    async def exchange(port: int, request: bytes) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        # Read until the collector closes the connection
+        response = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+        return response
+
+    async def scenario():
+        collector = WebhookCollector(port=0, read_timeout=0.1)
+        await collector.start()
+        head = b"POST /webhook HTTP/1.1\r\nHost: x\r\n"
+        responses = [
+            await exchange(collector.port, request)
+            for request in [
+                head + b"Transfer-Encoding: chunked\r\n\r\n2\r\n{}\r\n0\r\n\r\n",
+                head + b"\r\n{}",
+                head + b"Content-Length: -2\r\n\r\n{}",
+                b"",
+                head + b"Content-Length: 10\r\n\r\n{}",
+            ]
+        ]
+        await collector.stop()
+        return responses
+
+    chunked, no_length, bad_length, idle, short_body = asyncio.run(scenario())
+    assert chunked.startswith(b"HTTP/1.1 411 ")
+    assert chunked.count(b"HTTP/1.1") == 1
+    assert no_length.startswith(b"HTTP/1.1 411 ")
+    assert bad_length.startswith(b"HTTP/1.1 400 ")
+    assert idle == b"" and short_body == b""
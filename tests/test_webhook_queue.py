@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import json
+
+from fastapi.testclient import TestClient
+from nacl.signing import SigningKey
+
+from app.api import routes
+from app.config import settings
+from app.main import app
+from app.webhook_queue import WebhookQueue
+
+
+def delivery(event_id: str) -> bytes:
+    return json.dumps({"event_id": event_id, "type": "transaction.created"}).encode()
+
+
+def test_burst_is_group_committed_deduplicated_and_handled(tmp_path):
+    handled = []
+
+    async def handler(payload, org_id):
+        handled.append(payload["event_id"])
+
+    async def scenario():
+        queue = WebhookQueue(str(tmp_path / "webhooks.db"), handler, workers=8)
+        await queue.start()
+        # 2000 deliveries of 1000 events: every event is delivered twice
+        event_ids = [str(i % 1000) for i in range(2000)]
+        accepted = await asyncio.gather(
+            *(queue.enqueue(event_id, delivery(event_id)) for event_id in event_ids)
+        )
+        while queue.stats()["processed"] < 1000:
+            await asyncio.sleep(0.01)
+        stats = queue.stats()
+        await queue.stop()
+        return accepted, stats
+
+    accepted, stats = asyncio.run(scenario())
+    assert sum(accepted) == 1000
+    assert sorted(handled, key=int) == [str(i) for i in range(1000)]
+    assert stats["duplicates"] == 1000
+    assert stats["commits"] < 100
+
+
+def test_unhandled_deliveries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "webhooks.db")
+    handled = []
+
+    async def failing(payload, org_id):
+        raise RuntimeError("downstream unavailable")
+
+    async def handler(payload, org_id):
+        handled.append((payload["event_id"], org_id))
+
+    async def scenario():
+        queue = WebhookQueue(path, failing, retry_delay=60)
+        assert await queue.enqueue("a", delivery("a"), org_id="org")
+        await queue.stop()
+
+        queue = WebhookQueue(path, handler)
+        await queue.start()
+        # A redelivery after the restart is still recognised
+        assert not await queue.enqueue("a", delivery("a"), org_id="org")
+        while not handled:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert handled == [("a", "org")]
+
+
+def test_webhook_endpoint_verifies_and_acks(tmp_path, monkeypatch):
+    signing_key = SigningKey.generate()
+    pub_key = signing_key.verify_key.encode().hex()
+    monkeypatch.setattr(settings, "WEBHOOK_PUBKEY", pub_key)
+    monkeypatch.setattr(routes.webhook_queue, "path", str(tmp_path / "webhooks.db"))
+    handled = []
+
+    async def handle_webhook(payload):
+        handled.append(payload["event_id"])
+
+    monkeypatch.setattr(routes.CoboService, "handle_webhook", handle_webhook)
+    if hasattr(routes, "get_org_id"):
+        app.dependency_overrides[routes.get_org_id] = lambda: "org"
+
+    def signed(body: bytes) -> dict:
+        message = body + b"|1700000000000"
+        digest = hashlib.sha256(hashlib.sha256(message).digest()).digest()
+        return {
+            "Biz-Timestamp": "1700000000000",
+            "Biz-Resp-Signature": signing_key.sign(digest).signature.hex(),
+        }
+
+    try:
+        with TestClient(app) as client:
+            body = delivery("e1")
+            first = client.post("/api/webhook", content=body, headers=signed(body))
+            again = client.post("/api/webhook", content=body, headers=signed(body))
+            forged = client.post(
+                "/api/webhook", content=delivery("e2"), headers=signed(body)
+            )
+            not_utf8 = b"\xff" + body
+            garbled = client.post(
+                "/api/webhook", content=not_utf8, headers=signed(not_utf8)
+            )
+            while routes.webhook_queue.stats()["processed"] < 1:
+                client.portal.call(asyncio.sleep, 0.01)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.json() == {"status": "success", "duplicate": False}
+    assert again.json() == {"status": "success", "duplicate": True}
+    assert forged.status_code == 401
+    assert garbled.status_code == 400
+    assert handled == ["e1"]